@@ -0,0 +1,333 @@
+"""
+Track analysis for Suno Music Player
+Decodes a cached track once and stores multi-resolution waveform peaks and
+integrated loudness in a memory-mappable sidecar next to the audio file
+"""
+
+import math
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+
+# Samples summarized by one peak at the finest level
+BASE_SAMPLES_PER_PEAK = 256
+# Each coarser level merges this many peaks of the level below
+LEVEL_FACTOR = 4
+# Stop adding levels once one has no more than this many peaks
+MIN_LEVEL_PEAKS = 256
+
+# Loudness target for normalization (LUFS), as used by most streaming services
+DEFAULT_TARGET_LUFS = -14.0
+
+_SIDECAR_MAGIC = b'SPPK'
+_SIDECAR_VERSION = 1
+# magic, version, level count, sample rate, samples per peak, level factor,
+# duration, integrated loudness, sample peak
+_SIDECAR_HEADER = struct.Struct('<4sHHIIIfff')
+
+# BS.1770 gating: 400 ms blocks every 100 ms
+_BLOCK_SECONDS = 0.4
+_STEP_SECONDS = 0.1
+_ABSOLUTE_GATE = -70.0
+_RELATIVE_GATE = -10.0
+
+# Frames K-weighted at a time when measuring loudness
+LOUDNESS_CHUNK_FRAMES = 1 << 15
+
+
+class TrackAnalysis:
+    """Waveform peaks and loudness of one track
+
+    levels[0] holds (min, max) pairs for every BASE_SAMPLES_PER_PEAK samples;
+    each following level is LEVEL_FACTOR times coarser. Peaks are int16 and,
+    when loaded from a sidecar, memory-mapped rather than read.
+    """
+
+    # Analyses kept in memory, by file path
+    _memo: "OrderedDict[str, TrackAnalysis]" = OrderedDict()
+    _memo_lock = threading.Lock()
+    MEMO_SIZE = 32
+
+    def __init__(self, levels: List[np.ndarray], sample_rate: int, duration: float,
+                 loudness: float, peak: float,
+                 samples_per_peak: int = BASE_SAMPLES_PER_PEAK,
+                 level_factor: int = LEVEL_FACTOR):
+        self.levels = levels
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.loudness = loudness        # integrated LUFS, -inf for silence
+        self.peak = peak                # highest absolute sample, 0..1
+        self.samples_per_peak = samples_per_peak
+        self.level_factor = level_factor
+
+    def peaks(self, width: int) -> np.ndarray:
+        """(min, max) pairs scaled to -1..1 for exactly `width` columns"""
+        if width <= 0 or not self.levels or not len(self.levels[0]):
+            return np.zeros((max(0, width), 2), dtype=np.float32)
+
+        # Coarsest level that still has at least one peak per column
+        level = self.levels[0]
+        for candidate in self.levels[1:]:
+            if len(candidate) < width:
+                break
+            level = candidate
+
+        edges = (np.arange(width) * len(level)) // width
+        edges = np.minimum(edges, len(level) - 1)
+        lows = np.minimum.reduceat(level[:, 0], edges)
+        highs = np.maximum.reduceat(level[:, 1], edges)
+        return np.stack([lows, highs], axis=1).astype(np.float32) / 32767
+
+    def gain_db(self, target_lufs: float = DEFAULT_TARGET_LUFS) -> float:
+        """Gain that brings the track to the target loudness without clipping"""
+        if not math.isfinite(self.loudness):
+            return 0.0
+        gain = target_lufs - self.loudness
+        if self.peak > 0:
+            gain = min(gain, -20 * math.log10(self.peak))
+        return gain
+
+    def gain_scale(self, target_lufs: float = DEFAULT_TARGET_LUFS) -> float:
+        """gain_db as a linear volume factor"""
+        return 10 ** (self.gain_db(target_lufs) / 20)
+
+    @classmethod
+    def for_file(cls, path: Union[str, Path]) -> "TrackAnalysis":
+        """Analysis of a cached file, from memory, its sidecar, or by decoding it"""
+        path = Path(path)
+        analysis = cls.cached(path)
+        if analysis is not None:
+            return analysis
+
+        sidecar = path.with_name(path.name + ".peaks")
+        analysis = cls._read_sidecar(sidecar)
+        if analysis is None:
+            analysis = cls.analyze(path)
+            cls._write_sidecar(sidecar, analysis)
+            # Map the written file so the peaks don't stay on the heap
+            analysis = cls._read_sidecar(sidecar) or analysis
+
+        with cls._memo_lock:
+            cls._memo[str(path)] = analysis
+            while len(cls._memo) > cls.MEMO_SIZE:
+                cls._memo.popitem(last=False)
+        return analysis
+
+    @classmethod
+    def cached(cls, path: Union[str, Path]) -> Optional["TrackAnalysis"]:
+        """Analysis already held in memory, without touching the disk"""
+        with cls._memo_lock:
+            analysis = cls._memo.get(str(path))
+            if analysis is not None:
+                cls._memo.move_to_end(str(path))
+            return analysis
+
+    @classmethod
+    def analyze(cls, path: Union[str, Path]) -> "TrackAnalysis":
+        """Decode a file and compute its peaks and loudness"""
+        samples, sample_rate = _decode(path)
+        if not len(samples):
+            return cls([], sample_rate, 0.0, float('-inf'), 0.0)
+        return cls(
+            _peak_levels(samples),
+            sample_rate,
+            len(samples) / sample_rate,
+            _integrated_loudness(samples, sample_rate),
+            float(np.abs(samples).max()),
+        )
+
+    @staticmethod
+    def _read_sidecar(sidecar: Path) -> Optional["TrackAnalysis"]:
+        try:
+            with open(sidecar, 'rb') as f:
+                header = f.read(_SIDECAR_HEADER.size)
+                (magic, version, level_count, sample_rate, samples_per_peak, level_factor,
+                 duration, loudness, peak) = _SIDECAR_HEADER.unpack(header)
+                if magic != _SIDECAR_MAGIC or version != _SIDECAR_VERSION:
+                    return None
+                counts = struct.unpack(f'<{level_count}I', f.read(4 * level_count))
+
+            offset = _SIDECAR_HEADER.size + 4 * level_count
+            expected = offset + sum(counts) * 4
+            if os.path.getsize(sidecar) != expected:
+                return None
+            levels = []
+            for count in counts:
+                levels.append(np.memmap(sidecar, dtype='<i2', mode='r',
+                                        offset=offset, shape=(count, 2)))
+                offset += count * 4
+            return TrackAnalysis(levels, sample_rate, duration, loudness, peak,
+                                 samples_per_peak, level_factor)
+        except (OSError, struct.error, ValueError):
+            return None
+
+    @staticmethod
+    def _write_sidecar(sidecar: Path, analysis: "TrackAnalysis"):
+        tmp_file = sidecar.with_name(sidecar.name + ".tmp")
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(_SIDECAR_HEADER.pack(
+                    _SIDECAR_MAGIC, _SIDECAR_VERSION, len(analysis.levels),
+                    analysis.sample_rate, analysis.samples_per_peak, analysis.level_factor,
+                    analysis.duration, analysis.loudness, analysis.peak
+                ))
+                f.write(struct.pack(f'<{len(analysis.levels)}I',
+                                    *(len(level) for level in analysis.levels)))
+                for level in analysis.levels:
+                    f.write(np.ascontiguousarray(level, dtype='<i2').tobytes())
+            os.replace(tmp_file, sidecar)
+        except OSError as e:
+            print(f"Warning: Could not save track analysis: {e}")
+
+
+def _decode(path: Union[str, Path]):
+    """Decode a file to float32 samples shaped (frames, channels) in -1..1"""
+    import pygame
+    import pygame.sndarray
+    if not pygame.mixer.get_init():
+        raise RuntimeError("Audio mixer is not initialized")
+    sample_rate = pygame.mixer.get_init()[0]
+    samples = pygame.sndarray.array(pygame.mixer.Sound(file=str(path)))
+    if samples.ndim == 1:
+        samples = samples[:, np.newaxis]
+
+    if np.issubdtype(samples.dtype, np.integer):
+        info = np.iinfo(samples.dtype)
+        # Unsigned formats are centred on the midpoint
+        centre = (int(info.max) + int(info.min) + 1) // 2
+        scale = 1.0 / (int(info.max) - centre)
+        return (samples.astype(np.float32) - centre) * np.float32(scale), sample_rate
+    return samples.astype(np.float32), sample_rate
+
+
+def _peak_levels(samples: np.ndarray) -> List[np.ndarray]:
+    """(min, max) pyramid of the channel-merged signal"""
+    count = -(-len(samples) // BASE_SAMPLES_PER_PEAK)
+    padded = np.zeros((count * BASE_SAMPLES_PER_PEAK, samples.shape[1]), dtype=np.float32)
+    padded[:len(samples)] = samples
+    blocks = padded.reshape(count, -1)
+
+    base = np.empty((count, 2), dtype=np.int16)
+    base[:, 0] = np.clip(blocks.min(axis=1) * 32767, -32767, 32767)
+    base[:, 1] = np.clip(blocks.max(axis=1) * 32767, -32767, 32767)
+
+    levels = [base]
+    while len(levels[-1]) > MIN_LEVEL_PEAKS:
+        level = levels[-1]
+        edges = np.arange(0, len(level), LEVEL_FACTOR)
+        levels.append(np.stack([np.minimum.reduceat(level[:, 0], edges),
+                                np.maximum.reduceat(level[:, 1], edges)], axis=1))
+    return levels
+
+
+class _Biquad:
+    """Biquad IIR filter run over a signal one chunk at a time
+
+    Transposed direct form II, vectorized per chunk: the zero-state response
+    is an FFT convolution with the impulse response cut at the chunk length
+    (exact within the chunk), and the state carried over from the previous
+    chunk adds its decaying zero-input response.
+    """
+
+    def __init__(self, b, a, channels: int, length: int):
+        b = np.asarray(b, dtype=np.float64) / a[0]
+        a = np.asarray(a, dtype=np.float64) / a[0]
+        self.b = b
+        self.a = a
+        self.length = length
+        # Impulse response of 1/A, which also carries the state between chunks
+        a1, a2 = float(a[1]), float(a[2])
+        free = [1.0, -a1]
+        for _ in range(length - 2):
+            free.append(-a1 * free[-1] - a2 * free[-2])
+        free = np.array(free[:length])
+        response = np.convolve(free, b)[:length]
+        self._spectrum = np.fft.rfft(response, 2 * length)[:, np.newaxis]
+        self._free = free[:, np.newaxis]
+        self._free_delayed = np.concatenate(([0.0], free[:-1]))[:, np.newaxis]
+        self.state = np.zeros((2, channels))
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Filter the next chunk, shaped (frames, channels), of at most `length` frames"""
+        m = len(x)
+        y = np.fft.irfft(np.fft.rfft(x, 2 * self.length, axis=0) * self._spectrum,
+                         2 * self.length, axis=0)[:m]
+        y += self._free[:m] * self.state[0] + self._free_delayed[:m] * self.state[1]
+
+        b, a = self.b, self.a
+        before = b[2] * x[-2] - a[2] * y[-2] if m > 1 else self.state[1]
+        self.state = np.stack([b[1] * x[-1] - a[1] * y[-1] + before,
+                               b[2] * x[-1] - a[2] * y[-1]])
+        return y
+
+
+def _k_weighting(sample_rate: int):
+    """BS.1770 K-weighting as two biquads, each a (b, a) coefficient pair"""
+    # Stage 1: high shelf, +4 dB above ~1.5 kHz
+    gain_a = 10 ** (4.0 / 40)
+    w0 = 2 * np.pi * 1500.0 / sample_rate
+    alpha = np.sin(w0) / (2 * (1 / np.sqrt(2)))
+    cos0 = np.cos(w0)
+    root = 2 * np.sqrt(gain_a) * alpha
+    shelf_b = (gain_a * ((gain_a + 1) + (gain_a - 1) * cos0 + root),
+               -2 * gain_a * ((gain_a - 1) + (gain_a + 1) * cos0),
+               gain_a * ((gain_a + 1) + (gain_a - 1) * cos0 - root))
+    shelf_a = ((gain_a + 1) - (gain_a - 1) * cos0 + root,
+               2 * ((gain_a - 1) - (gain_a + 1) * cos0),
+               (gain_a + 1) - (gain_a - 1) * cos0 - root)
+
+    # Stage 2: high pass at ~38 Hz
+    w0 = 2 * np.pi * 38.0 / sample_rate
+    alpha = np.sin(w0) / (2 * 0.5)
+    cos0 = np.cos(w0)
+    pass_b = ((1 + cos0) / 2, -(1 + cos0), (1 + cos0) / 2)
+    pass_a = (1 + alpha, -2 * cos0, 1 - alpha)
+
+    return (shelf_b, shelf_a), (pass_b, pass_a)
+
+
+def _integrated_loudness(samples: np.ndarray, sample_rate: int) -> float:
+    """Gated integrated loudness (LUFS) after ITU-R BS.1770
+
+    The signal is K-weighted LOUDNESS_CHUNK_FRAMES at a time, so memory use
+    doesn't grow with the track; only running totals of squares at the
+    gating block edges are kept.
+    """
+    n = len(samples)
+    block = int(_BLOCK_SECONDS * sample_rate)
+    step = int(_STEP_SECONDS * sample_rate)
+    if n < block:
+        block = step = n
+
+    starts = np.arange(0, n - block + 1, step)
+    edges = np.unique(np.concatenate((starts, starts + block)))
+    totals = np.zeros(len(edges))
+    stages = [_Biquad(b, a, samples.shape[1], LOUDNESS_CHUNK_FRAMES)
+              for b, a in _k_weighting(sample_rate)]
+    running = 0.0
+    for offset in range(0, n, LOUDNESS_CHUNK_FRAMES):
+        chunk = samples[offset:offset + LOUDNESS_CHUNK_FRAMES].astype(np.float64)
+        for stage in stages:
+            chunk = stage.process(chunk)
+        # Running total of squares, summed over channels
+        power = np.cumsum((chunk * chunk).sum(axis=1))
+        inside = (edges > offset) & (edges <= offset + len(chunk))
+        totals[inside] = running + power[edges[inside] - offset - 1]
+        running += power[-1]
+
+    energy = (totals[np.searchsorted(edges, starts + block)]
+              - totals[np.searchsorted(edges, starts)]) / block
+    with np.errstate(divide='ignore'):
+        block_loudness = -0.691 + 10 * np.log10(energy)
+    gated = energy[block_loudness > _ABSOLUTE_GATE]
+    if not len(gated):
+        return float('-inf')
+    relative = -0.691 + 10 * np.log10(gated.mean()) + _RELATIVE_GATE
+    gated = energy[(block_loudness > _ABSOLUTE_GATE) & (block_loudness > relative)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
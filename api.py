@@ -3,66 +3,380 @@ Suno API Client
 Handles all API calls to Suno backend
 """
 
-import requests
-from typing import List, Dict, Optional
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from metadata_cache import CachedLookup, MetadataCache
+from metrics import get_metrics
+from models import Clip, Workspace
+from resolver import AudioUrlResolver
+from transport import Transport, get_transport
+
+
+# Number of pages requested ahead of the one being consumed
+PAGE_PREFETCH = 4
+
+# How long cached responses are served without asking the server (seconds)
+WORKSPACES_TTL = 300
+CLIPS_TTL = 120
+CLIP_DETAILS_TTL = 24 * 3600
+
+DEFAULT_BASE_URL = "https://studio-api.prod.suno.com"
+DEVICE_ID = "8f955be9-40b8-496e-9a05-c12b86abd5f8"
+
+# Path segments that are ids rather than fixed parts of an endpoint
+_ID_SEGMENT = re.compile(r'^(?=.*\d)[0-9a-fA-F-]{8,}$')
+
+
+class OfflineError(ConnectionError):
+    """Raised instead of sending a request while the client is offline"""
+
+
+def endpoint_name(url: str) -> str:
+    """Endpoint template of a URL for metrics, e.g. /api/clip/{id}"""
+    segments = urlparse(url).path.split('/')
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment
+                    for segment in segments)
+
+
+# The pieces below are shared with AsyncSunoAPI, which differs only in how
+# requests are sent
+
+def request_headers(token: str, device_id: str = DEVICE_ID) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {token}",
+        "Device-Id": device_id,
+        "Accept": "*/*",
+        "User-Agent": "Mozilla/5.0"
+    }
+
+
+def workspaces_path(page: int, limit: int) -> str:
+    return f"/api/project/me?page={page}&limit={limit}"
+
+
+def clips_path(project_id: str, page: int, limit: int) -> str:
+    return f"/api/project/{project_id}/clips?page={page}&limit={limit}"
+
+
+def clip_details_path(clip_id: str) -> str:
+    return f"/api/clip/{clip_id}"
+
+
+SESSION_PATH = "/api/session/"
+
+
+def clip_feed_path(clip_ids: List[str]) -> str:
+    return f"/api/feed/?ids={','.join(clip_ids)}"
+
+
+def parse_workspaces(data: Dict) -> List[Workspace]:
+    return [Workspace.from_dict(ws) for ws in data.get('projects', [])]
+
+
+def parse_clips(data: Dict) -> List[Clip]:
+    return [Clip.from_dict(clip) for clip in data.get('clips', [])]
+
+
+def parse_clip_feed(data) -> List[Clip]:
+    """Clips from the feed endpoint, which answers with a list or a {'clips': [...]}"""
+    items = data.get('clips', []) if isinstance(data, dict) else data
+    return [Clip.from_dict(clip) for clip in items]
+
+
+def report_api_error(operation: str, what: str, error: Exception):
+    """Print and count a failed call that is answered with an empty result"""
+    print(f"Error fetching {what}: {error}")
+    get_metrics().inc('api_errors_total', operation=operation)
+
+
+def record_request(url: str, status, started: Optional[float] = None):
+    """Count a request per endpoint, with its latency if it got an answer"""
+    metrics = get_metrics()
+    endpoint = endpoint_name(url)
+    if started is not None:
+        metrics.observe('api_request_seconds', time.perf_counter() - started, endpoint=endpoint)
+    metrics.inc('api_requests_total', endpoint=endpoint, status=status)
+
+
+class PageWindow:
+    """Which pages of a listing to have in flight while walking it in order
+
+    Starts with a single request and doubles the window after each full
+    page, up to `prefetch`, so a one-page listing costs one request. With
+    the `expected` item count, pages past the one it ends on are only asked
+    for once everything before them came back full.
+    """
+
+    def __init__(self, limit: int, prefetch: int, expected: Optional[int] = None):
+        self.limit = limit
+        self.prefetch = max(1, prefetch)
+        self.last_page = None if expected is None else expected // limit + 1
+        self.window = 1
+        self.next_page = 1
+
+    def to_request(self, in_flight: int) -> List[int]:
+        """Pages to ask for now, given how many are already in flight"""
+        pages = []
+        while in_flight < self.window and (
+                not in_flight or self.last_page is None or self.next_page <= self.last_page):
+            pages.append(self.next_page)
+            self.next_page += 1
+            in_flight += 1
+        return pages
+
+    def ended(self, items: List) -> bool:
+        """Take in the next page; True if it was the last"""
+        if len(items) < self.limit:
+            return True
+        self.window = min(self.window * 2, self.prefetch)
+        return False
 
 
 class SunoAPI:
-    """Client for Suno Music API"""
+    """Client for Suno Music API
+    
+    When the server answers 401, `on_unauthorized` (if given) is called for
+    a new token and the request is sent once more. Concurrent requests that
+    hit the same expired token share a single renewal.
+    
+    While `offline` is set no request is sent: cached responses are served
+    whatever their age, and anything not cached comes back empty.
+    `on_connection_lost` is called (from the requesting thread) when the
+    server can't be reached even after the transport's retries.
+    """
+    
+    def __init__(self, token: str, transport: Optional[Transport] = None,
+                 cache: Optional[MetadataCache] = None,
+                 on_unauthorized: Optional[Callable[[], Optional[str]]] = None,
+                 on_connection_lost: Optional[Callable[[], None]] = None):
+        self.token = token
+        self.transport = transport or get_transport()
+        self.cache = cache
+        self.on_unauthorized = on_unauthorized
+        self.on_connection_lost = on_connection_lost
+        self.offline = False
+        self._renew_lock = threading.Lock()
+        # Memoized, coalesced clip id -> audio URL lookups
+        self.audio_urls = AudioUrlResolver(self.get_clip_details)
+        self.base_url = DEFAULT_BASE_URL
+        self.device_id = DEVICE_ID
+        self.headers = request_headers(token, self.device_id)
     
-    def __init__(self, token: str):
+    def set_token(self, token: str):
+        """Use a new token for every following request"""
+        self.headers = request_headers(token, self.device_id)
         self.token = token
-        self.base_url = "https://studio-api.prod.suno.com"
-        self.device_id = "8f955be9-40b8-496e-9a05-c12b86abd5f8"
-        self.headers = {
-            "Authorization": f"Bearer {token}",
-            "Device-Id": self.device_id,
-            "Accept": "*/*",
-            "User-Agent": "Mozilla/5.0"
-        }
-    
-    def get_workspaces(self, page: int = 1, limit: int = 50) -> List[Dict]:
+    
+    def get_workspaces(self, page: int = 1, limit: int = 50,
+                       revalidate: bool = False) -> List[Workspace]:
         """Get all user workspaces/projects"""
         try:
-            url = f"{self.base_url}/api/project/me?page={page}&limit={limit}"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('projects', [])
+            return self._workspace_page(page, limit, revalidate)
         except Exception as e:
-            print(f"Error fetching workspaces: {e}")
+            report_api_error('get_workspaces', "workspaces", e)
             return []
     
-    def get_clips(self, project_id: str, page: int = 1, limit: int = 100) -> List[Dict]:
+    def get_clips(self, project_id: str, page: int = 1, limit: int = 100,
+                  revalidate: bool = False) -> List[Clip]:
         """Get clips/songs from a specific workspace"""
         try:
-            url = f"{self.base_url}/api/project/{project_id}/clips?page={page}&limit={limit}"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('clips', [])
+            return self._clip_page(project_id, page, limit, revalidate)
         except Exception as e:
-            print(f"Error fetching clips: {e}")
+            report_api_error('get_clips', "clips", e)
             return []
     
-    def get_clip_details(self, clip_id: str) -> Dict:
+    def _workspace_page(self, page: int, limit: int, revalidate: bool) -> List[Workspace]:
+        """One page of workspaces; raises if it can't be fetched"""
+        return parse_workspaces(self._get_json(workspaces_path(page, limit), WORKSPACES_TTL,
+                                               revalidate))
+    
+    def _clip_page(self, project_id: str, page: int, limit: int,
+                   revalidate: bool) -> List[Clip]:
+        """One page of a workspace's clips; raises if it can't be fetched"""
+        return parse_clips(self._get_json(clips_path(project_id, page, limit), CLIPS_TTL,
+                                          revalidate))
+    
+    def cached_workspaces(self, limit: int = 50) -> Optional[List[Workspace]]:
+        """Get workspaces from the local cache only, whatever their age"""
+        items = self._cached_pages(lambda page: workspaces_path(page, limit), 'projects', limit)
+        return None if items is None else [Workspace.from_dict(ws) for ws in items]
+    
+    def cached_clips(self, project_id: str, limit: int = 100) -> Optional[List[Clip]]:
+        """Get a workspace's clips from the local cache only, whatever their age"""
+        items = self._cached_pages(lambda page: clips_path(project_id, page, limit),
+                                   'clips', limit)
+        return None if items is None else [Clip.from_dict(clip) for clip in items]
+    
+    def iter_workspace_pages(self, limit: int = 50, prefetch: int = PAGE_PREFETCH,
+                             revalidate: bool = False) -> Iterator[List[Workspace]]:
+        """Yield every page of workspaces, fetching upcoming pages concurrently
+        
+        Raises if a page can't be fetched, rather than ending the listing early.
+        """
+        return self._iter_pages(
+            lambda page: self._workspace_page(page, limit, revalidate), limit, prefetch
+        )
+    
+    def iter_clip_pages(self, project_id: str, limit: int = 100,
+                        prefetch: int = PAGE_PREFETCH, revalidate: bool = False,
+                        expected: Optional[int] = None) -> Iterator[List[Clip]]:
+        """Yield every page of clips in a workspace, fetching upcoming pages concurrently
+        
+        `expected` is the workspace's clip count, if known; no page past the
+        one it ends on is requested ahead. Raises if a page can't be fetched,
+        rather than ending the listing early.
+        """
+        return self._iter_pages(
+            lambda page: self._clip_page(project_id, page, limit, revalidate),
+            limit, prefetch, expected
+        )
+    
+    def get_all_workspaces(self, limit: int = 50,
+                           revalidate: bool = False) -> List[Workspace]:
+        """Get every workspace across all pages (raises if any page fails)"""
+        pages = self.iter_workspace_pages(limit, revalidate=revalidate)
+        return [ws for page in pages for ws in page]
+    
+    def get_all_clips(self, project_id: str, limit: int = 100, revalidate: bool = False,
+                      expected: Optional[int] = None) -> List[Clip]:
+        """Get every clip in a workspace across all pages (raises if any page fails)"""
+        pages = self.iter_clip_pages(project_id, limit, revalidate=revalidate,
+                                     expected=expected)
+        return [clip for page in pages for clip in page]
+    
+    def _iter_pages(self, fetch_page: Callable[[int], List], limit: int,
+                    prefetch: int, expected: Optional[int] = None) -> Iterator[List]:
+        """Walk pages in order, with as many in flight as PageWindow allows
+        
+        Stops at the first short page; requests already sent past the end
+        are cancelled or discarded.
+        """
+        window = PageWindow(limit, prefetch, expected)
+        with ThreadPoolExecutor(max_workers=window.prefetch) as pool:
+            pending = deque(pool.submit(fetch_page, page) for page in window.to_request(0))
+            try:
+                while pending:
+                    items = pending.popleft().result()
+                    if items:
+                        yield items
+                    if window.ended(items):
+                        return
+                    pending.extend(pool.submit(fetch_page, page)
+                                   for page in window.to_request(len(pending)))
+            finally:
+                for future in pending:
+                    future.cancel()
+    
+    def get_clip_details(self, clip_id: str, revalidate: bool = False) -> Dict:
         """Get detailed information about a clip including audio URL"""
         try:
-            url = f"{self.base_url}/api/clip/{clip_id}"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(clip_details_path(clip_id), CLIP_DETAILS_TTL, revalidate)
         except Exception as e:
-            print(f"Error fetching clip details: {e}")
+            report_api_error('get_clip_details', "clip details", e)
             return {}
     
+    def get_clips_by_ids(self, clip_ids: List[str]) -> List[Clip]:
+        """Get the current state of several clips in one request (never cached)"""
+        if not clip_ids:
+            return []
+        try:
+            response = self._get(f"{self.base_url}{clip_feed_path(clip_ids)}")
+            response.raise_for_status()
+            return parse_clip_feed(response.json())
+        except Exception as e:
+            report_api_error('get_clips_by_ids', "clip statuses", e)
+            return []
+    
     def get_session_info(self) -> Dict:
         """Get current session information"""
         try:
-            url = f"{self.base_url}/api/session/"
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self._get(f"{self.base_url}{SESSION_PATH}")
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            print(f"Error fetching session: {e}")
+            report_api_error('get_session_info', "session", e)
             return {}
+    
+    def _get_json(self, path: str, ttl: float, revalidate: bool = False):
+        """GET a JSON endpoint through the metadata cache (see CachedLookup)"""
+        lookup = CachedLookup(self.cache, path, ttl, revalidate)
+        if lookup.fresh:
+            return lookup.entry.payload
+        try:
+            response = self._get(f"{self.base_url}{path}", lookup.headers)
+            if response.status_code == 304 and lookup.entry is not None:
+                return lookup.not_modified()
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            if lookup.entry is not None:
+                return lookup.fallback()
+            raise
+        return lookup.store(data, response.headers.get('ETag'))
+    
+    def _get(self, url: str, extra_headers: Optional[Dict[str, str]] = None):
+        """Authenticated GET, renewing the token and retrying once after a 401"""
+        token = self.token
+        response = self._timed_get(url, extra_headers)
+        if response.status_code != 401 or self.on_unauthorized is None:
+            return response
+        if not self._renew_token(token):
+            # Nothing better to offer; let the caller see the 401
+            return response
+        
+        response.close()
+        return self._timed_get(url, extra_headers)
+    
+    def _timed_get(self, url: str, extra_headers: Optional[Dict[str, str]]):
+        """GET with the current headers, recording latency per endpoint"""
+        if self.offline:
+            raise OfflineError("Offline")
+        started = time.perf_counter()
+        try:
+            response = self.transport.get(url, headers={**self.headers, **(extra_headers or {})},
+                                          timeout=10)
+        except Exception as e:
+            record_request(url, 'error')
+            import requests
+            if isinstance(e, (requests.ConnectionError, requests.Timeout)) and \
+                    self.on_connection_lost is not None:
+                self.on_connection_lost()
+            raise
+        record_request(url, response.status_code, started)
+        return response
+    
+    def _renew_token(self, rejected: str) -> bool:
+        """Replace a token the server rejected; True if there is a new one to try"""
+        with self._renew_lock:
+            if self.token != rejected:
+                # Another request already renewed it
+                return True
+            token = self.on_unauthorized()
+            if not token or token == rejected:
+                return False
+            self.set_token(token)
+            return True
+    
+    def _cached_pages(self, path_for_page: Callable[[int], str], key: str,
+                      limit: int) -> Optional[List[Dict]]:
+        """Reassemble a paginated listing from cached pages (None if page 1 is missing)"""
+        if self.cache is None:
+            return None
+        
+        items = []
+        page = 1
+        while True:
+            entry = self.cache.get(path_for_page(page))
+            if entry is None:
+                return items if page > 1 else None
+            page_items = entry.payload.get(key, [])
+            items.extend(page_items)
+            if len(page_items) < limit:
+                return items
+            page += 1
@@ -0,0 +1,392 @@
+"""
+Asyncio Suno API client
+Same calls as SunoAPI on one event loop: many requests in flight share a
+connection pool and a single thread instead of a thread each
+
+Needs aiohttp (``pip install suno-music-player[async]``). Scripts can drive
+it with asyncio.run(); inside the desktop app it runs on a Qt-integrated
+loop such as qasync's, since it binds to whichever loop is running when it
+is first used.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import (TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, Iterable,
+                    List, Optional, Union)
+
+from api import (CLIP_DETAILS_TTL, CLIPS_TTL, DEFAULT_BASE_URL, DEVICE_ID, PAGE_PREFETCH,
+                 SESSION_PATH, WORKSPACES_TTL, OfflineError, PageWindow, clip_details_path,
+                 clip_feed_path, clips_path, parse_clip_feed, parse_clips, parse_workspaces,
+                 record_request, report_api_error, request_headers, workspaces_path)
+from metadata_cache import CachedLookup, MetadataCache
+from models import Clip, Workspace
+from transport import RETRY_STATUSES, backoff_delay
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+# Requests in flight at once, and pooled connections per host
+MAX_CONCURRENCY = 16
+POOL_PER_HOST = 16
+
+# Bytes per chunk yielded by stream_audio()
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class _Response:
+    """Status, headers and decoded body of a finished request"""
+    __slots__ = ('status', 'headers', 'data')
+
+    def __init__(self, status: int, headers, data):
+        self.status = status
+        self.headers = headers
+        self.data = data
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise ConnectionError(f"HTTP {self.status}")
+
+
+class AsyncSunoAPI:
+    """Asyncio client for Suno Music API
+
+    Mirrors SunoAPI: the get_* calls never raise, they print the error and
+    return an empty result; responses go through the same metadata cache;
+    a 401 asks `on_unauthorized` for a new token once, shared by every
+    request that hit it (a plain callable runs in the default executor).
+
+    At most `max_concurrency` requests are in flight however many coroutines
+    call in, all over one pooled session. Cancelling a task that awaits a
+    call aborts its request and frees its slot. Use as ``async with`` or
+    call close() when done.
+    """
+
+    def __init__(self, token: str, cache: Optional[MetadataCache] = None,
+                 on_unauthorized: Optional[Callable[[], Union[Optional[str],
+                                                             Awaitable[Optional[str]]]]] = None,
+                 max_concurrency: int = MAX_CONCURRENCY, max_retries: int = 3,
+                 backoff_factor: float = 0.5, backoff_max: float = 30.0):
+        self.token = token
+        self.cache = cache
+        self.on_unauthorized = on_unauthorized
+        self.offline = False
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.base_url = DEFAULT_BASE_URL
+        self.device_id = DEVICE_ID
+        self.headers = request_headers(token, self.device_id)
+        # Created on first use, on the loop that is running then
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._renew_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "AsyncSunoAPI":
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def set_token(self, token: str):
+        """Use a new token for every following request"""
+        self.headers = request_headers(token, self.device_id)
+        self.token = token
+
+    async def get_workspaces(self, page: int = 1, limit: int = 50,
+                             revalidate: bool = False) -> List[Workspace]:
+        """See SunoAPI.get_workspaces"""
+        try:
+            return await self._workspace_page(page, limit, revalidate)
+        except Exception as e:
+            report_api_error('get_workspaces', "workspaces", e)
+            return []
+
+    async def get_clips(self, project_id: str, page: int = 1, limit: int = 100,
+                        revalidate: bool = False) -> List[Clip]:
+        """See SunoAPI.get_clips"""
+        try:
+            return await self._clip_page(project_id, page, limit, revalidate)
+        except Exception as e:
+            report_api_error('get_clips', "clips", e)
+            return []
+
+    async def _workspace_page(self, page: int, limit: int, revalidate: bool) -> List[Workspace]:
+        """One page of workspaces; raises if it can't be fetched"""
+        return parse_workspaces(await self._get_json(workspaces_path(page, limit),
+                                                     WORKSPACES_TTL, revalidate))
+
+    async def _clip_page(self, project_id: str, page: int, limit: int,
+                         revalidate: bool) -> List[Clip]:
+        """One page of a workspace's clips; raises if it can't be fetched"""
+        return parse_clips(await self._get_json(clips_path(project_id, page, limit),
+                                                CLIPS_TTL, revalidate))
+
+    async def iter_workspace_pages(self, limit: int = 50, prefetch: int = PAGE_PREFETCH,
+                                   revalidate: bool = False) -> AsyncIterator[List[Workspace]]:
+        """Yield every page of workspaces, fetching upcoming pages concurrently
+
+        Raises if a page can't be fetched, rather than ending the listing early.
+        """
+        async for page in self._iter_pages(
+                lambda page: self._workspace_page(page, limit, revalidate), limit, prefetch):
+            yield page
+
+    async def iter_clip_pages(self, project_id: str, limit: int = 100,
+                              prefetch: int = PAGE_PREFETCH, revalidate: bool = False,
+                              expected: Optional[int] = None) -> AsyncIterator[List[Clip]]:
+        """Yield every page of clips in a workspace, fetching upcoming pages concurrently
+
+        `expected` is the workspace's clip count, if known; no page past the
+        one it ends on is requested ahead. Raises if a page can't be fetched,
+        rather than ending the listing early.
+        """
+        async for page in self._iter_pages(
+                lambda page: self._clip_page(project_id, page, limit, revalidate),
+                limit, prefetch, expected):
+            yield page
+
+    async def get_all_workspaces(self, limit: int = 50,
+                                 revalidate: bool = False) -> List[Workspace]:
+        """Get every workspace across all pages (raises if any page fails)"""
+        return [ws async for page in self.iter_workspace_pages(limit, revalidate=revalidate)
+                for ws in page]
+
+    async def get_all_clips(self, project_id: str, limit: int = 100, revalidate: bool = False,
+                            expected: Optional[int] = None) -> List[Clip]:
+        """Get every clip in a workspace across all pages (raises if any page fails)"""
+        return [clip async for page in self.iter_clip_pages(project_id, limit,
+                                                            revalidate=revalidate,
+                                                            expected=expected)
+                for clip in page]
+
+    async def get_library(self, revalidate: bool = False) -> Dict[str, List[Clip]]:
+        """Get the clips of every workspace, all workspaces at once (workspace id -> clips)"""
+        workspaces = await self.get_all_workspaces(revalidate=revalidate)
+        listings = await asyncio.gather(*(self.get_all_clips(ws.id, revalidate=revalidate,
+                                                             expected=ws.clip_count)
+                                          for ws in workspaces))
+        return {ws.id: clips for ws, clips in zip(workspaces, listings)}
+
+    async def _iter_pages(self, fetch_page: Callable[[int], Awaitable[List]], limit: int,
+                          prefetch: int, expected: Optional[int] = None) -> AsyncIterator[List]:
+        """Walk pages in order, with as many in flight as PageWindow allows
+
+        Stops at the first short page; requests already sent past the end
+        are cancelled and awaited, so none is left running or unretrieved.
+        """
+        window = PageWindow(limit, prefetch, expected)
+        pending = deque(asyncio.ensure_future(fetch_page(page))
+                        for page in window.to_request(0))
+        try:
+            while pending:
+                items = await pending.popleft()
+                if items:
+                    yield items
+                if window.ended(items):
+                    return
+                pending.extend(asyncio.ensure_future(fetch_page(page))
+                               for page in window.to_request(len(pending)))
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def get_clip_details(self, clip_id: str, revalidate: bool = False) -> Dict:
+        """See SunoAPI.get_clip_details"""
+        try:
+            return await self._get_json(clip_details_path(clip_id), CLIP_DETAILS_TTL, revalidate)
+        except Exception as e:
+            report_api_error('get_clip_details', "clip details", e)
+            return {}
+
+    async def get_many_clip_details(self, clip_ids: Iterable[str],
+                                    revalidate: bool = False) -> Dict[str, Dict]:
+        """Get details for many clips concurrently (clip id -> details, {} if it failed)"""
+        clip_ids = list(clip_ids)
+        details = await asyncio.gather(*(self.get_clip_details(clip_id, revalidate)
+                                         for clip_id in clip_ids))
+        return dict(zip(clip_ids, details))
+
+    async def get_clips_by_ids(self, clip_ids: List[str]) -> List[Clip]:
+        """See SunoAPI.get_clips_by_ids"""
+        if not clip_ids:
+            return []
+        try:
+            response = await self._get(f"{self.base_url}{clip_feed_path(clip_ids)}")
+            response.raise_for_status()
+            return parse_clip_feed(response.data)
+        except Exception as e:
+            report_api_error('get_clips_by_ids', "clip statuses", e)
+            return []
+
+    async def get_session_info(self) -> Dict:
+        """See SunoAPI.get_session_info"""
+        try:
+            response = await self._get(f"{self.base_url}{SESSION_PATH}")
+            response.raise_for_status()
+            return response.data
+        except Exception as e:
+            report_api_error('get_session_info', "session", e)
+            return {}
+
+    async def stream_audio(self, url: str, offset: int = 0,
+                           chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield an audio file's bytes as they arrive, from `offset` if the server allows
+
+        Holds a concurrency slot until the stream is exhausted or closed.
+        Audio URLs are public CDN links, so no auth headers are sent.
+        """
+        if self.offline:
+            raise OfflineError("Offline")
+        session = self._ensure_session()
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        async with self._slots:
+            async with session.get(url, headers=headers) as response:
+                if response.status >= 400:
+                    raise ConnectionError(f"HTTP {response.status}")
+                if offset and response.status != 206:
+                    # Range ignored; skip what the caller already has
+                    skip = offset
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        if skip >= len(chunk):
+                            skip -= len(chunk)
+                            continue
+                        yield chunk[skip:]
+                        skip = 0
+                        break
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+
+    async def download_audio(self, url: str, output_path: str,
+                             on_progress: Optional[Callable[[int], None]] = None) -> int:
+        """Stream an audio file to disk via a .part file; returns its size
+
+        File writes are small and run inline, which keeps one loop thread
+        doing all the work.
+        """
+        part_path = output_path + ".part"
+        written = 0
+        try:
+            with open(part_path, 'wb') as f:
+                async for chunk in self.stream_audio(url):
+                    f.write(chunk)
+                    written += len(chunk)
+                    if on_progress is not None:
+                        on_progress(written)
+        except BaseException:
+            # Cancelled or failed: don't leave a partial file behind
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        os.replace(part_path, output_path)
+        return written
+
+    async def _get_json(self, path: str, ttl: float, revalidate: bool = False):
+        """GET a JSON endpoint through the metadata cache (see CachedLookup)"""
+        lookup = CachedLookup(self.cache, path, ttl, revalidate)
+        if lookup.fresh:
+            return lookup.entry.payload
+        try:
+            response = await self._get(f"{self.base_url}{path}", lookup.headers)
+            if response.status == 304 and lookup.entry is not None:
+                return lookup.not_modified()
+            response.raise_for_status()
+        except Exception:
+            if lookup.entry is not None:
+                return lookup.fallback()
+            raise
+        return lookup.store(response.data, response.headers.get('ETag'))
+
+    async def _get(self, url: str, extra_headers: Optional[Dict[str, str]] = None) -> _Response:
+        """Authenticated GET, renewing the token and retrying once after a 401"""
+        token = self.token
+        response = await self._timed_get(url, extra_headers)
+        if response.status != 401 or self.on_unauthorized is None:
+            return response
+        if not await self._renew_token(token):
+            return response
+        return await self._timed_get(url, extra_headers)
+
+    async def _timed_get(self, url: str, extra_headers: Optional[Dict[str, str]]) -> _Response:
+        """GET with the current headers and retries, recording latency per endpoint"""
+        if self.offline:
+            raise OfflineError("Offline")
+        started = time.perf_counter()
+        try:
+            response = await self._request(url, {**self.headers, **(extra_headers or {})})
+        except Exception:
+            record_request(url, 'error')
+            raise
+        record_request(url, response.status, started)
+        return response
+
+    async def _request(self, url: str, headers: Dict[str, str]) -> _Response:
+        """One GET, retrying 429/5xx and connection errors with backoff
+
+        Waits for a concurrency slot per attempt, and gives it up while
+        backing off so other requests can run.
+        """
+        import aiohttp
+        session = self._ensure_session()
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                async with self._slots:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status not in RETRY_STATUSES or \
+                                attempt >= self.max_retries:
+                            data = None
+                            if response.status < 300:
+                                data = await response.json(content_type=None)
+                            return _Response(response.status, response.headers, data)
+                        retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.max_retries:
+                    raise
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_factor, self.backoff_max,
+                                              retry_after))
+            attempt += 1
+
+    async def _renew_token(self, rejected: str) -> bool:
+        """Replace a token the server rejected; True if there is a new one to try"""
+        if self._renew_lock is None:
+            self._renew_lock = asyncio.Lock()
+        async with self._renew_lock:
+            if self.token != rejected:
+                # Another request already renewed it
+                return True
+            if asyncio.iscoroutinefunction(self.on_unauthorized):
+                token = await self.on_unauthorized()
+            else:
+                # A blocking renewal (e.g. AuthManager.refresh_token) must not stall the loop
+                loop = asyncio.get_running_loop()
+                token = await loop.run_in_executor(None, self.on_unauthorized)
+            if not token or token == rejected:
+                return False
+            self.set_token(token)
+            return True
+
+    def _ensure_session(self) -> "aiohttp.ClientSession":
+        """The shared pooled session, created on the running loop at first use"""
+        if self._session is None or self._session.closed:
+            # aiohttp is optional and imported on first use
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency,
+                                             limit_per_host=POOL_PER_HOST)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=None, sock_connect=10,
+                                                                   sock_read=10))
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._session
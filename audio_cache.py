@@ -0,0 +1,186 @@
+"""
+Audio cache for Suno Music Player
+Content-addressed MP3 store under ~/.suno_player with LRU eviction and a size cap
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from metrics import get_metrics
+from transport import Transport, get_transport
+
+
+# Default byte budget for cached audio (2 GB)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class AudioCache:
+    """Local MP3 files keyed by clip id and content hash
+
+    Each clip is stored as ``<clip_id>-<sha256 prefix>.mp3`` and recorded in
+    ``index.json`` with its size and last access time. When the total size
+    exceeds the budget, least recently used files are removed first.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        if cache_dir is None:
+            cache_dir = Path.home() / ".suno_player" / "audio"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_file = cache_dir / "index.json"
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict] = self._load_index()
+
+    def get(self, clip_id: str) -> Optional[Path]:
+        """Get the cached file for a clip, marking it as recently used"""
+        with self._lock:
+            entry = self._index.get(clip_id)
+            if entry is None:
+                get_metrics().inc('audio_cache_lookups_total', result='miss')
+                return None
+            path = self.cache_dir / entry['file']
+            if not path.exists():
+                del self._index[clip_id]
+                self._save_index()
+                get_metrics().inc('audio_cache_lookups_total', result='miss')
+                return None
+            get_metrics().inc('audio_cache_lookups_total', result='hit')
+            entry['last_access'] = time.time()
+            self._save_index()
+            return path
+
+    def fetch(self, clip_id: str, url: str,
+              transport: Optional[Transport] = None) -> Path:
+        """Get a clip from the cache, downloading it first if needed"""
+        path = self.get(clip_id)
+        if path is not None:
+            return path
+
+        transport = transport or get_transport()
+        response = transport.get(url, stream=True, timeout=30)
+        try:
+            response.raise_for_status()
+            return self.store(clip_id, response.iter_content(chunk_size=256 * 1024))
+        finally:
+            response.close()
+
+    def store(self, clip_id: str, chunks: Iterable[bytes]) -> Path:
+        """Write a clip's audio into the cache and return its final path"""
+        digest = hashlib.sha256()
+        size = 0
+
+        # Each writer gets its own temp file, so concurrent stores never collide
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{clip_id}-", suffix=".part",
+                                        dir=str(self.cache_dir))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+
+            file_name = f"{clip_id}-{digest.hexdigest()[:16]}.mp3"
+            path = self.cache_dir / file_name
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            old = self._index.get(clip_id)
+            if old is not None and old['file'] != file_name:
+                self._remove_file(old['file'])
+            self._index[clip_id] = {
+                'file': file_name,
+                'sha256': digest.hexdigest(),
+                'size': size,
+                'last_access': time.time(),
+            }
+            self._evict(keep=clip_id)
+            self._save_index()
+        return path
+
+    def contains(self, clip_id: str) -> bool:
+        """Check whether a clip is cached without touching its LRU position"""
+        return self.peek(clip_id) is not None
+
+    def peek(self, clip_id: str) -> Optional[Path]:
+        """Get the cached file for a clip without touching its LRU position"""
+        with self._lock:
+            entry = self._index.get(clip_id)
+            if entry is None:
+                return None
+            path = self.cache_dir / entry['file']
+            return path if path.exists() else None
+
+    def total_bytes(self) -> int:
+        """Total size of all cached audio"""
+        with self._lock:
+            return sum(entry['size'] for entry in self._index.values())
+
+    def clear(self):
+        """Remove every cached file"""
+        with self._lock:
+            for entry in self._index.values():
+                self._remove_file(entry['file'])
+            self._index.clear()
+            self._save_index()
+
+    def _evict(self, keep: Optional[str] = None):
+        """Drop least recently used clips until the cache fits its budget"""
+        total = sum(entry['size'] for entry in self._index.values())
+        by_age = sorted(self._index.items(), key=lambda item: item[1]['last_access'])
+        for clip_id, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            if clip_id == keep:
+                continue
+            if self._remove_file(entry['file']):
+                del self._index[clip_id]
+                total -= entry['size']
+
+    def _remove_file(self, file_name: str) -> bool:
+        """Delete a cached file; False if it is still in use (e.g. playing on Windows)"""
+        try:
+            (self.cache_dir / file_name).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        # Sidecars derived from the audio (e.g. the frame index) go with it
+        for sidecar in self.cache_dir.glob(f"{file_name}.*"):
+            try:
+                sidecar.unlink()
+            except OSError:
+                pass
+        return True
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """Load the index file"""
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        """Write the index file atomically"""
+        tmp_file = self.index_file.with_suffix(".tmp")
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(self._index, f)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            print(f"Warning: Could not save audio cache index: {e}")
@@ -4,35 +4,96 @@ Handles token management, validation, and automatic token retrieval
 """
 
 import json
-import requests
+import os
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional
 from datetime import datetime
-import jwt
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options as ChromeOptions
 import time
+from transport import get_transport
+
+
+# Renew tokens this long before they expire (seconds)
+REFRESH_MARGIN = 5 * 60
+
+# Can point at a local stand-in page that sets the token, for testing
+DEFAULT_LOGIN_URL = os.environ.get("SUNO_PLAYER_LOGIN_URL", "https://suno.com/create")
+
+# localStorage key the Suno web app keeps its session token under
+TOKEN_KEY = '__clerk_db_jwt'
+
+# How long to wait for an interactive login, and for a headless renewal (seconds)
+LOGIN_TIMEOUT = 300
+HEADLESS_LOGIN_TIMEOUT = 30
+
+# Longest single in-page wait; the page is re-armed after each one (seconds)
+TOKEN_WAIT_SLICE = 10
+
+# Resolves with the token as soon as it is written: same-page writes are seen
+# through setItem, other tabs through storage events, and a short poll covers
+# anything else (e.g. the app restoring its session on load)
+_WAIT_FOR_TOKEN_SCRIPT = """
+const key = arguments[0];
+const done = arguments[arguments.length - 1];
+let finished = false;
+function finish(value) {
+    if (finished) return;
+    finished = true;
+    clearInterval(poll);
+    clearTimeout(slice);
+    window.removeEventListener('storage', onStorage);
+    done(value);
+}
+function check() {
+    try {
+        const token = localStorage.getItem(key);
+        if (token) finish(token);
+    } catch (e) {}
+}
+function onStorage(event) {
+    if (event.key === key && event.newValue) finish(event.newValue);
+}
+if (!window.__sunoTokenHooked) {
+    window.__sunoTokenHooked = true;
+    const setItem = Storage.prototype.setItem;
+    Storage.prototype.setItem = function (name, value) {
+        setItem.apply(this, arguments);
+        if (name === key) window.dispatchEvent(new Event('suno-token'));
+    };
+}
+window.addEventListener('storage', onStorage);
+window.addEventListener('suno-token', check, {once: true});
+const poll = setInterval(check, 100);
+const slice = setTimeout(() => finish(null), %d);
+check();
+""" % ((TOKEN_WAIT_SLICE - 1) * 1000)
 
 
 class AuthManager:
-    """Manages authentication with Suno API"""
+    """Manages authentication with Suno API
     
-    def __init__(self):
+    A token whose JWT is well formed and not expired is trusted without
+    asking the server; a rejected token surfaces as a 401 from the API
+    client, which then asks for a new one. The current token's expiry is
+    kept in memory so checks don't decode it again.
+    """
+    
+    def __init__(self, login_url: str = DEFAULT_LOGIN_URL):
         self.config_dir = Path.home() / ".suno_player"
         self.config_dir.mkdir(exist_ok=True)
         self.token_file = self.config_dir / "token.json"
+        # Kept between logins so the browser stays signed in to Suno
+        self.browser_profile_dir = self.config_dir / "browser-profile"
+        self.login_url = login_url
         self.api_base = "https://studio-api.prod.suno.com"
         self.device_id = "8f955be9-40b8-496e-9a05-c12b86abd5f8"
+        self._token: Optional[str] = None
+        self._expires_at: Optional[float] = None
     
     def get_valid_token(self) -> Optional[str]:
-        """Get a valid token, either from cache or by re-authenticating"""
-        # Try to load from cache
-        token = self._load_cached_token()
+        """Get a valid token from cache (no network), or None if a login is needed"""
+        token = self.cached_token()
         
-        if token and self._validate_token(token):
+        if token:
             print("✓ Using cached token")
             return token
         
@@ -44,6 +105,11 @@ class AuthManager:
         """Authenticate with Suno and get a new token"""
         print("\n=== SUNO AUTHENTICATION ===\n")
         
+        # A saved browser session may still be signed in; try it without a window
+        token = self.refresh_token()
+        if token:
+            return token
+        
         # Try automatic authentication first
         token = self._auto_authenticate()
         
@@ -61,71 +127,114 @@ class AuthManager:
         
         return None
     
-    def _auto_authenticate(self) -> Optional[str]:
-        """Automatically retrieve token by launching browser and capturing from localStorage"""
+    def refresh_token(self) -> Optional[str]:
+        """Get a new token from the saved browser session, without any window"""
+        if not self.browser_profile_dir.exists():
+            # Nothing to reuse before the first interactive login
+            return None
+        token = self._auto_authenticate(headless=True, timeout=HEADLESS_LOGIN_TIMEOUT)
+        if token:
+            self._save_token(token)
+        return token
+    
+    def token_expiry(self, token: str) -> Optional[float]:
+        """Epoch time at which a token expires (None if it doesn't say)"""
+        if token == self._token:
+            return self._expires_at
+        import jwt
+        decoded = jwt.decode(token, options={"verify_signature": False})
+        exp = decoded.get('exp')
+        return float(exp) if exp else None
+    
+    def seconds_until_refresh(self, token: str, margin: float = REFRESH_MARGIN) -> Optional[float]:
+        """How long until a token should be renewed (None if it never expires)"""
+        try:
+            expires_at = self.token_expiry(token)
+        except Exception:
+            return None
+        if expires_at is None:
+            return None
+        return max(0.0, expires_at - margin - time.time())
+    
+    def cached_session(self, token: str) -> Optional[Dict]:
+        """Session info saved alongside a token, if it was saved for this token"""
+        data = self._load_token_data()
+        if data.get('token') == token:
+            return data.get('session')
+        return None
+    
+    def save_session(self, token: str, session: Dict):
+        """Remember session info for a token so startup doesn't have to fetch it"""
+        data = self._load_token_data()
+        if data.get('token') != token or not session:
+            return
+        data['session'] = session
+        self._write_token_data(data)
+    
+    def _auto_authenticate(self, headless: bool = False,
+                           timeout: float = LOGIN_TIMEOUT) -> Optional[str]:
+        """Retrieve a token by opening the login page and reading it from localStorage
+        
+        The browser keeps its profile under ~/.suno_player, so a session from
+        an earlier login is reused and the token usually appears without any
+        user interaction, which lets renewals run headless. The page is
+        watched from inside the browser, so the token is picked up within
+        a fraction of a second of being written.
+        """
+        # Selenium is only needed for browser login; keep it off the startup path
+        from selenium import webdriver
+        from selenium.common.exceptions import WebDriverException
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        
+        driver = None
         try:
-            print("1. Opening Suno.com in browser...")
-            print("2. Please login with your Suno account...")
-            print("3. Waiting for authentication...")
+            if headless:
+                print("Renewing token with the saved browser session...")
+            else:
+                print("1. Opening Suno.com in browser...")
+                print("2. Please login with your Suno account...")
+                print("3. Waiting for authentication...")
             
             # Setup Chrome options
             chrome_options = ChromeOptions()
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-dev-shm-usage")
+            chrome_options.add_argument(f"--user-data-dir={self.browser_profile_dir}")
+            if headless:
+                chrome_options.add_argument("--headless=new")
             
             # Launch browser
             driver = webdriver.Chrome(options=chrome_options)
-            driver.get("https://suno.com/create")
-            
-            # Wait for user to login (max 5 minutes)
-            print("\n(Waiting max 5 minutes for login...)")
-            wait = WebDriverWait(driver, 300)
+            driver.set_script_timeout(TOKEN_WAIT_SLICE)
+            driver.get(self.login_url)
             
-            # Wait for the app to fully load after login
-            # We'll check for the presence of the project list or just wait for a token in localStorage
+            if not headless:
+                print(f"\n(Waiting max {int(timeout // 60)} minutes for login...)")
             
-            for attempt in range(60):  # Check every 5 seconds for 5 minutes
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
                 try:
-                    # Try to get token from localStorage
-                    script = """
-                    try {
-                        const token = localStorage.getItem('__clerk_db_jwt');
-                        if (token) {
-                            return token;
-                        }
-                        return null;
-                    } catch(e) {
-                        return null;
-                    }
-                    """
-                    
-                    token = driver.execute_script(script)
-                    
-                    if token:
-                        print("✓ Token captured from browser!")
-                        driver.quit()
-                        return token
-                    
-                    if attempt > 0 and attempt % 6 == 0:
-                        print(f"Still waiting... ({attempt * 5} seconds)")
-                    
-                    time.sleep(5)
-                    
-                except Exception as e:
-                    time.sleep(5)
+                    token = driver.execute_async_script(_WAIT_FOR_TOKEN_SCRIPT, TOKEN_KEY)
+                except WebDriverException:
+                    # The page navigated away mid-wait (login redirects); watch the new one
+                    time.sleep(0.1)
                     continue
+                if token:
+                    print("✓ Token captured from browser!")
+                    return token
             
-            driver.quit()
             print("✗ Timeout: Could not capture token")
             return None
             
         except Exception as e:
             print(f"✗ Auto-authentication failed: {e}")
+            return None
+        finally:
             try:
-                driver.quit()
+                if driver is not None:
+                    driver.quit()
             except:
                 pass
-            return None
     
     def _manual_token_entry(self) -> Optional[str]:
         """Prompt user to manually enter their token"""
@@ -143,19 +252,38 @@ class AuthManager:
         token = input("Paste your Bearer Token: ").strip()
         return token if token else None
     
+    def cached_token(self) -> Optional[str]:
+        """Saved token if it looks usable, checked locally without a network call"""
+        if self._token and (self._expires_at is None or self._expires_at > time.time()):
+            return self._token
+        token = self._load_cached_token()
+        if token and self._check_token_locally(token):
+            self._expires_at = self.token_expiry(token)
+            self._token = token
+            return token
+        return None
+    
+    def _check_token_locally(self, token: str) -> bool:
+        """Check token format and expiry"""
+        # Check token format
+        if not token or len(token) < 100:
+            return False
+        
+        try:
+            # Decode JWT to check expiration
+            exp = self.token_expiry(token)
+        except Exception:
+            return False
+        
+        if exp and datetime.fromtimestamp(exp) < datetime.now():
+            print("✗ Token expired")
+            return False
+        return True
+    
     def _validate_token(self, token: str) -> bool:
         """Validate that the token is still valid"""
         try:
-            # Check token format
-            if not token or len(token) < 100:
-                return False
-            
-            # Decode JWT to check expiration
-            decoded = jwt.decode(token, options={"verify_signature": False})
-            exp = decoded.get('exp')
-            
-            if exp and datetime.fromtimestamp(exp) < datetime.now():
-                print("✗ Token expired")
+            if not self._check_token_locally(token):
                 return False
             
             # Verify with API
@@ -164,7 +292,7 @@ class AuthManager:
                 "Device-Id": self.device_id,
             }
             
-            response = requests.get(
+            response = get_transport().get(
                 f"{self.api_base}/api/session/",
                 headers=headers,
                 timeout=5
@@ -183,30 +311,46 @@ class AuthManager:
     
     def _load_cached_token(self) -> Optional[str]:
         """Load token from cache file"""
+        return self._load_token_data().get('token')
+    
+    def _load_token_data(self) -> Dict:
+        """Contents of the token file ({} if missing or unreadable)"""
         try:
             if self.token_file.exists():
                 with open(self.token_file, 'r') as f:
-                    data = json.load(f)
-                    return data.get('token')
+                    return json.load(f)
         except:
             pass
-        return None
+        return {}
     
     def _save_token(self, token: str):
         """Save token to cache file"""
+        data = {
+            'token': token,
+            'saved_at': datetime.now().isoformat()
+        }
+        if self._write_token_data(data):
+            print(f"✓ Token saved to {self.token_file}")
+        try:
+            self._expires_at = self.token_expiry(token)
+        except Exception:
+            self._expires_at = None
+        self._token = token
+    
+    def _write_token_data(self, data: Dict) -> bool:
+        """Write the token file"""
         try:
-            data = {
-                'token': token,
-                'saved_at': datetime.now().isoformat()
-            }
             with open(self.token_file, 'w') as f:
                 json.dump(data, f, indent=2)
-            print(f"✓ Token saved to {self.token_file}")
+            return True
         except Exception as e:
             print(f"Warning: Could not save token: {e}")
+            return False
     
     def clear_token(self):
         """Clear cached token"""
+        self._token = None
+        self._expires_at = None
         try:
             if self.token_file.exists():
                 self.token_file.unlink()
@@ -0,0 +1,269 @@
+"""
+Local stand-in for the Suno API, for benchmarks
+Serves synthetic workspaces, clips, session info and MP3 files with
+configurable counts, latency and file size
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: 417-byte frames
+_FRAME_HEADER = b'\xff\xfb\x90\x00'
+_FRAME_SIZE = 417
+
+# Cycled through per clip; must match the client: 'success' is playable
+# (Clip.is_ready), 'error' is final and the rest are still generating
+_STATUSES = ('success', 'success', 'success', 'success', 'streaming', 'queued', 'error')
+_TAGS = ('pop', 'rock', 'lofi', 'ambient', 'synthwave', 'jazz', 'metal', 'folk', 'edm', 'choir')
+
+LOGIN_PAGE = """<!doctype html>
+<html><body><p>Signing in...</p>
+<script>
+setTimeout(function () {
+    localStorage.setItem('__clerk_db_jwt', %s);
+}, %d);
+</script></body></html>
+"""
+
+
+@dataclass
+class MockConfig:
+    """Shape of the fake library and how slowly it is served"""
+    workspaces: int = 5
+    clips_per_workspace: int = 500
+    latency_ms: float = 20.0        # added to every API response
+    mp3_bytes: int = 3 * 1024 * 1024
+    audio_latency_ms: float = 0.0   # added before audio starts streaming
+    audio_rate: int = 0             # bytes per second per download, 0 for unlimited
+    list_audio_urls: bool = True    # include audio_url in clip listings
+    token: Optional[str] = None     # required bearer token (None accepts any)
+    login_delay_ms: int = 500       # how long the login page takes to "sign in"
+
+
+def synthetic_mp3(size: int) -> bytes:
+    """Silent but well-formed MP3 data of roughly `size` bytes"""
+    frame = _FRAME_HEADER + b'\x00' * (_FRAME_SIZE - len(_FRAME_HEADER))
+    return frame * max(1, size // _FRAME_SIZE)
+
+
+class MockLibrary:
+    """Deterministic fake data for a config"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.audio = synthetic_mp3(config.mp3_bytes)
+        duration = len(self.audio) // _FRAME_SIZE * 1152 / 44100
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        self.workspaces: List[Dict] = []
+        self.clips: Dict[str, List[Dict]] = {}
+        self.clip_by_id: Dict[str, Dict] = {}
+        for w in range(config.workspaces):
+            workspace_id = f"{w:08x}-0000-4000-8000-000000000000"
+            clips = []
+            for c in range(config.clips_per_workspace):
+                clip_id = f"{w:08x}-{c:04x}-4000-8000-{c:012x}"
+                clip = {
+                    'id': clip_id,
+                    'title': f"Track {w}-{c} {_TAGS[c % len(_TAGS)]} dream",
+                    'status': _STATUSES[c % len(_STATUSES)],
+                    'created_at': (base + timedelta(minutes=c * 7 + w)).isoformat(),
+                    'duration': duration,
+                    'metadata': {
+                        'tags': f"{_TAGS[c % len(_TAGS)]}, {_TAGS[(c * 3) % len(_TAGS)]}",
+                        'prompt': f"[Verse]\nline {c} of workspace {w}\n[Chorus]\nla la la",
+                        'duration': duration,
+                    },
+                }
+                clips.append(clip)
+                self.clip_by_id[clip_id] = clip
+            self.clips[workspace_id] = clips
+            self.workspaces.append({'id': workspace_id, 'name': f"Workspace {w}",
+                                    'clip_count': len(clips)})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "MockSunoServer"
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without TCP_NODELAY every
+    # reused connection waits ~40 ms on Nagle plus the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        path = parsed.path
+        server.count(path)
+
+        if path.startswith('/audio/'):
+            return self._audio()
+        if path == '/login':
+            return self._login()
+
+        time.sleep(server.config.latency_ms / 1000)
+        if server.config.token is not None and \
+                self.headers.get('Authorization') != f"Bearer {server.config.token}":
+            return self._send(401, b'{"detail": "Unauthorized"}')
+
+        library = server.library
+        page = int(query.get('page', 1))
+        limit = int(query.get('limit', 50))
+
+        if path == '/api/session/':
+            return self._json({'user': {'name': 'Benchmark User', 'id': 'bench'}})
+        if path == '/api/project/me':
+            items = library.workspaces[(page - 1) * limit:page * limit]
+            return self._json({'projects': items})
+        match = re.fullmatch(r'/api/project/([^/]+)/clips', path)
+        if match and match.group(1) in library.clips:
+            items = library.clips[match.group(1)][(page - 1) * limit:page * limit]
+            if not server.config.list_audio_urls:
+                items = [{k: v for k, v in clip.items() if k != 'audio_url'} for clip in items]
+            else:
+                items = [dict(clip, audio_url=self._audio_url(clip['id'])) for clip in items]
+            return self._json({'clips': items})
+        if path == '/api/feed/':
+            ids = [i for i in query.get('ids', '').split(',') if i in library.clip_by_id]
+            return self._json([dict(library.clip_by_id[i], audio_url=self._audio_url(i))
+                               for i in ids])
+        match = re.fullmatch(r'/api/clip/([^/]+)', path)
+        if match and match.group(1) in library.clip_by_id:
+            clip = library.clip_by_id[match.group(1)]
+            return self._json(dict(clip, audio_url=self._audio_url(clip['id'])))
+        self._send(404, b'{"detail": "Not found"}')
+
+    def _audio_url(self, clip_id: str) -> str:
+        return f"{self.server.url}/audio/{clip_id}.mp3"
+
+    def _json(self, payload):
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, b'', {'ETag': etag})
+        self._send(200, body, {'ETag': etag, 'Content-Type': 'application/json'})
+
+    def _login(self):
+        token = self.server.config.token or "x" * 120
+        body = (LOGIN_PAGE % (json.dumps(token), self.server.config.login_delay_ms)).encode()
+        self._send(200, body, {'Content-Type': 'text/html'})
+
+    def _audio(self):
+        config = self.server.config
+        data = self.server.library.audio
+        time.sleep(config.audio_latency_ms / 1000)
+
+        start = 0
+        status = 200
+        match = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            if start >= len(data):
+                return self._send(416, b'')
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'audio/mpeg')
+        self.send_header('Content-Length', str(len(data) - start))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+
+        chunk = 64 * 1024
+        view = memoryview(data)
+        try:
+            for offset in range(start, len(data), chunk):
+                self.wfile.write(view[offset:offset + chunk])
+                if config.audio_rate:
+                    time.sleep(chunk / config.audio_rate)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class MockSunoServer(ThreadingHTTPServer):
+    """Fake API on 127.0.0.1; use as a context manager to run it in a thread"""
+    daemon_threads = True
+
+    def __init__(self, config: Optional[MockConfig] = None, port: int = 0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.config = config or MockConfig()
+        self.library = MockLibrary(self.config)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self._counts: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def count(self, path: str):
+        with self._counts_lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+
+    def request_count(self) -> int:
+        """Requests served since the last reset"""
+        with self._counts_lock:
+            return sum(self._counts.values())
+
+    def reset_counts(self):
+        with self._counts_lock:
+            self._counts.clear()
+
+    def handle_error(self, request, client_address):
+        # Clients closing keep-alive connections or cancelling downloads are expected
+        import sys
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    """Run the mock server in the foreground"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Local mock of the Suno API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workspaces", type=int, default=MockConfig.workspaces)
+    parser.add_argument("--clips", type=int, default=MockConfig.clips_per_workspace)
+    parser.add_argument("--latency-ms", type=float, default=MockConfig.latency_ms)
+    parser.add_argument("--mp3-bytes", type=int, default=MockConfig.mp3_bytes)
+    args = parser.parse_args()
+
+    config = MockConfig(workspaces=args.workspaces, clips_per_workspace=args.clips,
+                        latency_ms=args.latency_ms, mp3_bytes=args.mp3_bytes)
+    server = MockSunoServer(config, port=args.port)
+    print(f"Mock Suno API on {server.url} (login stand-in at {server.url}/login)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Suno Music Player
+Runs the real client code against the local mock server and reports
+latency percentiles, throughput and peak memory
+
+Usage:
+    python benchmarks/run_benchmarks.py [--clips 2000] [--json results.json]
+    python benchmarks/run_benchmarks.py --baseline results.json   # fail on regressions
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Keep tokens, caches and downloads out of the real ~/.suno_player
+_HOME = tempfile.mkdtemp(prefix="suno-bench-")
+os.environ['HOME'] = _HOME
+os.environ['USERPROFILE'] = _HOME
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from mock_server import MockConfig, MockSunoServer  # noqa: E402
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Result:
+    """Timings of one benchmark"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.samples: List[float] = []
+        self.units = 0.0            # items or bytes processed across all samples
+        self.unit_name = ""
+        self.requests = 0
+        self.peak_rss_mb: Optional[float] = None
+        self.skipped = ""
+
+    def to_dict(self) -> Dict:
+        total = sum(self.samples)
+        return {
+            'iterations': len(self.samples),
+            'p50_ms': percentile(self.samples, 0.5) * 1000,
+            'p99_ms': percentile(self.samples, 0.99) * 1000,
+            'mean_ms': total / len(self.samples) * 1000 if self.samples else 0.0,
+            'throughput': self.units / total if total else 0.0,
+            'throughput_unit': f"{self.unit_name}/s" if self.unit_name else "",
+            'requests': self.requests,
+            'peak_rss_mb': self.peak_rss_mb,
+            'skipped': self.skipped,
+        }
+
+
+def make_token(lifetime: float = 3600) -> str:
+    """Unsigned-looking JWT long enough to pass the client's format checks"""
+    import jwt
+    return jwt.encode({'sub': 'bench', 'exp': int(time.time() + lifetime), 'sid': 's' * 64},
+                      'benchmark-secret', algorithm='HS256')
+
+
+def make_api(server: MockSunoServer, token: str, cache=None):
+    from api import SunoAPI
+    from transport import Transport
+    api = SunoAPI(token, transport=Transport(), cache=cache)
+    api.base_url = server.url
+    return api
+
+
+def timed(result: Result, iterations: int, fn: Callable[[], float], server: MockSunoServer):
+    """Run fn repeatedly; fn returns how many units it processed"""
+    server.reset_counts()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result.units += fn()
+        result.samples.append(time.perf_counter() - started)
+    result.requests = server.request_count()
+    result.peak_rss_mb = peak_rss_mb()
+
+
+def bench_pagination(server, token, iterations) -> List[Result]:
+    """Listing every workspace's clips: no cache, warm cache, and 304 revalidation"""
+    from metadata_cache import MetadataCache
+    workspace_ids = [ws['id'] for ws in server.library.workspaces]
+    results = []
+
+    def list_all(api, revalidate=False):
+        def run():
+            return sum(len(api.get_all_clips(ws, revalidate=revalidate)) for ws in workspace_ids)
+        return run
+
+    result = Result("api_pagination_uncached")
+    result.unit_name = "clips"
+    timed(result, iterations, list_all(make_api(server, token)), server)
+    results.append(result)
+
+    cache = MetadataCache(Path(_HOME) / "bench-metadata.db")
+    api = make_api(server, token, cache)
+    list_all(api)()  # fill the cache
+
+    result = Result("api_pagination_fresh_cache")
+    result.unit_name = "clips"
+    timed(result, iterations, list_all(api), server)
+    results.append(result)
+
+    result = Result("api_pagination_revalidate_304")
+    result.unit_name = "clips"
+    timed(result, iterations, list_all(api, revalidate=True), server)
+    results.append(result)
+
+    result = Result("api_clip_details_uncached")
+    result.unit_name = "clips"
+    clip_ids = list(server.library.clip_by_id)[:50]
+    uncached = make_api(server, token)
+    timed(result, iterations,
+          lambda: sum(1 for clip_id in clip_ids if uncached.get_clip_details(clip_id)), server)
+    results.append(result)
+    cache.clear()
+    return results
+
+
+def bench_auth(server, token, iterations) -> List[Result]:
+    """Server-side token validation round trip"""
+    from auth import AuthManager
+    manager = AuthManager()
+    manager.api_base = server.url
+    result = Result("auth_validate_token")
+    result.unit_name = "checks"
+    timed(result, iterations, lambda: 1 if manager._validate_token(token) else 0, server)
+    return [result]
+
+
+def bench_downloads(server, token, iterations) -> List[Result]:
+    """DownloadWorker on its own and four at a time"""
+    from download_manager import DownloadWorker
+    clip_ids = list(server.library.clip_by_id)
+    out_dir = Path(_HOME) / "downloads"
+    out_dir.mkdir(exist_ok=True)
+    counter = iter(range(10 ** 9))
+
+    def download_one() -> int:
+        n = next(counter)
+        clip_id = clip_ids[n % len(clip_ids)]
+        path = out_dir / f"{n}.mp3"
+        errors = []
+        worker = DownloadWorker(f"{server.url}/audio/{clip_id}.mp3", str(path))
+        worker.error.connect(errors.append)
+        worker.run()
+        if errors:
+            raise RuntimeError(errors[0])
+        size = path.stat().st_size
+        path.unlink()
+        return size
+
+    results = []
+    result = Result("download_worker_single")
+    result.unit_name = "bytes"
+    timed(result, iterations, download_one, server)
+    results.append(result)
+
+    result = Result("download_worker_4_parallel")
+    result.unit_name = "bytes"
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        timed(result, iterations,
+              lambda: sum(pool.map(lambda _: download_one(), range(4))), server)
+    results.append(result)
+    return results
+
+
+def bench_table(server, token, iterations) -> List[Result]:
+    """MusicPlayer.load_clips_table with the whole library, rendered offscreen"""
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError as e:
+        result = Result("table_load_render")
+        result.skipped = f"PyQt5 not available: {e}"
+        return [result]
+
+    from main import MusicPlayer
+    from models import Clip
+
+    class BenchPlayer(MusicPlayer):
+        """Window without sign-in, tray or stall probes"""
+        def finish_startup(self):
+            pass
+
+    app = QApplication.instance() or QApplication([])
+    player = BenchPlayer()
+    player.show()
+    app.processEvents()
+
+    clips = [Clip.from_dict(dict(clip, audio_url=f"{server.url}/audio/{clip['id']}.mp3"))
+             for clips in server.library.clips.values() for clip in clips]
+
+    def load() -> int:
+        player.current_clips = list(clips)
+        player.load_clips_table()
+        # Let the view lay out and paint what the model change queued
+        app.processEvents()
+        return len(clips)
+
+    def search() -> int:
+        player.filter_edit.blockSignals(True)
+        player.filter_edit.setText("dream lofi")
+        player.run_search()
+        app.processEvents()
+        player.filter_edit.setText("")
+        player.filter_edit.blockSignals(False)
+        return 1
+
+    results = []
+    result = Result("table_load_render")
+    result.unit_name = "rows"
+    timed(result, iterations, load, server)
+    results.append(result)
+
+    player.search_index.add_clips(clips)
+    result = Result("table_search_render")
+    result.unit_name = "queries"
+    timed(result, iterations, search, server)
+    results.append(result)
+
+    player.close()
+    return results
+
+
+BENCHMARKS = {
+    'pagination': bench_pagination,
+    'auth': bench_auth,
+    'downloads': bench_downloads,
+    'table': bench_table,
+}
+
+
+def print_report(results: List[Result], config: MockConfig):
+    print(f"\nLibrary: {config.workspaces} workspaces x {config.clips_per_workspace} clips, "
+          f"{config.latency_ms:g} ms API latency, {config.mp3_bytes / 1024 / 1024:.1f} MB MP3s\n")
+    print(f"{'benchmark':<32}{'iter':>6}{'p50 ms':>10}{'p99 ms':>10}"
+          f"{'throughput':>22}{'requests':>10}{'peak RSS':>11}")
+    for result in results:
+        row = result.to_dict()
+        if result.skipped:
+            print(f"{result.name:<32}  skipped: {result.skipped}")
+            continue
+        throughput = row['throughput']
+        unit = row['throughput_unit']
+        if result.unit_name == 'bytes':
+            throughput, unit = throughput / 1024 / 1024, "MB/s"
+        rss = f"{row['peak_rss_mb']:.0f} MB" if row['peak_rss_mb'] is not None else "n/a"
+        print(f"{result.name:<32}{row['iterations']:>6}{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+              f"{throughput:>14,.1f} {unit:<7}{row['requests']:>10}{rss:>11}")
+    print()
+
+
+def compare(results: Dict[str, Dict], baseline_file: str, tolerance: float) -> List[str]:
+    """Benchmarks whose p50 got slower than the baseline by more than `tolerance`"""
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f).get('results', {})
+    regressions = []
+    for name, row in results.items():
+        before = baseline.get(name)
+        if not before or row['skipped'] or before.get('skipped') or not before['p50_ms']:
+            continue
+        if row['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {before['p50_ms']:.1f} ms -> {row['p50_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Suno Music Player against a mock API")
+    parser.add_argument("--workspaces", type=int, default=MockConfig.workspaces)
+    parser.add_argument("--clips", type=int, default=MockConfig.clips_per_workspace,
+                        help="clips per workspace")
+    parser.add_argument("--latency-ms", type=float, default=MockConfig.latency_ms)
+    parser.add_argument("--mp3-bytes", type=int, default=MockConfig.mp3_bytes)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS),
+                        help="run only these benchmark groups")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --json")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p50 slowdown against the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    config = MockConfig(workspaces=args.workspaces, clips_per_workspace=args.clips,
+                        latency_ms=args.latency_ms, mp3_bytes=args.mp3_bytes)
+    token = make_token()
+    config.token = token
+
+    results: List[Result] = []
+    with MockSunoServer(config) as server:
+        for name in args.only or BENCHMARKS:
+            print(f"Running {name}...")
+            results.extend(BENCHMARKS[name](server, token, args.iterations))
+
+    print_report(results, config)
+    rows = {result.name: result.to_dict() for result in results}
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(config), 'results': rows}, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(rows, args.baseline, args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == '__main__':
+    main()
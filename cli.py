@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Command line for Suno Music Player
+Lists, syncs and bulk-downloads a library without a display, for scripts
+and scheduled backups
+
+Usage:
+    suno-player                                  # start the desktop app
+    suno-player list [--workspace ID] [--json]
+    suno-player sync [--full] [--json]
+    suno-player download [ID ...] [--all] -o DIR [--jobs N] [--json]
+    suno-player login
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+
+COMMANDS = ('list', 'sync', 'download', 'login')
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_NO_TOKEN = 2
+
+
+class Output:
+    """One line per event, as JSON or as short text
+
+    Library code reports through print(); that is sent to stderr so stdout
+    carries nothing but these lines.
+    """
+
+    def __init__(self, stream: TextIO, as_json: bool):
+        self.stream = stream
+        self.as_json = as_json
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        if self.as_json:
+            line = json.dumps({'event': event, 'time': round(time.time(), 3), **fields})
+        else:
+            line = self._text(event, fields)
+            if line is None:
+                return
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    @staticmethod
+    def _text(event: str, fields) -> Optional[str]:
+        if event == 'progress':
+            # Too chatty for a terminal
+            return None
+        if event == 'workspace':
+            return f"{fields['id']}  {fields['clip_count']:>6} clips  {fields['name']}"
+        if event == 'clip':
+            return (f"{fields['id']}  {fields['status']:<10} {fields['duration']:>7.1f}s  "
+                    f"{fields['title']}")
+        if event == 'done':
+            return f"✓ {fields['path']} ({fields['bytes'] / 1024 / 1024:.1f} MB)"
+        if event == 'error':
+            subject = fields.get('title') or fields.get('clip_id') or fields.get('workspace_id')
+            return f"✗ {subject}: {fields['error']}" if subject else f"✗ {fields['error']}"
+        if event == 'skipped':
+            return f"- {fields['path']} ({fields['reason']})"
+        return f"{event}: " + ", ".join(f"{k}={v}" for k, v in fields.items())
+
+
+def get_token(args, auth) -> Optional[str]:
+    """Token from the command line, the saved one, or a silent browser-session renewal"""
+    return (args.token or os.environ.get('SUNO_TOKEN') or auth.get_valid_token()
+            or auth.refresh_token())
+
+
+def make_api(token: str, auth, base_url: Optional[str] = None):
+    from api import SunoAPI
+    from metadata_cache import MetadataCache
+    api = SunoAPI(token, cache=MetadataCache(), on_unauthorized=auth.refresh_token)
+    if base_url:
+        api.base_url = base_url.rstrip('/')
+    return api
+
+
+def cmd_list(api, args, out: Output) -> int:
+    if args.workspace:
+        for clip in api.get_all_clips(args.workspace, revalidate=True):
+            out.emit('clip', id=clip.id, title=clip.title, status=clip.status,
+                     created_at=clip.created_at, duration=clip.duration,
+                     audio_url=clip.audio_url)
+        return EXIT_OK
+    for ws in api.get_all_workspaces(revalidate=True):
+        out.emit('workspace', id=ws.id, name=ws.name, clip_count=ws.clip_count,
+                 updated_at=ws.updated_at)
+    return EXIT_OK
+
+
+def cmd_sync(api, args, out: Output) -> int:
+    """Refresh the metadata cache, fetching clips only for workspaces that changed"""
+    from sync import LibrarySync, WorkspaceDelta
+
+    # Start from what the cache already knows so only differences are fetched
+    library = LibrarySync()
+    cached = api.cached_workspaces() or []
+    library.set_workspaces(cached)
+    for ws in cached:
+        clips = api.cached_clips(ws.id)
+        if clips is not None:
+            library.set_clips(ws.id, clips)
+
+    def report(delta):
+        if isinstance(delta, WorkspaceDelta):
+            out.emit('workspaces', total=len(delta.workspaces), inserted=len(delta.inserted),
+                     updated=len(delta.updated), removed=len(delta.removed))
+        else:
+            out.emit('clips', workspace_id=delta.workspace_id, total=len(delta.clips),
+                     inserted=len(delta.inserted), updated=len(delta.updated),
+                     removed=len(delta.removed))
+
+    started = time.monotonic()
+    always = [ws.id for ws in cached] if args.full else []
+    library.sync(api, True, always, report)
+    out.emit('summary', seconds=round(time.monotonic() - started, 3))
+    return EXIT_OK
+
+
+def cmd_download(api, args, out: Output) -> int:
+    """Download every finished clip of the chosen workspaces, several at a time"""
+    from transfer import clip_output_path, download_file
+
+    workspaces = api.get_all_workspaces(revalidate=True)
+    if not args.all:
+        wanted = set(args.workspaces)
+        missing = wanted - {ws.id for ws in workspaces}
+        for workspace_id in sorted(missing):
+            out.emit('error', workspace_id=workspace_id, error="no such workspace")
+        workspaces = [ws for ws in workspaces if ws.id in wanted]
+        if missing:
+            return EXIT_FAILED
+
+    # (clip, output path) for everything to fetch
+    work = []
+    skipped = 0
+    failed_listings = 0
+    for ws in workspaces:
+        folder = Path(args.output)
+        if len(workspaces) > 1 or args.all:
+            name = "".join(c for c in ws.name if c.isalnum() or c in (' ', '-', '_')).strip()
+            folder = folder / (name or ws.id)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        used_paths = set()
+        # Oldest first, so clips added later never take an existing file's name
+        try:
+            clips = api.get_all_clips(ws.id, revalidate=True, expected=ws.clip_count)
+        except Exception as e:
+            failed_listings += 1
+            out.emit('error', workspace_id=ws.id, error=str(e))
+            continue
+        clips.sort(key=lambda c: c.created_at)
+        for clip in clips:
+            path = clip_output_path(clip, str(folder), used_paths)
+            if not clip.is_ready:
+                continue
+            if Path(path).exists():
+                skipped += 1
+                out.emit('skipped', clip_id=clip.id, path=path, reason="exists")
+                continue
+            work.append((clip, path))
+
+    out.emit('queued', workspaces=len(workspaces), clips=len(work), skipped=skipped)
+    started = time.monotonic()
+    total_bytes = 0
+    failed = 0
+
+    def fetch(clip, path):
+        out.emit('start', clip_id=clip.id, title=clip.title, path=path)
+        began = time.monotonic()
+        api.audio_urls.with_url(clip, lambda audio_url: download_file(
+            audio_url, path, fsync=not args.no_fsync,
+            on_progress=lambda done, total: out.emit(
+                'progress', clip_id=clip.id, bytes=done, total=total)))
+        size = Path(path).stat().st_size
+        out.emit('done', clip_id=clip.id, path=path, bytes=size,
+                 seconds=round(time.monotonic() - began, 3))
+        return size
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(fetch, clip, path): clip for clip, path in work}
+        for future in as_completed(futures):
+            clip = futures[future]
+            try:
+                total_bytes += future.result()
+            except Exception as e:
+                failed += 1
+                out.emit('error', clip_id=clip.id, title=clip.title, error=str(e))
+
+    seconds = time.monotonic() - started
+    out.emit('summary', done=len(work) - failed, failed=failed, skipped=skipped,
+             bytes=total_bytes, seconds=round(seconds, 3),
+             bytes_per_second=round(total_bytes / seconds) if seconds else 0)
+    return EXIT_FAILED if failed or failed_listings else EXIT_OK
+
+
+def cmd_login(out: Output) -> int:
+    """Interactive sign-in (needs a browser); the token is saved for later runs"""
+    from auth import AuthManager
+    token = AuthManager().authenticate()
+    out.emit('login', ok=bool(token))
+    return EXIT_OK if token else EXIT_NO_TOKEN
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="suno-player",
+        description="Suno Music Player. Without a command, starts the desktop app.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="print JSON lines")
+    common.add_argument("--token", help="API token (default: $SUNO_TOKEN or the saved login)")
+    common.add_argument("--api-url", help="API base URL, e.g. a local mock server")
+
+    commands = parser.add_subparsers(dest="command")
+    list_parser = commands.add_parser("list", parents=[common],
+                                      help="list workspaces, or the clips of one")
+    list_parser.add_argument("--workspace", help="list this workspace's clips")
+
+    sync_parser = commands.add_parser("sync", parents=[common],
+                                      help="refresh the local metadata cache")
+    sync_parser.add_argument("--full", action="store_true",
+                             help="check every workspace, not only those that changed")
+
+    download_parser = commands.add_parser("download", parents=[common],
+                                          help="download finished clips of workspaces")
+    download_parser.add_argument("workspaces", nargs="*", metavar="WORKSPACE_ID")
+    download_parser.add_argument("--all", action="store_true", help="every workspace")
+    download_parser.add_argument("-o", "--output", required=True, help="destination folder")
+    download_parser.add_argument("-j", "--jobs", type=int, default=4,
+                                 help="parallel transfers (default 4)")
+    download_parser.add_argument("--no-fsync", action="store_true",
+                                 help="don't flush each file to disk before renaming it")
+
+    commands.add_parser("login", parents=[common], help="sign in with a browser")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point for the suno-player command"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS + ('-h', '--help'):
+        # No command: the desktop app, which parses its own options
+        import main as gui
+        gui.main()
+        return
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'download' and not (args.all or args.workspaces):
+        parser.error("name workspaces to download, or pass --all")
+
+    out = Output(sys.stdout, args.json)
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.command == 'login':
+            sys.exit(cmd_login(out))
+
+        from auth import AuthManager
+        auth = AuthManager()
+        token = get_token(args, auth)
+        if not token:
+            out.emit('error', error="not signed in; run `suno-player login` on a machine "
+                                    "with a browser, or pass --token / set SUNO_TOKEN")
+            sys.exit(EXIT_NO_TOKEN)
+        api = make_api(token, auth, args.api_url)
+        handler = {'list': cmd_list, 'sync': cmd_sync, 'download': cmd_download}[args.command]
+        try:
+            code = handler(api, args, out)
+        except BrokenPipeError:
+            # The reader went away (e.g. piped into head); don't fail again flushing stdout
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            code = EXIT_FAILED
+        except Exception as e:
+            # A listing that couldn't be fetched
+            out.emit('error', error=str(e))
+            code = EXIT_FAILED
+        sys.exit(code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Clip table model for Suno Music Player
+Column-oriented Qt model so the view only formats the rows it paints
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PyQt5.QtGui import QBrush, QColor
+
+from models import Clip
+
+
+COLUMNS = ["#", "Title", "Status", "Created", "Duration"]
+COL_NUMBER, COL_TITLE, COL_STATUS, COL_CREATED, COL_DURATION = range(len(COLUMNS))
+
+# Shared brushes instead of a new QColor per cell
+STATUS_BRUSHES = {
+    'success': QBrush(QColor(144, 238, 144)),
+    'queued': QBrush(QColor(255, 200, 124)),
+}
+DEFAULT_STATUS_BRUSH = QBrush(QColor(200, 200, 200))
+
+CENTERED = int(Qt.AlignCenter)
+LEFT = int(Qt.AlignLeft | Qt.AlignVCenter)
+
+
+class ClipTableModel(QAbstractTableModel):
+    """Clips stored as parallel columns, formatted lazily in data()"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._clips: List[Clip] = []
+        self._titles: List[str] = []
+        self._statuses: List[str] = []
+        self._created: List[str] = []
+        self._durations = array('d')
+        self._rows: Dict[str, int] = {}  # clip id -> row
+
+    def set_clips(self, clips: List[Clip]):
+        """Replace every row"""
+        self.beginResetModel()
+        self._clips = []
+        self._titles = []
+        self._statuses = []
+        self._created = []
+        self._durations = array('d')
+        self._rows = {}
+        self._extend(clips)
+        self.endResetModel()
+
+    def insert_clips(self, row: int, clips: List[Clip]):
+        """Add rows before `row`"""
+        if not clips:
+            return
+        row = max(0, min(row, len(self._clips)))
+        self.beginInsertRows(QModelIndex(), row, row + len(clips) - 1)
+        self._clips[row:row] = clips
+        self._titles[row:row] = [clip.title for clip in clips]
+        self._statuses[row:row] = [clip.status for clip in clips]
+        self._created[row:row] = [clip.created_date for clip in clips]
+        self._durations[row:row] = array('d', (clip.duration for clip in clips))
+        self._reindex(row)
+        self.endInsertRows()
+
+    def update_clips(self, clips: Iterable[Clip]):
+        """Refresh the rows of clips already shown, matched by id"""
+        last = len(COLUMNS) - 1
+        for clip in clips:
+            row = self._rows.get(clip.id)
+            if row is None:
+                continue
+            self._clips[row] = clip
+            self._titles[row] = clip.title
+            self._statuses[row] = clip.status
+            self._created[row] = clip.created_date
+            self._durations[row] = clip.duration
+            self.dataChanged.emit(self.index(row, 0), self.index(row, last))
+
+    def remove_clips(self, clip_ids: Iterable[str]):
+        """Drop the rows of these clips"""
+        rows = sorted((self._rows[i] for i in clip_ids if i in self._rows), reverse=True)
+        if not rows:
+            return
+        for row in rows:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._clips[row]
+            del self._titles[row]
+            del self._statuses[row]
+            del self._created[row]
+            del self._durations[row]
+            self.endRemoveRows()
+        self._rows = {}
+        self._reindex(0)
+
+    def append_clips(self, clips: List[Clip]):
+        """Add rows at the end"""
+        if not clips:
+            return
+        start = len(self._clips)
+        self.beginInsertRows(QModelIndex(), start, start + len(clips) - 1)
+        self._extend(clips)
+        self.endInsertRows()
+
+    def clip_at(self, row: int) -> Optional[Clip]:
+        """The clip shown in a source row"""
+        if 0 <= row < len(self._clips):
+            return self._clips[row]
+        return None
+
+    def _reindex(self, start: int):
+        for row in range(start, len(self._clips)):
+            self._rows[self._clips[row].id] = row
+
+    def _extend(self, clips: List[Clip]):
+        start = len(self._clips)
+        self._clips.extend(clips)
+        self._titles.extend(clip.title for clip in clips)
+        self._statuses.extend(clip.status for clip in clips)
+        self._created.extend(clip.created_date for clip in clips)
+        self._durations.extend(clip.duration for clip in clips)
+        self._reindex(start)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._clips)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+
+        if role == Qt.DisplayRole:
+            if col == COL_NUMBER:
+                return str(row + 1)
+            if col == COL_TITLE:
+                return self._titles[row]
+            if col == COL_STATUS:
+                return self._statuses[row]
+            if col == COL_CREATED:
+                return self._created[row]
+            duration = self._durations[row]
+            return f"{duration:g}s" if duration else "N/A"
+
+        if role == Qt.UserRole:
+            # Raw values for sorting
+            if col == COL_NUMBER:
+                return row
+            if col == COL_TITLE:
+                return self._titles[row].lower()
+            if col == COL_STATUS:
+                return self._statuses[row]
+            if col == COL_CREATED:
+                return self._created[row]
+            return self._durations[row]
+
+        if role == Qt.TextAlignmentRole:
+            return LEFT if col == COL_TITLE else CENTERED
+
+        if role == Qt.BackgroundRole and col == COL_STATUS:
+            return STATUS_BRUSHES.get(self._statuses[row], DEFAULT_STATUS_BRUSH)
+
+        return None
+
+
+class ClipFilterProxy(QSortFilterProxyModel):
+    """Sorts on raw column values and filters by title text and status"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(Qt.UserRole)
+        self.setFilterKeyColumn(COL_TITLE)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self._status: Optional[str] = None
+
+    def set_status_filter(self, status: Optional[str]):
+        """Only show clips with this status (None shows all)"""
+        self._status = status
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._status is not None:
+            index = self.sourceModel().index(source_row, COL_STATUS, source_parent)
+            if self.sourceModel().data(index, Qt.UserRole) != self._status:
+                return False
+        return super().filterAcceptsRow(source_row, source_parent)
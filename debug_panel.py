@@ -0,0 +1,165 @@
+"""
+Debug panel for Suno Music Player
+Event-loop stall detection and a live view of the metrics registry
+"""
+
+import time
+from typing import Optional
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (
+    QDialog, QFileDialog, QHBoxLayout, QMessageBox, QPlainTextEdit, QPushButton,
+    QVBoxLayout, QWidget
+)
+
+from metrics import MetricsRegistry, get_metrics
+
+
+# How often the GUI thread is pinged, and how late a ping must be to count (ms)
+STALL_PROBE_INTERVAL = 50
+STALL_THRESHOLD = 100
+
+STALL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class StallMonitor(QObject):
+    """Measures how late a fixed-rate timer fires on the GUI thread
+
+    Anything that blocks the event loop delays the next tick by the same
+    amount, so the lateness is the stall length.
+    """
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.metrics = metrics or get_metrics()
+        self.metrics.describe('ui_stall_seconds', "Event loop stalls longer than the threshold")
+        self._last = 0.0
+        self._timer = QTimer(self)
+        self._timer.setInterval(STALL_PROBE_INTERVAL)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._last = time.perf_counter()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        late = (now - self._last) * 1000 - STALL_PROBE_INTERVAL
+        self._last = now
+        if late >= STALL_THRESHOLD:
+            self.metrics.observe('ui_stall_seconds', late / 1000, buckets=STALL_BUCKETS)
+
+
+class MetricsPanel(QDialog):
+    """Live metrics with JSON / Prometheus export"""
+
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None,
+                 parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.metrics = metrics or get_metrics()
+        self.setWindowTitle("Debug - Metrics")
+        self.resize(760, 560)
+
+        layout = QVBoxLayout()
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        font = QFont("Monospace")
+        font.setStyleHint(QFont.TypeWriter)
+        self.text.setFont(font)
+        layout.addWidget(self.text)
+
+        buttons = QHBoxLayout()
+        for label, slot in (("Export JSON", self.export_json),
+                            ("Export Prometheus", self.export_prometheus),
+                            ("Reset", self.reset)):
+            button = QPushButton(label)
+            button.clicked.connect(slot)
+            buttons.addWidget(button)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        # Refreshed only while the panel is open
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_INTERVAL)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Redraw the metrics, keeping the scroll position"""
+        scroll = self.text.verticalScrollBar().value()
+        self.text.setPlainText(self.render_text())
+        self.text.verticalScrollBar().setValue(scroll)
+
+    def render_text(self) -> str:
+        snapshot = self.metrics.snapshot()
+        lines = [f"uptime {snapshot['uptime_seconds']:.0f} s", ""]
+
+        if snapshot['histograms']:
+            lines.append(f"{'histogram':<48}{'count':>7}{'p50':>10}{'p90':>10}"
+                         f"{'p99':>10}{'max':>10}")
+            for name, series in snapshot['histograms'].items():
+                for entry in series:
+                    value = entry['value']
+                    lines.append(
+                        f"{self._series_name(name, entry['labels']):<48}{value['count']:>7}"
+                        f"{self._ms(value['p50'])}{self._ms(value['p90'])}"
+                        f"{self._ms(value['p99'])}{self._ms(value['max'])}"
+                    )
+            lines.append("")
+
+        for kind in ('counters', 'gauges'):
+            if snapshot[kind]:
+                lines.append(kind)
+                for name, series in snapshot[kind].items():
+                    for entry in series:
+                        lines.append(f"  {self._series_name(name, entry['labels']):<46}"
+                                     f"{entry['value']:>14,.0f}")
+                lines.append("")
+        return "\n".join(lines)
+
+    def export_json(self):
+        self._export("metrics.json", "JSON (*.json)", self.metrics.to_json())
+
+    def export_prometheus(self):
+        self._export("metrics.prom", "Prometheus text (*.prom *.txt)",
+                     self.metrics.to_prometheus())
+
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
+
+    def _export(self, default_name: str, file_filter: str, content: str):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", default_name, file_filter)
+        if not path:
+            return
+        try:
+            with open(path, 'w') as f:
+                f.write(content)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not export metrics: {e}")
+
+    @staticmethod
+    def _series_name(name: str, labels) -> str:
+        if not labels:
+            return name
+        return name + "{" + ",".join(f"{k}={v}" for k, v in labels.items()) + "}"
+
+    @staticmethod
+    def _ms(seconds: float) -> str:
+        return f"{seconds * 1000:>8.1f}ms"
@@ -0,0 +1,399 @@
+"""
+Download manager for Suno Music Player
+Queues clip downloads, runs several at once, resumes partial files and
+keeps the queue across restarts
+"""
+
+import json
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from jobs import JobRunner
+from metrics import get_metrics
+from models import Clip
+from transfer import clip_output_path, download_file
+
+
+# Histogram bounds for whole-file download time (seconds)
+DOWNLOAD_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Finished downloads remembered for offline playback, oldest dropped first
+MAX_FINISHED = 1000
+
+# Delay before the queue is written after a change (ms)
+SAVE_DELAY_MS = 1000
+
+# Task states
+PENDING = 'pending'
+ACTIVE = 'active'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class DownloadWorker(QObject):
+    """Worker thread for downloading files
+
+    Data is written to ``<output_path>.part`` and renamed when complete. If a
+    partial file is already there, the transfer resumes with a Range request.
+    """
+    progress = pyqtSignal(int)
+    bytes_progress = pyqtSignal(int, int)  # downloaded, total (0 if unknown)
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, url: str, output_path: str, fsync: bool = True):
+        super().__init__()
+        self.url = url
+        self.output_path = output_path
+        # Flush the file to disk before it is renamed into place
+        self.fsync = fsync
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop after the current chunk, keeping the partial file for resume"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            self.download(self.url)
+        except Exception as e:
+            self.error.emit(str(e))
+
+    def download(self, url: str):
+        """Transfer from `url`, raising on failure instead of emitting `error`"""
+        self.url = url
+        completed = download_file(url, self.output_path, on_progress=self._report,
+                                  is_cancelled=lambda: self.cancelled, fsync=self.fsync)
+        if completed:
+            self.finished.emit(self.output_path)
+
+    def _report(self, downloaded: int, total_size: int):
+        self.bytes_progress.emit(downloaded, total_size)
+        if total_size:
+            self.progress.emit(int(downloaded / total_size * 100))
+
+
+@dataclass
+class DownloadTask:
+    """One queued clip download"""
+    clip_id: str
+    title: str
+    output_path: str
+    status: str = PENDING
+    downloaded: int = 0
+    total: int = 0
+    error: str = ""
+    audio_url: str = ""   # from the clip listing, if it had one
+
+    def clip(self) -> Clip:
+        """The clip as far as the URL resolver needs it"""
+        return Clip(self.clip_id, self.title, 'success', audio_url=self.audio_url)
+
+
+class DownloadStats(NamedTuple):
+    """Aggregate progress of the download queue"""
+    total: int
+    done: int
+    failed: int
+    active: int
+    bytes_per_second: float
+    eta_seconds: Optional[float]
+
+
+class DownloadManager(QObject):
+    """Queue of clip downloads run with a concurrency limit
+
+    Finished tasks stay in the queue (and its counts) until the next batch
+    is queued or the app restarts; then they move to `finished`, a compact
+    clip id -> file map used to play downloads offline.
+    """
+    task_changed = pyqtSignal(object)   # DownloadTask
+    stats_changed = pyqtSignal(object)  # DownloadStats
+
+    # Seconds of transfer history used for the throughput estimate
+    RATE_WINDOW = 5.0
+
+    def __init__(self, max_concurrent: int = 4, state_file: Optional[Path] = None,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        if state_file is None:
+            state_file = Path.home() / ".suno_player" / "downloads.json"
+        state_file.parent.mkdir(exist_ok=True)
+        self.state_file = state_file
+        self.max_concurrent = max_concurrent
+        self.api = None
+        self.download_dir: Optional[str] = None
+
+        self.jobs = JobRunner(max_threads=max_concurrent, parent=self)
+        # One thread, so queue snapshots reach the disk in the order they were taken
+        self._writer = JobRunner(max_threads=1, parent=self)
+        self.tasks: List[DownloadTask] = []
+        self.finished: Dict[str, str] = {}
+        self._workers: Dict[str, DownloadWorker] = {}
+        self._started_at: Dict[str, float] = {}
+        self._samples = deque()  # (timestamp, bytes transferred this session)
+        self._session_bytes = 0
+        # Changes come in bursts; write the queue once they settle
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self._write_state)
+        self._load_state()
+
+    def set_api(self, api):
+        """Attach an API client and start any queued downloads"""
+        self.api = api
+        self._pump()
+
+    def enqueue(self, clips: Iterable[Clip], download_dir: str) -> int:
+        """Queue clips for download into a folder; returns how many were added"""
+        self.download_dir = download_dir
+        if not any(t.status in (PENDING, ACTIVE) for t in self.tasks):
+            # The previous batch is over; count this one afresh
+            self._compact()
+        queued = {(t.clip_id, str(Path(t.output_path).parent)) for t in self.tasks
+                  if t.status in (PENDING, ACTIVE)}
+        downloaded = dict(self.finished)
+        downloaded.update((t.clip_id, t.output_path) for t in self.tasks if t.status == DONE)
+        # Files of earlier downloads stay reserved, but only for their own clip
+        used_paths = {t.output_path for t in self.tasks if t.status != DONE}
+        used_paths.update(downloaded.values())
+
+        added = []
+        for clip in clips:
+            if not clip.is_ready:
+                continue
+            if (clip.id, str(Path(download_dir))) in queued:
+                continue
+
+            earlier = downloaded.get(clip.id)
+            if earlier is not None and Path(earlier).parent == Path(download_dir):
+                # Downloading a clip again replaces its file rather than adding a copy
+                output_path = earlier
+            else:
+                output_path = clip_output_path(clip, download_dir, used_paths)
+            added.append(DownloadTask(clip.id, clip.title, output_path,
+                                      audio_url=clip.audio_url))
+
+        if added:
+            replaced = {task.output_path for task in added}
+            self.tasks = [t for t in self.tasks
+                          if not (t.status == DONE and t.output_path in replaced)]
+            self.tasks.extend(added)
+            self._save_state()
+            if self.api is not None:
+                # Resolve the whole batch up front instead of one URL per slot;
+                # clips whose listing carried a fresh URL cost no request
+                self.jobs.submit(self.api.audio_urls.resolve_many,
+                                 [t.clip() for t in added])
+            self._pump()
+            self._emit_stats()
+        return len(added)
+
+    def retry_failed(self):
+        """Re-queue every failed download"""
+        for task in self.tasks:
+            if task.status == FAILED:
+                task.status = PENDING
+                task.error = ""
+        self._save_state()
+        self._pump()
+
+    def pause(self):
+        """Stop transfers but keep them queued until an API client is attached again
+
+        A stopped worker may still be finishing its last chunk; its task is
+        not restarted until it has let go of the .part file.
+        """
+        self.api = None
+        for worker in self._workers.values():
+            worker.cancel()
+        self._started_at.clear()
+        for task in self.tasks:
+            if task.status == ACTIVE:
+                task.status = PENDING
+                self.task_changed.emit(task)
+        self._save_state()
+        self._emit_stats()
+
+    def local_file(self, clip_id: str) -> Optional[str]:
+        """Path of a finished download of a clip, if it is still on disk"""
+        path = self.finished.get(clip_id)
+        for task in list(self.tasks):
+            if task.clip_id == clip_id and task.status == DONE:
+                path = task.output_path
+        return path if path and os.path.exists(path) else None
+
+    def shutdown(self):
+        """Pause transfers for exit; unfinished tasks resume next launch"""
+        for worker in self._workers.values():
+            worker.cancel()
+        self.jobs.shutdown()
+        self._save_timer.stop()
+        self._writer.shutdown()
+        self._dump_state(self.state_file, self._state())
+
+    def stats(self) -> DownloadStats:
+        """Aggregate counts, throughput and estimated time remaining"""
+        done = [t for t in self.tasks if t.status == DONE]
+        failed = sum(1 for t in self.tasks if t.status == FAILED)
+        active = [t for t in self.tasks if t.status == ACTIVE]
+        pending = sum(1 for t in self.tasks if t.status == PENDING)
+
+        rate = self._rate()
+        eta = None
+        if rate > 0:
+            sizes = [t.total for t in done if t.total]
+            avg_size = sum(sizes) / len(sizes) if sizes else 0
+            remaining = sum(max(0, t.total - t.downloaded) for t in active if t.total)
+            remaining += pending * avg_size
+            eta = remaining / rate
+        return DownloadStats(len(self.tasks), len(done), failed, len(active), rate, eta)
+
+    def _pump(self):
+        """Start pending tasks up to the concurrency limit"""
+        if self.api is None:
+            return
+        active = sum(1 for t in self.tasks if t.status == ACTIVE)
+        for task in self.tasks:
+            if active >= self.max_concurrent:
+                break
+            if task.status == PENDING and task.output_path not in self._workers:
+                self._start(task)
+                active += 1
+
+    def _start(self, task: DownloadTask):
+        task.status = ACTIVE
+        self._started_at[task.clip_id] = time.monotonic()
+        worker = DownloadWorker("", task.output_path)
+        # Keyed by file: two workers must never write the same .part
+        self._workers[task.output_path] = worker
+
+        worker.bytes_progress.connect(lambda done, total: self._on_bytes(task, done, total))
+        worker.finished.connect(lambda path: self._on_finished(task, DONE))
+
+        job = self.jobs.submit(self._resolve_and_run, worker, task.clip(),
+                               on_error=lambda message: self._on_finished(task, FAILED, message))
+        job.signals.finished.connect(lambda: self._on_worker_exit(worker))
+        self.task_changed.emit(task)
+        self._save_state()
+
+    def _resolve_and_run(self, worker: DownloadWorker, clip: Clip):
+        """Look up the audio URL, then download (runs in a worker thread)"""
+        self.api.audio_urls.with_url(clip, worker.download)
+
+    def _on_bytes(self, task: DownloadTask, downloaded: int, total: int):
+        if task.downloaded < downloaded:
+            self._session_bytes += downloaded - task.downloaded
+            get_metrics().inc('download_bytes_total', downloaded - task.downloaded)
+        task.downloaded = downloaded
+        task.total = total
+        self._samples.append((time.monotonic(), self._session_bytes))
+        self._emit_stats()
+
+    def _on_worker_exit(self, worker: DownloadWorker):
+        """A worker's thread is done with its file; a paused task may restart now"""
+        if self._workers.get(worker.output_path) is worker:
+            del self._workers[worker.output_path]
+        self._pump()
+
+    def _on_finished(self, task: DownloadTask, status: str, error: str = ""):
+        if task.status != ACTIVE:
+            return
+        task.status = status
+        task.error = error
+        metrics = get_metrics()
+        metrics.inc('downloads_total', status=status)
+        started = self._started_at.pop(task.clip_id, None)
+        if status == DONE and started is not None:
+            metrics.observe('download_seconds', time.monotonic() - started,
+                            buckets=DOWNLOAD_BUCKETS)
+        self.task_changed.emit(task)
+        self._save_state()
+        self._pump()
+        self._emit_stats()
+
+    def _rate(self) -> float:
+        """Bytes per second over the recent window"""
+        now = time.monotonic()
+        while self._samples and now - self._samples[0][0] > self.RATE_WINDOW:
+            self._samples.popleft()
+        if len(self._samples) < 2:
+            return 0.0
+        (t0, b0), (t1, b1) = self._samples[0], self._samples[-1]
+        return (b1 - b0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def _emit_stats(self):
+        stats = self.stats()
+        get_metrics().set('download_bytes_per_second', stats.bytes_per_second)
+        get_metrics().set('downloads_active', stats.active)
+        self.stats_changed.emit(stats)
+
+    def _load_state(self):
+        """Restore the queue saved by a previous run"""
+        try:
+            with open(self.state_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.download_dir = data.get('download_dir')
+        for item in data.get('tasks', []):
+            try:
+                task = DownloadTask(**item)
+            except TypeError:
+                continue
+            if task.status == ACTIVE:
+                # Interrupted mid-transfer; its .part file lets it resume
+                task.status = PENDING
+            self.tasks.append(task)
+        finished = data.get('finished')
+        if isinstance(finished, dict):
+            self.finished = finished
+        # Last run's finished downloads are history now
+        self._compact()
+
+    def _compact(self):
+        """Move finished tasks out of the queue into `finished`"""
+        for task in self.tasks:
+            if task.status == DONE:
+                # Re-inserted so the most recent downloads are dropped last
+                self.finished.pop(task.clip_id, None)
+                self.finished[task.clip_id] = task.output_path
+        self.tasks = [t for t in self.tasks if t.status != DONE]
+        while len(self.finished) > MAX_FINISHED:
+            del self.finished[next(iter(self.finished))]
+
+    def _save_state(self):
+        """Write the queue once the current burst of changes settles"""
+        if not self._save_timer.isActive():
+            self._save_timer.start()
+
+    def _write_state(self):
+        """Persist the queue in the background"""
+        self._writer.submit(self._dump_state, self.state_file, self._state())
+
+    def _state(self) -> Dict:
+        """Snapshot of what to persist, so the writer never sees a change half made"""
+        return {
+            'download_dir': self.download_dir,
+            'tasks': [asdict(t) for t in self.tasks],
+            'finished': dict(self.finished),
+        }
+
+    @staticmethod
+    def _dump_state(state_file: Path, data: Dict):
+        """Write the queue atomically (runs in a worker thread)"""
+        tmp_file = state_file.with_suffix(".tmp")
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_file, state_file)
+        except OSError as e:
+            print(f"Warning: Could not save download queue: {e}")
@@ -0,0 +1,97 @@
+"""
+Background search indexing for Suno Music Player
+Prepares clips for the search index in a worker thread and merges them on
+the GUI thread a slice at a time
+"""
+
+import gc
+import time
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+
+from jobs import JobRunner
+from models import Clip
+from search_index import PreparedClips, SearchIndex, prepare_clips
+
+
+# Clips per merge step, and GUI time spent merging per event loop turn (seconds)
+CHUNK_SIZE = 25
+SLICE_SECONDS = 0.008
+
+
+def prepare_chunks(clips: List[Clip], workspace_id: str) -> List[PreparedClips]:
+    """Prepare clips in small batches so each merges quickly (runs in a worker thread)"""
+    return [prepare_clips(clips[start:start + CHUNK_SIZE], workspace_id)
+            for start in range(0, len(clips), CHUNK_SIZE)]
+
+
+class SearchIndexer(QObject):
+    """Keeps a SearchIndex up to date without stalling the window
+
+    Lyrics decoding and trigram extraction run on one worker thread, so
+    updates are prepared in the order they were asked for. The merges then
+    happen between events, at most SLICE_SECONDS at a time.
+    """
+
+    def __init__(self, index: SearchIndex, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.index = index
+        self.jobs = JobRunner(max_threads=1, parent=self)
+        self._pending = deque()  # PreparedClips, clip ids to remove, or callbacks
+        self._frozen = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._merge_slice)
+
+    def add_clips(self, clips: Iterable[Clip], workspace_id: str = "",
+                  removed: Iterable[str] = (), then: Optional[Callable[[], None]] = None):
+        """Index clips after dropping `removed` ids, then call `then` on the GUI thread"""
+        removed = list(removed)
+        self.jobs.submit(prepare_chunks, list(clips), workspace_id,
+                         on_result=lambda chunks: self._queue(removed, chunks, then))
+
+    def freeze_when_done(self):
+        """Once what was asked for so far is merged, keep it out of full GC passes
+
+        Those walk every posting set and pause for most of a second on a large
+        library. Meant for the bulk load at startup and done only once, after
+        a full collection so no garbage is frozen; later updates stay
+        collectable.
+        """
+        self.add_clips([], then=self._freeze)
+
+    def shutdown(self):
+        self._timer.stop()
+        self._pending.clear()
+        self.jobs.shutdown()
+
+    def _queue(self, removed: List[str], chunks: List[PreparedClips], then):
+        if removed:
+            self._pending.append(removed)
+        self._pending.extend(chunks)
+        if then is not None:
+            self._pending.append(then)
+        self._timer.start()
+
+    def _merge_slice(self):
+        deadline = time.perf_counter() + SLICE_SECONDS
+        while self._pending and time.perf_counter() < deadline:
+            item = self._pending.popleft()
+            if isinstance(item, PreparedClips):
+                self.index.add_prepared(item)
+            elif isinstance(item, list):
+                for clip_id in item:
+                    self.index.remove_clip(clip_id)
+            else:
+                item()
+        if not self._pending:
+            self._timer.stop()
+
+    def _freeze(self):
+        if self._frozen:
+            return
+        self._frozen = True
+        gc.collect()
+        gc.freeze()
@@ -0,0 +1,143 @@
+"""
+Background jobs for Suno Music Player
+Runs blocking work (HTTP, disk I/O) on a QThreadPool and delivers results
+back to the GUI thread through signals
+"""
+
+from typing import Callable, Dict, Hashable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled"""
+
+
+class JobSignals(QObject):
+    """Signals emitted by a job (delivered on the thread that connected them)"""
+    result = pyqtSignal(object)
+    progress = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+
+class Job(QRunnable):
+    """A single unit of background work"""
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self.cancelled = False
+        # The runner keeps its own reference; don't let Qt delete the wrapper
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        """Ask the job to stop; its result will not be delivered"""
+        self.cancelled = True
+
+    def report(self, value):
+        """Send intermediate progress to the GUI thread"""
+        if self.cancelled:
+            raise JobCancelled()
+        self.signals.progress.emit(value)
+
+    def run(self):
+        try:
+            if self.cancelled:
+                return
+            result = self.fn(*self.args, **self.kwargs)
+            if not self.cancelled:
+                self.signals.result.emit(result)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+        finally:
+            self.signals.finished.emit()
+
+
+class JobRunner(QObject):
+    """Submits jobs to a thread pool, coalescing duplicate requests by key
+
+    Submitting a job under a key that is already in flight attaches the new
+    callbacks to the running job instead of starting a second one.
+    """
+
+    def __init__(self, max_threads: int = 8, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._jobs: Dict[Hashable, Job] = {}
+        self._anonymous = set()
+
+    def submit(self, fn: Callable, *args, key: Optional[Hashable] = None,
+               on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None,
+               on_progress: Optional[Callable] = None, **kwargs) -> Job:
+        """Run fn(*args, **kwargs) in the background
+
+        When on_progress is given, fn also receives ``report=`` to call with
+        progress values; it raises JobCancelled once the job is cancelled.
+        """
+        job = self._jobs.get(key) if key is not None else None
+        if job is not None and not job.cancelled:
+            self._connect(job, on_result, on_error, on_progress)
+            return job
+
+        job = Job(fn, args, kwargs)
+        if on_progress is not None:
+            job.kwargs['report'] = job.report
+        self._connect(job, on_result, on_error, on_progress)
+        job.signals.finished.connect(lambda: self._forget(key, job))
+
+        if key is not None:
+            old = self._jobs.get(key)
+            if old is not None:
+                old.cancel()
+            self._jobs[key] = job
+        else:
+            self._anonymous.add(job)
+
+        self.pool.start(job)
+        return job
+
+    def cancel(self, key: Hashable):
+        """Cancel the job running under a key, if any"""
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job.cancel()
+            if self.pool.tryTake(job):
+                # Never started, so it will not emit finished itself
+                job.signals.finished.emit()
+
+    def is_running(self, key: Hashable) -> bool:
+        """Check whether a job is in flight under a key"""
+        return key in self._jobs
+
+    def shutdown(self, timeout_ms: int = 3000):
+        """Cancel everything and wait briefly for running jobs"""
+        for job in list(self._jobs.values()) + list(self._anonymous):
+            job.cancel()
+        self.pool.clear()
+        self.pool.waitForDone(timeout_ms)
+
+    def _connect(self, job: Job, on_result, on_error, on_progress):
+        # Re-check cancellation on the GUI side: a result may already be queued
+        if on_result is not None:
+            job.signals.result.connect(
+                lambda value: None if job.cancelled else on_result(value))
+        if on_error is not None:
+            job.signals.error.connect(
+                lambda message: None if job.cancelled else on_error(message))
+        if on_progress is not None:
+            job.signals.progress.connect(
+                lambda value: None if job.cancelled else on_progress(value))
+
+    def _forget(self, key: Optional[Hashable], job: Job):
+        if key is not None and self._jobs.get(key) is job:
+            del self._jobs[key]
+        self._anonymous.discard(job)
@@ -4,78 +4,86 @@ Suno Music Player
 A beautiful PyQt5 application to browse, play and download Suno music
 
 Usage:
-    python main.py
+    python main.py [--profile-startup]
 """
 
+import time
+# Taken before anything heavy is imported, for --profile-startup
+STARTED_AT = time.perf_counter()
+
+import argparse
 import sys
-import os
-import json
-import requests
 from pathlib import Path
-from datetime import datetime
-import pygame
+from typing import TYPE_CHECKING, Optional
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QLabel, QPushButton, QSlider,
-    QComboBox, QFileDialog, QMessageBox, QProgressBar,
-    QSystemTrayIcon, QMenu, QHeaderView, QDialog, QSpinBox
+    QTableView, QAbstractItemView, QLineEdit, QLabel, QPushButton, QSlider,
+    QComboBox, QFileDialog, QMessageBox,
+    QSystemTrayIcon, QMenu, QHeaderView
 )
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QObject, QSize
-from PyQt5.QtGui import QIcon, QColor, QFont
-from PyQt5.QtWidgets import QApplication
-import requests
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QIcon, QFont
 from auth import AuthManager
-from api import SunoAPI
+from api import OfflineError, SunoAPI
+from audio_cache import AudioCache
+from clip_model import ClipFilterProxy, ClipTableModel
+from download_manager import DownloadManager, DownloadStats
+from indexer import SearchIndexer
+from jobs import JobRunner
+from metadata_cache import MetadataCache
+from metrics import get_metrics
+from models import Clip
+from play_queue import PlayQueue, REPEAT_ALL, REPEAT_OFF, REPEAT_ONE
+from playback import Mp3FrameIndex, PlaybackEngine
+from search_index import SearchIndex
+from startup import StartupProfile
+from status_watcher import StatusWatcher
+from streaming import DEFAULT_PREROLL_BYTES, ProgressiveDownload
+from sync import LibrarySync, WorkspaceDelta, diff_clips
+from transport import get_transport
+from waveform_bar import WaveformBar
 
+if TYPE_CHECKING:
+    from analysis import TrackAnalysis
 
-class DownloadWorker(QObject):
-    """Worker thread for downloading files"""
-    progress = pyqtSignal(int)
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
-    
-    def __init__(self, url: str, output_path: str):
-        super().__init__()
-        self.url = url
-        self.output_path = output_path
-    
-    def run(self):
-        try:
-            response = requests.get(self.url, stream=True)
-            total_size = int(response.headers.get('content-length', 0))
-            
-            with open(self.output_path, 'wb') as f:
-                downloaded = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total_size:
-                            percent = (downloaded / total_size) * 100
-                            self.progress.emit(int(percent))
-            
-            self.finished.emit(self.output_path)
-        except Exception as e:
-            self.error.emit(str(e))
+
+def format_time(seconds: float) -> str:
+    """m:ss for the progress labels"""
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+# Wait at least this long before another automatic login after one failed (seconds)
+RENEW_RETRY_DELAY = 60
+
+# QTimer intervals are 32-bit milliseconds; longer waits are re-armed
+MAX_TIMER_SECONDS = 24 * 3600
+
+# While offline, how often the server is probed, backing off to the maximum (seconds)
+RECONNECT_INTERVAL = 15
+RECONNECT_MAX_INTERVAL = 300
 
 
 class MusicPlayer(QMainWindow):
     """Main application window"""
+    # A worker thread obtained a new token
+    token_renewed = pyqtSignal(str)
+    # A worker thread could not reach the server
+    connection_lost = pyqtSignal()
     
-    def __init__(self):
+    def __init__(self, profile: StartupProfile = None):
         super().__init__()
         self.setWindowTitle("Suno Music Player")
         self.setGeometry(100, 100, 1400, 800)
         self.setMinimumSize(1000, 600)
+        self.profile = profile or StartupProfile()
         
-        # Initialize pygame mixer for audio playback
-        try:
-            pygame.mixer.init()
-        except:
-            print("Warning: Could not initialize audio mixer")
+        # The audio mixer is started by the playback engine on first play
         
         # State variables
         self.auth_manager = AuthManager()
+        self.metadata_cache = MetadataCache()
+        self.audio_cache = AudioCache()
         self.api = None
         self.token = None
         self.workspaces = []
@@ -83,17 +91,69 @@ class MusicPlayer(QMainWindow):
         self.current_clip = None
         self.is_playing = False
         self.current_file_path = None
+        self.stream = None
+        self.stream_title = ""
+        self.jobs = JobRunner(parent=self)
+        self.clips_job_key = None
+        self.play_job_key = None
+        self.download_manager = DownloadManager(parent=self)
+        self.search_index = SearchIndex()
+        # Fills the index off the GUI thread; searches see each batch once merged
+        self.indexer = SearchIndexer(self.search_index, self)
+        self.library_sync = LibrarySync()
+        self.status_watcher = StatusWatcher(self.jobs, parent=self)
+        self.status_watcher.clips_changed.connect(self.on_clip_statuses_changed)
+        self.status_watcher.clip_finished.connect(self.notify_clip_finished)
+        self.play_queue = PlayQueue()
+        self.prefetch_count = 2
+        self.playing_clip = None
+        self.queued_clip = None
+        self.track_analysis = None
+        self.tray_icon = None
+        self.notify_action = None
+        self.last_renew_failure = 0.0
+        self.metrics = get_metrics()
+        self.play_requested_at = 0.0
+        self.stall_monitor = None
+        self.metrics_panel = None
+        self.preroll_bytes = DEFAULT_PREROLL_BYTES
+        
+        # Position updates are pushed by the engine only while audio plays
+        self.engine = PlaybackEngine(parent=self)
+        self.engine.position_changed.connect(self.update_player_state)
+        self.engine.finished.connect(self.on_track_finished)
+        self.engine.advanced.connect(self.on_gapless_transition)
+        self.engine.error.connect(self.on_playback_error)
+        
+        # Tokens are renewed shortly before they expire, or after a 401
+        self.token_refresh_timer = QTimer(self)
+        self.token_refresh_timer.setSingleShot(True)
+        self.token_refresh_timer.timeout.connect(self.refresh_token)
+        self.token_renewed.connect(self.on_token_renewed)
+        
+        # Offline, the library is served from the caches until the server answers again
+        self.offline = False
+        self.reconnect_delay = RECONNECT_INTERVAL
+        self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.setSingleShot(True)
+        self.reconnect_timer.timeout.connect(self.try_reconnect)
+        self.connection_lost.connect(self.go_offline)
         
         # Setup UI
         self.setup_ui()
-        self.setup_tray()
+        self.profile.mark("window built")
         
-        # Update timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_player_state)
-        self.timer.start(100)
-        
-        # Authenticate and load data
+        # Everything else waits until the window has been shown
+        QTimer.singleShot(0, self.finish_startup)
+    
+    def finish_startup(self):
+        """Set up the tray and sign in once the event loop is running"""
+        self.profile.mark("window shown")
+        from debug_panel import StallMonitor
+        self.stall_monitor = StallMonitor(self.metrics, parent=self)
+        self.stall_monitor.start()
+        self.setup_tray()
+        self.profile.mark("tray icon")
         self.authenticate()
     
     def setup_ui(self):
@@ -117,32 +177,66 @@ class MusicPlayer(QMainWindow):
         top_layout.addWidget(self.workspace_combo)
         
         refresh_btn = QPushButton("🔄 Refresh")
-        refresh_btn.clicked.connect(self.refresh_workspaces)
+        refresh_btn.clicked.connect(lambda: self.refresh_workspaces(revalidate=True))
         top_layout.addWidget(refresh_btn)
         
         logout_btn = QPushButton("🔐 Re-login")
         logout_btn.clicked.connect(self.relogin)
         top_layout.addWidget(logout_btn)
         
+        debug_btn = QPushButton("📊 Debug")
+        debug_btn.clicked.connect(self.show_metrics_panel)
+        top_layout.addWidget(debug_btn)
+        
+        self.connection_label = QLabel("⚠ Offline - showing saved library")
+        self.connection_label.setStyleSheet("color: #d08000; font-weight: bold;")
+        self.connection_label.hide()
+        top_layout.addWidget(self.connection_label)
+        
         top_layout.addStretch()
+        
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Search titles, tags, lyrics...")
+        self.filter_edit.setMaximumWidth(250)
+        self.filter_edit.textChanged.connect(self.run_search)
+        top_layout.addWidget(self.filter_edit)
+        
+        self.status_filter_combo = QComboBox()
+        self.status_filter_combo.addItem("All statuses", None)
+        for status in ("success", "queued", "streaming", "error"):
+            self.status_filter_combo.addItem(status, status)
+        top_layout.addWidget(self.status_filter_combo)
+        
         main_layout.addLayout(top_layout)
         
         # Songs table
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["#", "Title", "Status", "Created", "Duration"])
+        self.clip_model = ClipTableModel(self)
+        self.clip_proxy = ClipFilterProxy(self)
+        self.clip_proxy.setSourceModel(self.clip_model)
+        self.status_filter_combo.currentIndexChanged.connect(
+            lambda: self.clip_proxy.set_status_filter(self.status_filter_combo.currentData()))
+        
+        self.table = QTableView()
+        self.table.setModel(self.clip_proxy)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        # Uniform row heights let the view skip measuring every row
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.AscendingOrder)
         self.table.setAlternatingRowColors(True)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #ddd;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #0078d4;
                 color: white;
             }
         """)
-        self.table.itemSelectionChanged.connect(self.on_track_selected)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.selectionModel().selectionChanged.connect(self.on_track_selected)
         main_layout.addWidget(self.table)
         
         # Player section
@@ -156,11 +250,17 @@ class MusicPlayer(QMainWindow):
         self.now_playing_label.setFont(font)
         player_layout.addWidget(self.now_playing_label)
         
+        # Waveform of the playing track, drawn from its cached analysis
+        self.waveform_bar = WaveformBar()
+        self.waveform_bar.seek_requested.connect(self.engine.seek)
+        player_layout.addWidget(self.waveform_bar)
+        
         # Progress bar
         progress_layout = QHBoxLayout()
         self.time_label_start = QLabel("0:00")
         self.progress_slider = QSlider(Qt.Horizontal)
-        self.progress_slider.sliderMoved.connect(self.seek_player)
+        self.progress_slider.setRange(0, 0)
+        self.progress_slider.sliderReleased.connect(self.seek_player)
         self.time_label_end = QLabel("0:00")
         progress_layout.addWidget(self.time_label_start)
         progress_layout.addWidget(self.progress_slider, 1)
@@ -185,6 +285,32 @@ class MusicPlayer(QMainWindow):
         self.stop_btn.setMinimumWidth(100)
         control_layout.addWidget(self.stop_btn)
         
+        prev_btn = QPushButton("⏮")
+        prev_btn.clicked.connect(self.play_previous)
+        control_layout.addWidget(prev_btn)
+        
+        next_btn = QPushButton("⏭")
+        next_btn.clicked.connect(self.play_next)
+        control_layout.addWidget(next_btn)
+        
+        self.shuffle_btn = QPushButton("🔀 Shuffle")
+        self.shuffle_btn.setCheckable(True)
+        self.shuffle_btn.toggled.connect(self.set_shuffle)
+        control_layout.addWidget(self.shuffle_btn)
+        
+        self.repeat_combo = QComboBox()
+        self.repeat_combo.addItem("Repeat off", REPEAT_OFF)
+        self.repeat_combo.addItem("Repeat all", REPEAT_ALL)
+        self.repeat_combo.addItem("Repeat one", REPEAT_ONE)
+        self.repeat_combo.currentIndexChanged.connect(self.set_repeat)
+        control_layout.addWidget(self.repeat_combo)
+        
+        self.normalize_btn = QPushButton("🔊 Normalize")
+        self.normalize_btn.setCheckable(True)
+        self.normalize_btn.setChecked(True)
+        self.normalize_btn.toggled.connect(self.apply_track_gain)
+        control_layout.addWidget(self.normalize_btn)
+        
         # Volume control
         control_layout.addSpacing(20)
         control_layout.addWidget(QLabel("Volume:"))
@@ -201,9 +327,18 @@ class MusicPlayer(QMainWindow):
         download_btn.setMinimumWidth(100)
         control_layout.addWidget(download_btn)
         
+        download_all_btn = QPushButton("⬇ Download Workspace")
+        download_all_btn.clicked.connect(self.download_workspace)
+        control_layout.addWidget(download_all_btn)
+        
         control_layout.addStretch()
         player_layout.addLayout(control_layout)
         
+        # Download queue status
+        self.download_status_label = QLabel("")
+        self.download_manager.stats_changed.connect(self.update_download_status)
+        player_layout.addWidget(self.download_status_label)
+        
         main_layout.addLayout(player_layout)
         
         central_widget.setLayout(main_layout)
@@ -225,6 +360,12 @@ class MusicPlayer(QMainWindow):
         
         tray_menu.addSeparator()
         
+        self.notify_action = tray_menu.addAction("Notify When Tracks Finish")
+        self.notify_action.setCheckable(True)
+        self.notify_action.setChecked(True)
+        
+        tray_menu.addSeparator()
+        
         quit_action = tray_menu.addAction("Exit")
         quit_action.triggered.connect(QApplication.quit)
         
@@ -236,126 +377,516 @@ class MusicPlayer(QMainWindow):
         self.tray_icon.activated.connect(self.tray_activated)
     
     def set_tray_icon(self):
-        """Set tray icon"""
+        """Set tray icon, drawing it in the background the first time"""
+        icon_path = Path.home() / ".suno_player" / "icon.png"
+        if icon_path.exists():
+            self.apply_icon(icon_path)
+        else:
+            self.jobs.submit(self._draw_icon, icon_path, on_result=self.apply_icon,
+                             on_error=lambda message: print(f"Error drawing icon: {message}"))
+    
+    @staticmethod
+    def _draw_icon(icon_path: Path) -> Path:
+        """Draw and save the icon (runs in a worker thread)"""
         from PIL import Image, ImageDraw
         img = Image.new('RGB', (64, 64), color='#0078d4')
         draw = ImageDraw.Draw(img)
         draw.text((18, 20), "SUNO", fill='white')
         
-        icon_path = Path.home() / ".suno_player" / "icon.png"
         icon_path.parent.mkdir(exist_ok=True)
         img.save(icon_path)
-        
+        return icon_path
+    
+    def apply_icon(self, icon_path: Path):
         self.tray_icon.setIcon(QIcon(str(icon_path)))
         self.setWindowIcon(QIcon(str(icon_path)))
     
     def authenticate(self):
-        """Handle authentication"""
-        # Try to get cached token
+        """Handle authentication
+        
+        A saved, unexpired token is used straight away so cached listings
+        show without waiting on the network; if the server turns it down,
+        the API client renews it on the first 401. Otherwise browser login
+        runs in the background and the UI is filled in once a token is
+        available.
+        """
+        token = self.auth_manager.cached_token()
+        if token:
+            self.on_authenticated(token)
+            return
+        
+        self.profile.finish("login required")
+        self.now_playing_label.setText("Signing in...")
+        # Browse what is cached while the login runs
+        self.show_cached_library()
+        self.jobs.submit(self._obtain_token, key='auth',
+                         on_result=self.on_authenticated,
+                         on_error=lambda message: self.on_authenticated(None))
+    
+    def _obtain_token(self):
+        """Get a cached token or log in (runs in a worker thread)"""
         token = self.auth_manager.get_valid_token()
         
         if not token:
             # Need new authentication
             token = self.auth_manager.authenticate()
         
+        return token
+    
+    def on_authenticated(self, token):
+        """Finish authentication once a token is known"""
         if not token:
-            QMessageBox.critical(self, "Authentication Error", "Failed to authenticate with Suno")
-            sys.exit(1)
+            self.profile.finish("login failed")
+            self.now_playing_label.setText("Not signed in - use Re-login to try again")
+            self.go_offline()
+            return
         
+        self.profile.mark("token ready")
+        reconnected = self.offline or self.api is not None
+        self.offline = False
+        self.reconnect_timer.stop()
+        self.connection_label.hide()
         self.token = token
-        self.api = SunoAPI(token)
+        self.api = SunoAPI(token, cache=self.metadata_cache,
+                           on_unauthorized=self._renew_token,
+                           on_connection_lost=self.connection_lost.emit)
+        self.now_playing_label.setText("No track selected")
+        self.download_manager.set_api(self.api)
+        self.download_manager.retry_failed()
+        self.status_watcher.set_api(self.api)
+        self.schedule_token_refresh()
         
-        # Verify and load data
-        session_info = self.api.get_session_info()
+        # The user's name is kept with the token, so it is fetched once per token
+        session_info = self.auth_manager.cached_session(token)
+        if session_info:
+            self.on_session_info(session_info)
+        else:
+            self.jobs.submit(self._fetch_session_info, self.api, key='session',
+                             on_result=self.on_session_info)
+        # After offline browsing, check everything shown against the server
+        self.refresh_workspaces(revalidate=reconnected)
+    
+    def show_cached_library(self):
+        """Fill the UI from the metadata cache without touching the network"""
+        if self.api is None:
+            self.api = SunoAPI(self.token or "", cache=self.metadata_cache)
+            self.api.offline = True
+        if not self.workspaces:
+            self.refresh_workspaces()
+    
+    def go_offline(self):
+        """Keep working from the local caches until the server is reachable again"""
+        if self.offline:
+            return
+        self.offline = True
+        self.connection_label.show()
+        self.show_cached_library()
+        self.api.offline = True
+        # Downloads and status polls wait for the connection to come back
+        self.download_manager.pause()
+        self.status_watcher.set_api(None)
+        self.reconnect_delay = RECONNECT_INTERVAL
+        self.reconnect_timer.start(self.reconnect_delay * 1000)
+    
+    def try_reconnect(self):
+        """Probe the server in the background"""
+        self.jobs.submit(self._probe_connection, self.token, key='reconnect',
+                         on_result=self.on_reconnect_probe,
+                         on_error=lambda message: self.on_reconnect_probe(None))
+    
+    def _probe_connection(self, token: Optional[str]) -> Optional[str]:
+        """A usable token if the server answers, else None (runs in a worker thread)"""
+        try:
+            # Any HTTP answer will do; an expired token is renewed on the first 401
+            get_transport().get(f"{self.api.base_url}/api/session/", timeout=5)
+        except Exception:
+            return None
+        # Without a token, only a silent renewal from the saved browser session is tried
+        return token or self.auth_manager.refresh_token()
+    
+    def on_reconnect_probe(self, token: Optional[str]):
+        """Go back online, or wait longer before the next probe"""
+        if not self.offline:
+            return
+        if token:
+            self.on_authenticated(token)
+            return
+        self.reconnect_delay = min(self.reconnect_delay * 2, RECONNECT_MAX_INTERVAL)
+        self.reconnect_timer.start(self.reconnect_delay * 1000)
+    
+    def _fetch_session_info(self, api: SunoAPI):
+        """Get and remember the session info (runs in a worker thread)"""
+        session_info = api.get_session_info()
+        self.auth_manager.save_session(api.token, session_info)
+        return session_info
+    
+    def on_session_info(self, session_info):
+        """Show the signed-in user"""
         if session_info and 'user' in session_info:
             user_name = session_info['user'].get('name', 'Unknown')
             self.setWindowTitle(f"Suno Music Player - {user_name}")
-        
-        self.refresh_workspaces()
+    
+    def schedule_token_refresh(self):
+        """Arm the timer that renews the token before it expires"""
+        self.token_refresh_timer.stop()
+        delay = self.auth_manager.seconds_until_refresh(self.token) if self.token else None
+        if delay is not None:
+            self.token_refresh_timer.start(int(min(delay, MAX_TIMER_SECONDS) * 1000))
+    
+    def refresh_token(self):
+        """Renew the token in the background once it is close to expiring"""
+        delay = self.auth_manager.seconds_until_refresh(self.token) if self.token else None
+        if delay is None:
+            return
+        if delay > 0:
+            # Woke up early because of the timer limit
+            self.schedule_token_refresh()
+            return
+        self.jobs.submit(self._renew_token, key='auth-refresh',
+                         on_error=lambda message: print(f"Token refresh failed: {message}"))
+    
+    def _renew_token(self):
+        """Get a new token after expiry or a 401 (runs in a worker thread)"""
+        if time.monotonic() - self.last_renew_failure < RENEW_RETRY_DELAY:
+            return None
+        token = self.auth_manager.refresh_token()
+        if token:
+            self.token_renewed.emit(token)
+        else:
+            self.last_renew_failure = time.monotonic()
+        return token
+    
+    def on_token_renewed(self, token: str):
+        """Switch the API client to a renewed token"""
+        self.token = token
+        if self.api is not None and self.api.token != token:
+            self.api.set_token(token)
+        self.schedule_token_refresh()
     
     def relogin(self):
         """Clear token and re-authenticate"""
         self.auth_manager.clear_token()
+        # Cached listings may belong to a different account
+        self.metadata_cache.clear()
         self.authenticate()
     
-    def refresh_workspaces(self):
-        """Refresh list of workspaces"""
+    def refresh_workspaces(self, revalidate: bool = False):
+        """Refresh list of workspaces
+        
+        Cached workspaces and clips are shown straight away, then replaced if
+        the server has something newer.
+        """
         if not self.api:
             return
+        if self.workspaces and self.api.offline:
+            # Nothing newer than what is shown; reconnecting syncs everything
+            return
+        if self.workspaces:
+            # A library is already on screen; patch in only what changed
+            self.sync_library(revalidate)
+            return
         
-        self.workspaces = self.api.get_workspaces()
+        self.jobs.submit(self._fetch_workspaces, self.api, revalidate,
+                         key=('workspaces', revalidate),
+                         on_progress=self.on_workspaces_loaded,
+                         on_result=self.on_workspaces_loaded,
+                         on_error=lambda message: print(f"Error fetching workspaces: {message}"))
+    
+    @staticmethod
+    def _fetch_workspaces(api: SunoAPI, revalidate: bool, report):
+        """Report cached workspaces, then return fresh ones (runs in a worker thread)"""
+        if not revalidate:
+            cached = api.cached_workspaces()
+            if cached:
+                report(cached)
+        return api.get_all_workspaces(revalidate=revalidate)
+    
+    def on_workspaces_loaded(self, workspaces):
+        """Fill the workspace selector, or patch it if cached ones are already shown"""
+        self.profile.finish("library shown")
+        if not self.workspaces:
+            self.populate_workspace_combo(workspaces)
+            self.index_cached_library()
+        elif workspaces != self.workspaces:
+            # The fresh listing is in the metadata cache now, so this costs no request
+            self.sync_library(revalidate=False)
+    
+    @staticmethod
+    def workspace_label(ws) -> str:
+        return f"{ws.name} ({ws.clip_count} clips)"
+    
+    def populate_workspace_combo(self, workspaces):
+        """Fill the workspace selector, keeping the current selection if possible"""
+        previous_id = self.workspace_combo.currentData()
+        self.workspaces = workspaces
+        self.library_sync.set_workspaces(workspaces)
         
         self.workspace_combo.blockSignals(True)
         self.workspace_combo.clear()
         
         for ws in self.workspaces:
-            display_text = f"{ws['name']} ({ws.get('clip_count', 0)} clips)"
-            self.workspace_combo.addItem(display_text, ws['id'])
+            self.workspace_combo.addItem(self.workspace_label(ws), ws.id)
+        
+        index = self.workspace_combo.findData(previous_id)
+        if index >= 0:
+            self.workspace_combo.setCurrentIndex(index)
         
         self.workspace_combo.blockSignals(False)
         
         if self.workspace_combo.count() > 0:
             self.on_workspace_changed()
     
+    def sync_library(self, revalidate: bool = True):
+        """Fetch workspaces, and clips only where something changed, then patch the UI"""
+        open_id = self.workspace_combo.currentData()
+        # An explicit refresh always rechecks the open workspace (cheap 304s if unchanged)
+        always = [open_id] if open_id and revalidate else []
+        self.jobs.submit(self.library_sync.sync, self.api, revalidate, always,
+                         key='sync', on_progress=self.on_library_delta)
+    
+    def on_library_delta(self, delta):
+        """Apply one workspace or clip delta reported by the sync"""
+        if isinstance(delta, WorkspaceDelta):
+            self.apply_workspace_delta(delta)
+        else:
+            self.apply_clip_delta(delta)
+    
+    def apply_workspace_delta(self, delta: WorkspaceDelta):
+        """Add, relabel and remove workspace selector entries in place"""
+        current_id = self.workspace_combo.currentData()
+        self.workspaces = delta.workspaces
+        positions = {ws.id: i for i, ws in enumerate(delta.workspaces)}
+        
+        self.workspace_combo.blockSignals(True)
+        for workspace_id in delta.removed:
+            index = self.workspace_combo.findData(workspace_id)
+            if index >= 0:
+                self.workspace_combo.removeItem(index)
+        for ws in delta.updated:
+            index = self.workspace_combo.findData(ws.id)
+            if index >= 0:
+                self.workspace_combo.setItemText(index, self.workspace_label(ws))
+        for ws in delta.inserted:
+            self.workspace_combo.insertItem(positions[ws.id], self.workspace_label(ws), ws.id)
+        self.workspace_combo.blockSignals(False)
+        
+        if current_id in delta.removed:
+            if self.workspace_combo.count() > 0:
+                self.on_workspace_changed()
+            else:
+                self.current_clips = []
+                self.load_clips_table()
+    
+    def apply_clip_delta(self, delta):
+        """Update the search index, and the table if the workspace is open"""
+        self.indexer.add_clips(delta.inserted + delta.updated, delta.workspace_id,
+                               removed=delta.removed, then=self.refresh_search)
+        self.status_watcher.watch(delta.inserted + delta.updated, delta.workspace_id)
+        
+        if self.clips_job_key is None or self.clips_job_key[1] != delta.workspace_id:
+            return
+        if self.jobs.is_running(self.clips_job_key):
+            # Still loading; the fresh listing reaches the table that way
+            return
+        self.patch_clip_rows(delta.clips)
+    
+    def patch_clip_rows(self, clips):
+        """Bring the table in line with a fresh clip list, touching only changed rows"""
+        delta = diff_clips(self.clips_job_key[1], self.current_clips, clips)
+        self.current_clips = list(clips)
+        if delta.empty:
+            return
+        if self.filter_edit.text().strip():
+            self.run_search()
+            return
+        
+        # New clips go where the server lists them, in runs of adjacent rows
+        positions = {clip.id: i for i, clip in enumerate(clips)}
+        runs = []
+        for clip in delta.inserted:
+            row = positions[clip.id]
+            if runs and runs[-1][0] + len(runs[-1][1]) == row:
+                runs[-1][1].append(clip)
+            else:
+                runs.append((row, [clip]))
+        
+        def update():
+            self.clip_model.remove_clips(delta.removed)
+            self.clip_model.update_clips(delta.updated)
+            for row, run in runs:
+                self.clip_model.insert_clips(row, run)
+        self.update_table('patch', update)
+    
     def on_workspace_changed(self):
         """Handle workspace selection change"""
         if self.workspace_combo.currentIndex() < 0:
             return
         
-        project_id = self.workspace_combo.currentData()
-        self.current_clips = self.api.get_clips(project_id)
-        self.load_clips_table()
+        self.load_workspace_clips(self.workspace_combo.currentData())
+    
+    def load_workspace_clips(self, project_id: str, revalidate: bool = False):
+        """Show a workspace's clips, from cache first when available"""
+        # Only the most recently picked workspace may fill the table
+        if self.clips_job_key is not None:
+            self.jobs.cancel(self.clips_job_key)
+        self.clips_job_key = ('clips', project_id, revalidate)
+        
+        self.current_clips = []
+        self.clip_model.set_clips([])
+        
+        expected = next((ws.clip_count for ws in self.workspaces if ws.id == project_id), None)
+        self.jobs.submit(self._fetch_clips, self.api, project_id, revalidate, expected,
+                         key=self.clips_job_key,
+                         on_progress=self.on_clips_progress,
+                         on_result=self.on_clips_loaded,
+                         on_error=lambda message: print(f"Error fetching clips: {message}"))
+    
+    @staticmethod
+    def _fetch_clips(api: SunoAPI, project_id: str, revalidate: bool,
+                     expected: Optional[int], report):
+        """Report cached or paged clips as they become available (runs in a worker thread)
+        
+        Returns the fresh clip list when cached clips were reported first,
+        None when the pages themselves were streamed.
+        """
+        cached = None if revalidate else api.cached_clips(project_id)
+        
+        if cached is not None:
+            report(('replace', cached))
+            return api.get_all_clips(project_id, expected=expected)
+        
+        # Render each page as it arrives while the next ones are prefetched
+        for page in api.iter_clip_pages(project_id, revalidate=revalidate, expected=expected):
+            report(('append', page))
+        return None
+    
+    def on_clips_progress(self, update):
+        """Render cached clips or a freshly fetched page"""
+        kind, clips = update
+        self.indexer.add_clips(clips, self.clips_job_key[1], then=self.refresh_search)
+        if kind == 'replace':
+            self.current_clips = clips
+            self.load_clips_table()
+        else:
+            start = len(self.current_clips)
+            self.current_clips.extend(clips)
+            self.append_clip_rows(start)
+    
+    def on_clips_loaded(self, clips):
+        """Patch in fresh clips where they differ from the cached ones shown"""
+        if clips is not None and clips != self.current_clips:
+            self.indexer.add_clips(clips, self.clips_job_key[1], then=self.refresh_search)
+            self.patch_clip_rows(clips)
+        self.library_sync.set_clips(self.clips_job_key[1], self.current_clips)
+        self.status_watcher.watch(self.current_clips, self.clips_job_key[1])
+    
+    def on_clip_statuses_changed(self, workspace_id: str, clips):
+        """Update the rows of clips whose generation progressed"""
+        self.indexer.add_clips(clips, workspace_id, then=self.refresh_search)
+        is_open = self.clips_job_key is not None and self.clips_job_key[1] == workspace_id
+        if is_open and not self.jobs.is_running(self.clips_job_key):
+            changed = {clip.id: clip for clip in clips}
+            self.patch_clip_rows([changed.get(clip.id, clip) for clip in self.current_clips])
+    
+    def notify_clip_finished(self, clip: Clip):
+        """Tell the user a generation finished, if they aren't looking"""
+        if self.tray_icon is None or not self.notify_action.isChecked() or self.isActiveWindow():
+            return
+        if clip.is_ready:
+            self.tray_icon.showMessage("Track ready", clip.title, QSystemTrayIcon.Information, 5000)
+        else:
+            self.tray_icon.showMessage("Generation failed", clip.title,
+                                       QSystemTrayIcon.Warning, 5000)
+    
+    def index_cached_library(self):
+        """Add every workspace's cached clips to the search index in the background"""
+        workspace_ids = [ws.id for ws in self.workspaces]
+        self.jobs.submit(self._read_cached_library, self.api, workspace_ids,
+                         key='index', on_progress=self.on_library_cached,
+                         on_result=lambda _: self.indexer.freeze_when_done())
+    
+    @staticmethod
+    def _read_cached_library(api: SunoAPI, workspace_ids, report):
+        """Report cached clips workspace by workspace (runs in a worker thread)"""
+        for workspace_id in workspace_ids:
+            clips = api.cached_clips(workspace_id)
+            if clips:
+                report((workspace_id, clips))
+    
+    def on_library_cached(self, update):
+        """Index one workspace's cached clips"""
+        workspace_id, clips = update
+        if self.clips_job_key is not None and self.clips_job_key[1] == workspace_id:
+            # The open workspace is indexed from its live data instead
+            return
+        self.library_sync.set_clips(workspace_id, clips, replace=False)
+        self.indexer.add_clips(clips, workspace_id, then=self.refresh_search)
+    
+    def refresh_search(self):
+        """Re-run an active search so it sees what was just indexed"""
+        if self.filter_edit.text().strip():
+            self.run_search()
+    
+    def run_search(self):
+        """Show search results across all workspaces, or the current workspace if empty"""
+        if self.filter_edit.text().strip():
+            with self.metrics.timer('search_seconds'):
+                results = self.search_index.search(self.filter_edit.text())
+            self.update_table('search', lambda: self.clip_model.set_clips(results))
+        else:
+            self.update_table('load', lambda: self.clip_model.set_clips(self.current_clips))
     
     def load_clips_table(self):
         """Load clips into table"""
-        self.table.setRowCount(len(self.current_clips))
+        if self.filter_edit.text().strip():
+            self.run_search()
+        else:
+            self.update_table('load', lambda: self.clip_model.set_clips(self.current_clips))
+    
+    def append_clip_rows(self, start: int):
+        """Add table rows for clips from index `start` onwards"""
+        if self.filter_edit.text().strip():
+            self.run_search()
+        else:
+            self.update_table('append',
+                              lambda: self.clip_model.append_clips(self.current_clips[start:]))
+    
+    def update_table(self, operation: str, update):
+        """Apply a change to the clip table, timing the model update and the repaint
         
-        for idx, clip in enumerate(self.current_clips):
-            # Number
-            item = QTableWidgetItem(str(idx + 1))
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(idx, 0, item)
-            
-            # Title
-            item = QTableWidgetItem(clip.get('title', 'N/A'))
-            self.table.setItem(idx, 1, item)
-            
-            # Status
-            status = clip.get('status', 'unknown')
-            item = QTableWidgetItem(status)
-            item.setTextAlignment(Qt.AlignCenter)
-            if status == 'success':
-                item.setBackground(QColor(144, 238, 144))
-            elif status == 'queued':
-                item.setBackground(QColor(255, 200, 124))
-            else:
-                item.setBackground(QColor(200, 200, 200))
-            self.table.setItem(idx, 2, item)
-            
-            # Created date
-            created = clip.get('created_at', '').split('T')[0]
-            item = QTableWidgetItem(created)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(idx, 3, item)
-            
-            # Duration
-            duration = clip.get('duration', 0)
-            duration_str = f"{duration}s" if duration else "N/A"
-            item = QTableWidgetItem(duration_str)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(idx, 4, item)
+        The zero-delay timer fires once the event loop has processed the
+        layout and paint events the update queued.
+        """
+        started = time.perf_counter()
+        update()
+        self.metrics.observe('clip_table_update_seconds', time.perf_counter() - started,
+                             operation=operation)
+        self.metrics.set('clip_table_rows', self.clip_model.rowCount())
+        QTimer.singleShot(0, lambda: self.metrics.observe(
+            'clip_table_render_seconds', time.perf_counter() - started, operation=operation))
+    
+    def selected_clips(self):
+        """Clips in the selected rows, in display order"""
+        rows = self.table.selectionModel().selectedRows()
+        source_rows = sorted(
+            (self.clip_proxy.mapToSource(index).row() for index in rows),
+            key=lambda row: self.clip_proxy.mapFromSource(self.clip_model.index(row, 0)).row()
+        )
+        return [self.clip_model.clip_at(row) for row in source_rows]
     
     def on_track_selected(self):
         """Handle track selection"""
-        selected = self.table.selectedIndexes()
+        selected = self.table.selectionModel().selectedRows()
         if not selected:
             return
         
-        row = selected[0].row()
-        self.current_clip = self.current_clips[row]
+        row = self.clip_proxy.mapToSource(selected[0]).row()
+        self.current_clip = self.clip_model.clip_at(row)
+        if self.current_clip is None:
+            return
         
-        title = self.current_clip.get('title', 'Unknown')
-        status = self.current_clip.get('status', 'unknown')
+        title = self.current_clip.title
+        status = self.current_clip.status
         
         self.now_playing_label.setText(f"Selected: {title} ({status})")
     
@@ -365,118 +896,340 @@ class MusicPlayer(QMainWindow):
             QMessageBox.warning(self, "Error", "Please select a track!")
             return
         
-        if self.current_clip.get('status') != 'success':
+        if not self.current_clip.is_ready:
             QMessageBox.warning(self, "Error", "This track is not ready yet!")
             return
         
-        clip_details = self.api.get_clip_details(self.current_clip['id'])
-        audio_url = clip_details.get('audio_url')
+        # The queue follows the table as currently sorted and filtered
+        visible = (self.clip_model.clip_at(self.clip_proxy.mapToSource(
+            self.clip_proxy.index(row, 0)).row()) for row in range(self.clip_proxy.rowCount()))
+        self.play_queue.set_tracks([clip for clip in visible if clip.is_ready],
+                                   start=self.current_clip)
+        self.play_clip(self.current_clip)
+    
+    def play_clip(self, clip: Clip):
+        """Start playing a clip from the cache or a progressive download"""
+        # A newer play request supersedes one still buffering
+        if self.play_job_key is not None and self.play_job_key != ('play', clip.id):
+            self.jobs.cancel(self.play_job_key)
+        self.play_job_key = ('play', clip.id)
+        self.play_requested_at = time.perf_counter()
         
-        if not audio_url:
-            QMessageBox.warning(self, "Error", "No audio URL found!")
+        self.play_btn.setText("⌛ Loading...")
+        self.jobs.submit(self._prepare_playback, self.api, clip,
+                         key=self.play_job_key,
+                         on_result=lambda source: self.start_playback(source, clip),
+                         on_error=self.on_playback_error)
+    
+    def play_next(self):
+        """Skip to the next track in the queue"""
+        self.play_queued(self.play_queue.advance(skip=True))
+    
+    def play_queued(self, clip: Optional[Clip]):
+        """Play the track the queue moved to, or stop at its end"""
+        if clip is None:
+            self.stop_player()
+            return
+        self.play_clip(clip)
+    
+    def play_previous(self):
+        """Go back to the previous track in the queue"""
+        clip = self.play_queue.back()
+        if clip is not None:
+            self.play_clip(clip)
+    
+    def set_shuffle(self, enabled: bool):
+        """Toggle shuffle for the play queue"""
+        self.play_queue.set_shuffle(enabled)
+        self.requeue_next_track()
+    
+    def set_repeat(self):
+        """Change the repeat mode of the play queue"""
+        self.play_queue.repeat = self.repeat_combo.currentData()
+        self.requeue_next_track()
+    
+    def prefetch_upcoming(self):
+        """Resolve and download the next few tracks in the background"""
+        for clip in self.play_queue.upcoming(self.prefetch_count):
+            if self.api.offline:
+                break
+            if self.audio_cache.contains(clip.id):
+                continue
+            self.jobs.submit(self._prefetch, self.api, clip, key=('prefetch', clip.id),
+                             on_result=lambda path: self.queue_next_track())
+        self.queue_next_track()
+    
+    def _prefetch(self, api: SunoAPI, clip: Clip):
+        """Put a clip's audio in the cache and index it (runs in a worker thread)"""
+        from analysis import TrackAnalysis
+        path = api.audio_urls.with_url(clip, lambda url: self.audio_cache.fetch(clip.id, url))
+        Mp3FrameIndex.for_file(path)
+        TrackAnalysis.for_file(path)
+        return path
+    
+    def queue_next_track(self):
+        """Hand the next track to the engine so it starts without a gap"""
+        if self.queued_clip is not None or self.playing_clip is None:
+            return
+        next_clip = self.play_queue.peek_next()
+        if next_clip is None:
             return
+        path = self.audio_cache.peek(next_clip.id)
+        if path is None:
+            return
+        # Only queue once the frame index is ready; building it here would block the UI
+        index = Mp3FrameIndex.cached(path)
+        if index is None:
+            self.jobs.submit(Mp3FrameIndex.for_file, path, key=('index', next_clip.id),
+                             on_result=lambda index: self.queue_next_track())
+            return
+        
+        if self.engine.queue(path, index):
+            self.queued_clip = next_clip
+    
+    def requeue_next_track(self):
+        """Re-pick the gapless successor after the queue order changed"""
+        if self.queued_clip is not None and self.queued_clip != self.play_queue.peek_next():
+            # pygame can't drop a queued track, so fall back to a normal switch
+            self.queued_clip = None
+            self.engine.cancel_queued()
+        self.prefetch_upcoming()
+    
+    def _prepare_playback(self, api: SunoAPI, clip: Clip):
+        """Find a cached file or buffer a stream for a clip (runs in a worker thread)"""
+        # Recently played clips are served from disk with no network at all
+        audio_path = self.audio_cache.get(clip.id)
+        if audio_path is None:
+            downloaded = self.download_manager.local_file(clip.id)
+            if downloaded:
+                # Copied in so its index and analysis sidecars stay out of the user's folder
+                with open(downloaded, 'rb') as f:
+                    audio_path = self.audio_cache.store(clip.id, iter(lambda: f.read(1 << 20), b''))
+        if audio_path is not None:
+            return audio_path, Mp3FrameIndex.for_file(audio_path)
+        if api.offline:
+            raise OfflineError("This track hasn't been played or downloaded on this computer yet")
+        
+        return api.audio_urls.with_url(clip, lambda url: self._open_stream(clip, url))
+    
+    def _open_stream(self, clip: Clip, audio_url: str) -> ProgressiveDownload:
+        """Start streaming a clip and wait for the pre-roll (runs in a worker thread)"""
+        stream = ProgressiveDownload(clip.id, audio_url, self.audio_cache,
+                                     preroll_bytes=self.preroll_bytes)
+        stream.start()
         
+        if not stream.wait_for_preroll(timeout=30):
+            error = stream.health().error or "timed out while buffering"
+            stream.cancel()
+            # The original error tells an expired URL from other failures
+            raise stream.exception or IOError(error)
+        return stream
+    
+    def start_playback(self, source, clip: Clip):
+        """Hand a cached file or buffered stream to the playback engine"""
+        self.play_job_key = None
         try:
-            # Download to temp file
-            response = requests.get(audio_url, timeout=30)
-            temp_file = Path.home() / ".suno_player" / "temp_play.mp3"
-            temp_file.parent.mkdir(exist_ok=True)
+            self.release_stream()
+            self.queued_clip = None
             
-            with open(temp_file, 'wb') as f:
-                f.write(response.content)
+            if isinstance(source, ProgressiveDownload):
+                self.stream = source
+                self.stream_title = clip.title
+                self.engine.play_stream(source, duration_hint=clip.duration)
+                self.current_file_path = None
+                self.show_track_analysis(clip, None)
+            else:
+                path, index = source
+                self.engine.play_file(path, index, duration_hint=clip.duration)
+                self.current_file_path = str(path)
+                self.show_track_analysis(clip, path)
             
-            # Play with pygame
-            pygame.mixer.music.load(str(temp_file))
-            pygame.mixer.music.play()
             self.is_playing = True
-            self.current_file_path = str(temp_file)
             self.play_btn.setText("⏸ Playing...")
+            self.now_playing_label.setText(f"Playing: {clip.title}")
+            self.metrics.observe('time_to_first_audio_seconds',
+                                 time.perf_counter() - self.play_requested_at,
+                                 source='stream' if self.stream is source else 'cache')
+            
+            self.playing_clip = clip
+            self.prefetch_upcoming()
             
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Playback error: {e}")
+            self.on_playback_error(str(e))
+    
+    def on_playback_error(self, message: str):
+        """Report a failed play request"""
+        self.metrics.inc('playback_errors_total')
+        self.play_job_key = None
+        self.play_btn.setText("▶ Play")
+        QMessageBox.critical(self, "Error", f"Playback error: {message}")
+    
+    def release_stream(self):
+        """Detach the decoder from the current progressive download"""
+        if self.stream is None:
+            return
+        self.engine.stop()
+        self.stream.cancel()
+        self.stream = None
     
     def pause_player(self):
         """Pause/unpause playback"""
         if self.is_playing:
-            pygame.mixer.music.pause()
+            self.engine.pause()
             self.is_playing = False
             self.play_btn.setText("▶ Paused")
-        else:
-            pygame.mixer.music.unpause()
+        elif self.engine.paused:
+            self.engine.resume()
             self.is_playing = True
             self.play_btn.setText("⏸ Playing...")
     
     def stop_player(self):
         """Stop playback"""
-        pygame.mixer.music.stop()
+        self.engine.stop()
         self.is_playing = False
+        self.playing_clip = None
+        self.queued_clip = None
         self.play_btn.setText("▶ Play")
-        self.progress_slider.setValue(0)
+        self.waveform_bar.set_analysis(None)
+        self.update_player_state(0.0, 0.0)
     
-    def seek_player(self, position):
-        """Seek in track (limited by pygame capabilities)"""
-        pass
+    def seek_player(self):
+        """Seek to where the progress slider was released"""
+        self.engine.seek(self.progress_slider.value() / 1000)
     
     def set_volume(self, value):
         """Set player volume"""
-        pygame.mixer.music.set_volume(value / 100.0)
+        self.engine.set_volume(value / 100.0)
+    
+    def update_player_state(self, position: float, duration: float):
+        """Move the progress bar and refresh the buffering status"""
+        if not self.progress_slider.isSliderDown():
+            self.progress_slider.setRange(0, int(duration * 1000))
+            self.progress_slider.setValue(int(position * 1000))
+        self.waveform_bar.set_position(position, duration)
+        self.time_label_start.setText(format_time(position))
+        self.time_label_end.setText(format_time(duration))
+        
+        if self.stream is not None:
+            health = self.stream.health()
+            title = self.stream_title
+            if health.error:
+                self.now_playing_label.setText(f"Playing: {title} (buffering failed)")
+                self.stream = None
+            elif health.complete:
+                # Fully cached now; nothing left to report or cancel
+                self.now_playing_label.setText(f"Playing: {title}")
+                self.current_file_path = str(self.stream.path)
+                self.show_track_analysis(self.playing_clip, self.stream.path)
+                self.stream = None
+            else:
+                rate_kb = health.bytes_per_second / 1024
+                self.now_playing_label.setText(
+                    f"Playing: {title} (buffered {health.percent}%, {rate_kb:.0f} KB/s)"
+                )
+    
+    def on_track_finished(self):
+        """Track ended with nothing queued (next one wasn't cached in time)"""
+        self.queued_clip = None
+        if self.is_playing and self.play_job_key is None:
+            # Ended by itself, so repeat-one plays it again
+            self.play_queued(self.play_queue.advance())
+    
+    def on_gapless_transition(self):
+        """The engine moved on to the queued track; catch the UI and queue up"""
+        self.play_queue.advance()
+        self.playing_clip = self.queued_clip
+        self.queued_clip = None
+        self.current_file_path = str(self.audio_cache.peek(self.playing_clip.id) or "")
+        self.now_playing_label.setText(f"Playing: {self.playing_clip.title}")
+        self.show_track_analysis(self.playing_clip, self.current_file_path or None)
+        self.prefetch_upcoming()
     
-    def update_player_state(self):
-        """Update player state"""
-        if pygame.mixer.music.get_busy() and self.is_playing:
-            pass
+    def show_track_analysis(self, clip: Clip, path):
+        """Draw the waveform and level the volume of the playing track
+        
+        Analyses are computed once per cached file in a worker thread and read
+        back from their sidecar afterwards.
+        """
+        from analysis import TrackAnalysis
+        analysis = TrackAnalysis.cached(path) if path else None
+        self.track_analysis = analysis
+        self.waveform_bar.set_analysis(analysis)
+        self.apply_track_gain()
+        if path and analysis is None:
+            self.jobs.submit(TrackAnalysis.for_file, path, key=('analyze', clip.id),
+                             on_result=lambda analysis: self.on_track_analyzed(clip, analysis),
+                             on_error=lambda message: print(f"Error analyzing track: {message}"))
+    
+    def on_track_analyzed(self, clip: Clip, analysis: "TrackAnalysis"):
+        """Show an analysis that finished in the background, if its track still plays"""
+        if self.playing_clip is None or self.playing_clip.id != clip.id:
+            return
+        self.track_analysis = analysis
+        self.waveform_bar.set_analysis(analysis)
+        self.apply_track_gain()
+    
+    def apply_track_gain(self):
+        """Apply or drop loudness normalization for the playing track"""
+        if self.normalize_btn.isChecked() and self.track_analysis is not None:
+            self.engine.set_gain(self.track_analysis.gain_scale())
+        else:
+            self.engine.set_gain(1.0)
+    
+    def show_metrics_panel(self):
+        """Open the debug panel with live metrics"""
+        if self.metrics_panel is None:
+            from debug_panel import MetricsPanel
+            self.metrics_panel = MetricsPanel(self.metrics, parent=self)
+        self.metrics_panel.show()
+        self.metrics_panel.raise_()
     
     def download_current(self):
-        """Download the selected track"""
-        if not self.current_clip:
+        """Download the selected tracks"""
+        clips = self.selected_clips()
+        if not clips:
             QMessageBox.warning(self, "Error", "Please select a track!")
             return
         
-        if self.current_clip.get('status') != 'success':
+        if not any(clip.is_ready for clip in clips):
             QMessageBox.warning(self, "Error", "This track is not ready yet!")
             return
         
-        save_dir = QFileDialog.getExistingDirectory(self, "Select Download Directory")
-        if not save_dir:
+        self.queue_downloads(clips)
+    
+    def download_workspace(self):
+        """Download every finished track in the current workspace"""
+        if not self.current_clips:
+            QMessageBox.warning(self, "Error", "This workspace has no tracks!")
             return
         
-        clip_details = self.api.get_clip_details(self.current_clip['id'])
-        audio_url = clip_details.get('audio_url')
+        self.queue_downloads(self.current_clips)
+    
+    def queue_downloads(self, clips):
+        """Ask for a folder and hand clips to the download manager"""
+        save_dir = QFileDialog.getExistingDirectory(
+            self, "Select Download Directory", self.download_manager.download_dir or ""
+        )
+        if not save_dir:
+            return
         
-        if not audio_url:
-            QMessageBox.warning(self, "Error", "No audio URL found!")
+        self.download_manager.enqueue(clips, save_dir)
+    
+    def update_download_status(self, stats: DownloadStats):
+        """Show aggregate download progress"""
+        if stats.total == 0:
+            self.download_status_label.setText("")
             return
         
-        try:
-            title = self.current_clip['title']
-            # Clean filename
-            title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            
-            file_path = Path(save_dir) / f"{title}.mp3"
-            
-            # Show download progress
-            progress = QProgressBar()
-            progress.setWindowTitle("Downloading...")
-            progress.show()
-            
-            response = requests.get(audio_url, stream=True, timeout=30)
-            total_size = int(response.headers.get('content-length', 0))
-            
-            with open(file_path, 'wb') as f:
-                downloaded = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total_size:
-                            percent = int((downloaded / total_size) * 100)
-                            progress.setValue(percent)
-            
-            progress.close()
-            QMessageBox.information(self, "Success", f"Downloaded to:\n{file_path}")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Download error: {e}")
+        text = f"Downloads: {stats.done}/{stats.total}"
+        if stats.failed:
+            text += f" ({stats.failed} failed)"
+        if stats.active:
+            text += f" · {stats.bytes_per_second / 1024 / 1024:.1f} MB/s"
+            if stats.eta_seconds is not None:
+                minutes, seconds = divmod(int(stats.eta_seconds), 60)
+                text += f" · ETA {minutes}:{seconds:02d}"
+        self.download_status_label.setText(text)
     
     def show_window(self):
         """Show/restore window"""
@@ -498,23 +1251,35 @@ class MusicPlayer(QMainWindow):
     
     def closeEvent(self, event):
         """Handle close event"""
-        if self.tray_icon.isVisible():
+        if self.tray_icon is not None and self.tray_icon.isVisible():
             self.hide()
             event.ignore()
         else:
-            pygame.mixer.stop()
+            self.engine.stop()
+            self.download_manager.shutdown()
+            self.indexer.shutdown()
+            self.jobs.shutdown()
             event.accept()
 
 
 def main():
     """Main entry point"""
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Suno Music Player")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print time spent in each startup phase")
+    args, qt_args = parser.parse_known_args()
+    
+    profile = StartupProfile(args.profile_startup, started_at=STARTED_AT)
+    profile.mark("imports")
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     
     # Set application metadata
     app.setApplicationName("Suno Music Player")
     app.setApplicationVersion("1.0.0")
+    profile.mark("qt application")
     
-    player = MusicPlayer()
+    player = MusicPlayer(profile=profile)
     player.show()
     
     sys.exit(app.exec_())
@@ -0,0 +1,141 @@
+"""
+Metadata cache for Suno Music Player
+Persists API responses in SQLite under ~/.suno_player with ETags and fetch times
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+from metrics import get_metrics
+
+
+class CacheEntry(NamedTuple):
+    """A cached API response"""
+    payload: Any
+    etag: Optional[str]
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the response was fetched or last revalidated"""
+        return time.time() - self.fetched_at
+
+
+class MetadataCache:
+    """SQLite-backed store of JSON API responses keyed by request path"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        if db_path is None:
+            db_path = Path.home() / ".suno_player" / "metadata.db"
+        db_path.parent.mkdir(exist_ok=True)
+        self.db_path = db_path
+
+        # Pages are fetched from worker threads, so share one guarded connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                etag TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get the cached response for a key, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, etag, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return CacheEntry(json.loads(row[0]), row[1], row[2])
+        except ValueError:
+            return None
+
+    def put(self, key: str, payload: Any, etag: Optional[str] = None):
+        """Store a fresh response"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, etag, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(payload), etag, time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, key: str):
+        """Mark a cached response as revalidated (e.g. after a 304)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedLookup:
+    """The metadata cache's part in one GET, for both the sync and async clients
+
+    Fresh entries are served without touching the network; stale ones are
+    revalidated with If-None-Match, and kept as a fallback if the request
+    fails. With no cache every request goes out and nothing is kept.
+    """
+
+    def __init__(self, cache: Optional[MetadataCache], key: str, ttl: float,
+                 revalidate: bool = False):
+        self.cache = cache
+        self.key = key
+        self.entry = cache.get(key) if cache is not None else None
+        self.fresh = self.entry is not None and not revalidate and self.entry.age < ttl
+        if self.fresh:
+            self._count('fresh')
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Validator to send with the request"""
+        if self.entry is not None and self.entry.etag:
+            return {"If-None-Match": self.entry.etag}
+        return {}
+
+    def not_modified(self) -> Any:
+        """The cached payload, confirmed by a 304"""
+        self.cache.touch(self.key)
+        self._count('not_modified')
+        return self.entry.payload
+
+    def fallback(self) -> Any:
+        """The cached payload, however old, after the request failed"""
+        self._count('stale_fallback')
+        return self.entry.payload
+
+    def store(self, payload: Any, etag: Optional[str]) -> Any:
+        """Keep a fresh response and return it"""
+        if self.cache is not None:
+            self._count('miss' if self.entry is None else 'updated')
+            self.cache.put(self.key, payload, etag)
+        return payload
+
+    @staticmethod
+    def _count(result: str):
+        get_metrics().inc('metadata_cache_requests_total', result=result)
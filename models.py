@@ -0,0 +1,136 @@
+"""
+Data records for Suno Music Player
+Compact workspace and clip objects parsed once from API payloads
+"""
+
+import json
+import sys
+from typing import Any, Dict, Optional
+
+
+class Workspace:
+    """A Suno workspace/project"""
+    __slots__ = ('id', 'name', 'clip_count', 'updated_at', '_raw')
+
+    def __init__(self, id: str, name: str, clip_count: int = 0, updated_at: str = "",
+                 raw: Optional[bytes] = None):
+        self.id = id
+        self.name = name
+        self.clip_count = clip_count
+        self.updated_at = updated_at
+        self._raw = raw
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Workspace":
+        """Build from an API payload, keeping the payload as compact JSON"""
+        return cls(
+            data['id'],
+            data.get('name') or 'Untitled',
+            int(data.get('clip_count') or 0),
+            # Moves when a clip in the workspace is added or changes
+            data.get('last_updated_clip') or data.get('updated_at') or "",
+            _pack(data),
+        )
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The original API payload"""
+        return _unpack(self._raw)
+
+    def _key(self):
+        return (self.id, self.name, self.clip_count, self.updated_at)
+
+    def __eq__(self, other):
+        if not isinstance(other, Workspace):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"Workspace({self.id!r}, {self.name!r}, clip_count={self.clip_count})"
+
+
+class Clip:
+    """A Suno clip/song"""
+    __slots__ = ('id', 'title', 'status', 'created_at', 'duration', 'audio_url', 'tags',
+                 '_raw')
+
+    def __init__(self, id: str, title: str, status: str, created_at: str = "",
+                 duration: float = 0.0, audio_url: str = "", tags: str = "",
+                 raw: Optional[bytes] = None):
+        self.id = id
+        self.title = title
+        self.status = status
+        self.created_at = created_at
+        self.duration = duration
+        self.audio_url = audio_url
+        self.tags = tags
+        self._raw = raw
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Clip":
+        """Build from an API payload, keeping the payload as compact JSON"""
+        metadata = data.get('metadata') or {}
+        duration = data.get('duration') or metadata.get('duration') or 0
+        return cls(
+            data['id'],
+            data.get('title') or 'N/A',
+            # Statuses repeat across thousands of clips; share the strings
+            sys.intern(data.get('status') or 'unknown'),
+            data.get('created_at') or "",
+            float(duration),
+            data.get('audio_url') or "",
+            metadata.get('tags') or "",
+            _pack(data),
+        )
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The original API payload"""
+        return _unpack(self._raw)
+
+    @property
+    def lyrics(self) -> str:
+        """Lyrics/prompt text, decoded from the raw payload on demand"""
+        return (self.raw.get('metadata') or {}).get('prompt') or ""
+
+    @property
+    def created_date(self) -> str:
+        """Creation date as YYYY-MM-DD"""
+        return self.created_at.split('T')[0]
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the audio can be played or downloaded"""
+        return self.status == 'success'
+
+    @property
+    def is_terminal(self) -> bool:
+        """Whether generation is over, successfully or not"""
+        return self.status in ('success', 'error')
+
+    def _key(self):
+        return (self.id, self.title, self.status, self.created_at, self.duration,
+                self.audio_url, self.tags)
+
+    def __eq__(self, other):
+        if not isinstance(other, Clip):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"Clip({self.id!r}, {self.title!r}, status={self.status!r})"
+
+
+def _pack(data: Dict[str, Any]) -> bytes:
+    """Encode a payload far more compactly than the decoded dict tree"""
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _unpack(raw: Optional[bytes]) -> Dict[str, Any]:
+    return json.loads(raw) if raw else {}
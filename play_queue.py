@@ -0,0 +1,130 @@
+"""
+Play queue for Suno Music Player
+Track order with shuffle and repeat modes
+"""
+
+import random
+from typing import List, Optional
+
+from models import Clip
+
+
+# Repeat modes
+REPEAT_OFF = 'off'
+REPEAT_ALL = 'all'
+REPEAT_ONE = 'one'
+
+
+class PlayQueue:
+    """Ordered list of clips with a cursor
+
+    Shuffling permutes the play order but keeps the current track where it
+    is, so toggling shuffle never interrupts playback.
+    """
+
+    def __init__(self):
+        self.tracks: List[Clip] = []
+        self.order: List[int] = []
+        self.position = -1
+        self.shuffle = False
+        self.repeat = REPEAT_OFF
+
+    def set_tracks(self, tracks: List[Clip], start: Optional[Clip] = None):
+        """Replace the queue, starting at `start` (or the first track)"""
+        self.tracks = list(tracks)
+        start_index = 0
+        if start is not None:
+            for i, clip in enumerate(self.tracks):
+                if clip.id == start.id:
+                    start_index = i
+                    break
+        self.order = list(range(len(self.tracks)))
+        self.position = start_index if self.tracks else -1
+        if self.shuffle:
+            self._shuffle_rest()
+
+    def set_shuffle(self, enabled: bool):
+        """Turn shuffle on or off without changing the current track"""
+        if enabled == self.shuffle:
+            return
+        self.shuffle = enabled
+        current = self.order[self.position] if self.current() is not None else None
+        self.order = list(range(len(self.tracks)))
+        if current is not None:
+            self.position = current
+        if enabled:
+            self._shuffle_rest()
+
+    def current(self) -> Optional[Clip]:
+        """The track under the cursor"""
+        if 0 <= self.position < len(self.order):
+            return self.tracks[self.order[self.position]]
+        return None
+
+    def peek_next(self) -> Optional[Clip]:
+        """The track that will play after the current one"""
+        upcoming = self.upcoming(1)
+        return upcoming[0] if upcoming else None
+
+    def upcoming(self, count: int) -> List[Clip]:
+        """The next `count` tracks in play order"""
+        if self.current() is None:
+            return []
+        if self.repeat == REPEAT_ONE:
+            return [self.current()]
+
+        if self.repeat == REPEAT_ALL:
+            # Wrapping around; don't list the current track again
+            count = min(count, len(self.order) - 1)
+
+        result = []
+        position = self.position
+        for _ in range(count):
+            position += 1
+            if position >= len(self.order):
+                if self.repeat != REPEAT_ALL:
+                    break
+                position = 0
+            result.append(self.tracks[self.order[position]])
+        return result
+
+    def advance(self, skip: bool = False) -> Optional[Clip]:
+        """Move to the next track and return it (None at the end of the queue)
+
+        Repeat-one only holds the cursor when a track ends by itself; a
+        `skip` asked for by the user moves on as if repeat were off.
+        """
+        if self.current() is None:
+            return None
+        if self.repeat == REPEAT_ONE and not skip:
+            return self.current()
+
+        self.position += 1
+        if self.position >= len(self.order):
+            if self.repeat != REPEAT_ALL:
+                self.position = len(self.order)
+                return None
+            self.position = 0
+        return self.current()
+
+    def back(self) -> Optional[Clip]:
+        """Move to the previous track and return it"""
+        if not self.order:
+            return None
+        if self.position > 0:
+            self.position -= 1
+        elif self.repeat == REPEAT_ALL:
+            self.position = len(self.order) - 1
+        else:
+            self.position = 0
+        return self.current()
+
+    def _shuffle_rest(self):
+        """Shuffle every track after the current one"""
+        rest = self.order[:self.position] + self.order[self.position + 1:]
+        random.shuffle(rest)
+        if 0 <= self.position < len(self.order):
+            self.order = [self.order[self.position]] + rest
+            self.position = 0
+        else:
+            self.order = rest
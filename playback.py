@@ -0,0 +1,579 @@
+"""
+Playback engine for Suno Music Player
+Wraps pygame.mixer.music with an MP3 frame index for accurate position,
+duration and seeking, and pushes position updates while playing
+"""
+
+import io
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Optional, Union
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from jobs import JobRunner
+
+
+# Bitrates in kbps by (MPEG-1?, layer)
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+_SIDECAR_MAGIC = b'SPFI'
+_SIDECAR_HEADER = struct.Struct('<4sIII')
+
+# Tick rate of position updates while playing (ms)
+POSITION_INTERVAL = 100
+
+
+def _music(init: bool = True):
+    """pygame.mixer.music, starting the mixer on first use
+
+    pygame is imported here rather than at module load so the window can
+    open before the audio stack is up. With init=False, returns None while
+    the mixer has not been started.
+    """
+    import pygame
+    if not pygame.mixer.get_init():
+        if not init:
+            return None
+        pygame.mixer.init()
+    return pygame.mixer.music
+
+
+def _parse_header(data, pos: int):
+    """(frame length, samples per frame, sample rate) of a frame header, or None"""
+    b1, b2 = data[pos + 1], data[pos + 2]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 3
+    layer = 4 - ((b1 >> 1) & 3)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    if layer == 2 or mpeg1:
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+class Mp3FrameIndex:
+    """Byte offset of every MP3 frame
+
+    Frames hold a fixed number of samples, so frame i starts at
+    i * samples_per_frame / sample_rate seconds. Mapping a time to an offset
+    is a lookup and mapping an offset back to a time is a binary search.
+    """
+
+    # Indexes kept in memory, by file path
+    _memo: "OrderedDict[str, Mp3FrameIndex]" = OrderedDict()
+    _memo_lock = threading.Lock()
+    MEMO_SIZE = 64
+
+    def __init__(self, offsets: array, sample_rate: int, samples_per_frame: int):
+        self.offsets = offsets
+        self.sample_rate = sample_rate
+        self.samples_per_frame = samples_per_frame
+
+    @property
+    def frame_duration(self) -> float:
+        return self.samples_per_frame / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def duration(self) -> float:
+        """Decoded length in seconds"""
+        return len(self.offsets) * self.frame_duration
+
+    def frame_at(self, seconds: float) -> int:
+        """Frame playing at a given time"""
+        if not self.offsets or not self.frame_duration:
+            return 0
+        return max(0, min(len(self.offsets) - 1, int(seconds / self.frame_duration)))
+
+    def offset_at(self, seconds: float) -> int:
+        """Byte offset of the frame playing at a given time"""
+        return self.offsets[self.frame_at(seconds)] if self.offsets else 0
+
+    def time_of_frame(self, frame: int) -> float:
+        return frame * self.frame_duration
+
+    def time_at_offset(self, offset: int) -> float:
+        """Start time of the frame containing a byte offset"""
+        return self.time_of_frame(max(0, bisect_right(self.offsets, offset) - 1))
+
+    @classmethod
+    def from_bytes(cls, data) -> "Mp3FrameIndex":
+        """Scan MP3 data for frame boundaries (stops at the first truncated frame)"""
+        index = cls(array('Q'), 0, 0)
+        index.scan(data)
+        return index
+
+    def scan(self, data, start: int = 0) -> int:
+        """Append the frames in `data`, which holds the file from byte `start` on
+
+        Returns the file offset to continue from once more data has arrived,
+        so a download can be indexed a piece at a time as it grows.
+        """
+        pos = 0
+        if start == 0 and data[:3] == b'ID3' and len(data) >= 10:
+            size = ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14
+                    | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+            pos = 10 + size + (10 if data[5] & 0x10 else 0)
+
+        offsets = self.offsets
+        end = len(data) - 4
+        while pos <= end:
+            header = _parse_header(data, pos)
+            if header is None or (self.sample_rate and header[2] != self.sample_rate):
+                # Not a frame boundary; resynchronize
+                pos += 1
+                continue
+            length, spf, rate = header
+            if pos + length > len(data):
+                break
+            if not self.sample_rate:
+                self.sample_rate, self.samples_per_frame = rate, spf
+            offsets.append(start + pos)
+            pos += length
+        return start + pos
+
+    @classmethod
+    def for_file(cls, path: Union[str, Path]) -> "Mp3FrameIndex":
+        """Index for a complete file, from memory, its sidecar, or a fresh scan"""
+        path = Path(path)
+        index = cls.cached(path)
+        if index is not None:
+            return index
+
+        sidecar = path.with_name(path.name + ".frames")
+        index = cls._read_sidecar(sidecar)
+        if index is None:
+            index = cls.from_bytes(path.read_bytes())
+            cls._write_sidecar(sidecar, index)
+
+        with cls._memo_lock:
+            cls._memo[str(path)] = index
+            while len(cls._memo) > cls.MEMO_SIZE:
+                cls._memo.popitem(last=False)
+        return index
+
+    @classmethod
+    def cached(cls, path: Union[str, Path]) -> Optional["Mp3FrameIndex"]:
+        """Index already held in memory, without touching the disk"""
+        with cls._memo_lock:
+            index = cls._memo.get(str(path))
+            if index is not None:
+                cls._memo.move_to_end(str(path))
+            return index
+
+    @staticmethod
+    def _read_sidecar(sidecar: Path) -> Optional["Mp3FrameIndex"]:
+        try:
+            data = sidecar.read_bytes()
+            magic, rate, spf, count = _SIDECAR_HEADER.unpack_from(data)
+            if magic != _SIDECAR_MAGIC:
+                return None
+            offsets = array('Q')
+            offsets.frombytes(data[_SIDECAR_HEADER.size:])
+            if len(offsets) != count:
+                return None
+            return Mp3FrameIndex(offsets, rate, spf)
+        except (OSError, struct.error, ValueError):
+            return None
+
+    @staticmethod
+    def _write_sidecar(sidecar: Path, index: "Mp3FrameIndex"):
+        try:
+            with open(sidecar, 'wb') as f:
+                f.write(_SIDECAR_HEADER.pack(_SIDECAR_MAGIC, index.sample_rate,
+                                             index.samples_per_frame, len(index.offsets)))
+                f.write(index.offsets.tobytes())
+        except OSError as e:
+            print(f"Warning: Could not save frame index: {e}")
+
+
+class OffsetReader(io.RawIOBase):
+    """View of a seekable binary stream that starts at a byte offset
+
+    Lets the decoder open an MP3 at any frame boundary as if it were the
+    start of the file.
+    """
+
+    def __init__(self, raw, offset: int):
+        super().__init__()
+        self._raw = raw
+        self._offset = offset
+        self._raw.seek(offset)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._raw.tell() - self._offset
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._raw.seek(self._offset + max(0, pos))
+        elif whence == io.SEEK_CUR:
+            self._raw.seek(max(self._offset, self._raw.tell() + pos))
+        else:
+            self._raw.seek(pos, io.SEEK_END)
+            if self._raw.tell() < self._offset:
+                self._raw.seek(self._offset)
+        return self.tell()
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._raw.close()
+        super().close()
+
+
+class StreamIndex:
+    """Frame index of a stream that is still arriving, extended as it grows
+
+    Ticks add a little at a time on the GUI thread; a seek catches up in the
+    engine's worker. The lock keeps the two apart, and a tick skips its turn
+    rather than wait for a long catch-up.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.index = Mp3FrameIndex(array('Q'), 0, 0)
+        self._scanned = 0           # stream bytes already indexed
+        self._lock = threading.Lock()
+
+    def update(self, wait: bool = True) -> Mp3FrameIndex:
+        """Index whatever arrived since the last call"""
+        if self._lock.acquire(wait):
+            try:
+                self._scanned = self.index.scan(self.stream.bytes_from(self._scanned),
+                                                self._scanned)
+            finally:
+                self._lock.release()
+        return self.index
+
+
+def _reader_at(raw, index: Mp3FrameIndex, seconds: float):
+    """Reader over `raw` from the frame playing at `seconds`, and that frame's start time"""
+    frame = index.frame_at(seconds)
+    offset = index.offsets[frame] if index.offsets else 0
+    return OffsetReader(raw, offset), index.time_of_frame(frame)
+
+
+class PlaybackEngine(QObject):
+    """Single-track player with seeking, position reporting and gapless queueing
+
+    position_changed(position, duration) is emitted only while audio is
+    playing. finished is emitted when a track ends with nothing queued, and
+    advanced when pygame moves on to the queued track.
+
+    Sources are opened on a single worker thread: a decoder opening a
+    stream may read past what has arrived, and that must not freeze the
+    window. Only the most recent load starts playing; error reports one
+    that failed.
+    """
+    position_changed = pyqtSignal(float, float)
+    finished = pyqtSignal()
+    advanced = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, jobs: Optional[JobRunner] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        # One thread, so loads reach the mixer in the order they were asked for
+        self.jobs = jobs or JobRunner(max_threads=1, parent=self)
+        self._generation = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(POSITION_INTERVAL)
+        self._timer.timeout.connect(self._tick)
+
+        self._path: Optional[Path] = None
+        self._stream = None
+        self._index: Optional[Mp3FrameIndex] = None
+        self._reader = None
+        self._stream_index: Optional[StreamIndex] = None
+        self._duration = 0.0
+        self._base = 0.0            # track time at which the current load started
+        self._last_pos_ms = 0       # get_pos() at the previous tick
+        self._queued = None         # (path, index) handed to pygame.mixer.music.queue
+        self._queued_valid = False
+        self._volume = 1.0
+        self._gain = 1.0
+        self.playing = False
+        self.paused = False
+
+    def play_file(self, path: Union[str, Path], index: Optional[Mp3FrameIndex] = None,
+                  duration_hint: float = 0.0):
+        """Play a complete file from the start"""
+        self._path = Path(path)
+        self._stream = None
+        self._index = index
+        self._duration = index.duration if index and index.duration else duration_hint
+        self._load(str(path), 0.0)
+
+    def play_stream(self, stream, duration_hint: float = 0.0):
+        """Play a ProgressiveDownload while it is still arriving"""
+        self._path = None
+        self._stream = stream
+        self._index = None
+        self._stream_index = StreamIndex(stream)
+        self._duration = duration_hint
+        self._load(stream.open_reader(), 0.0)
+
+    def seek(self, seconds: float):
+        """Jump to a time, snapped to the start of the frame playing there"""
+        if not self.playing and not self.paused:
+            return
+
+        stream_index = None
+        if self._stream is not None:
+            stream_index = self._stream_index
+            if self._stream.health().complete and self._stream.path:
+                # The download finished; switch to the cached file, indexed as it arrived
+                self._path, self._index = Path(self._stream.path), stream_index.index
+                self._stream = None
+
+        # Indexing and opening touch the disk, so they happen in the worker
+        if self._path is not None:
+            opener = partial(self._open_file_at, self._path, self._index, stream_index, seconds)
+        elif self._stream is not None:
+            # Only the buffered part is indexed, so seeking is limited to it
+            opener = partial(self._open_stream_at, self._stream, stream_index, seconds)
+        else:
+            return
+
+        # Seeking reloads the decoder, which drops the queued track; hand it over again
+        requeue = self._queued if self._queued_valid else None
+        self._load(opener, 0.0, paused=self.paused, requeue=requeue)
+
+    @staticmethod
+    def _open_file_at(path: Path, index: Optional[Mp3FrameIndex],
+                      stream_index: Optional[StreamIndex], seconds: float):
+        if stream_index is not None:
+            # Catch up on the tail that arrived since the last tick
+            index = stream_index.update()
+        elif index is None:
+            index = Mp3FrameIndex.for_file(path)
+        return _reader_at(open(path, 'rb'), index, seconds)
+
+    @staticmethod
+    def _open_stream_at(stream, stream_index: StreamIndex, seconds: float):
+        return _reader_at(stream.open_reader(), stream_index.update(), seconds)
+
+    def pause(self):
+        if self.playing:
+            _music().pause()
+            self.playing = False
+            self.paused = True
+            self._timer.stop()
+
+    def resume(self):
+        if self.paused:
+            _music().unpause()
+            self.playing = True
+            self.paused = False
+            self._timer.start()
+
+    def stop(self):
+        """Stop and release the decoder's hold on the current source"""
+        # A load still in flight must not start playing afterwards
+        self._generation += 1
+        music = _music(init=False)
+        if music is not None:
+            music.stop()
+            music.unload()
+        self.playing = False
+        self.paused = False
+        self._timer.stop()
+        self._queued = None
+        self._close_reader()
+        self._stream = None
+
+    def set_volume(self, value: float):
+        self._volume = value
+        self._apply_volume()
+
+    def set_gain(self, scale: float):
+        """Loudness correction for the current track, applied on top of the volume"""
+        self._gain = scale
+        self._apply_volume()
+
+    def position(self) -> float:
+        """Seconds into the current track"""
+        if not self.playing and not self.paused:
+            return 0.0
+        elapsed = max(0, _music().get_pos()) / 1000
+        return min(self._base + elapsed, self._duration) if self._duration else self._base + elapsed
+
+    def duration(self) -> float:
+        return self._duration
+
+    def queue(self, path: Union[str, Path], index: Mp3FrameIndex) -> bool:
+        """Start `path` the moment the current track ends"""
+        if self._queued is not None or not self.playing or not self._duration:
+            return False
+        _music().queue(str(path))
+        self._queued = (Path(path), index)
+        self._queued_valid = True
+        return True
+
+    def cancel_queued(self):
+        """Don't hand over to the queued track (pygame can't unqueue, so stop there)"""
+        self._queued_valid = False
+
+    def _load(self, source, base: float, paused: bool = False, requeue=None):
+        """Open a path or reader in the worker thread, then start playing it from `base`
+
+        `source` may also be an opener, called in the worker, that returns
+        (reader, base) for sources that take disk work to set up. `requeue`
+        is a (path, index) to queue behind it again.
+        """
+        self._generation += 1
+        generation = self._generation
+        # Nothing to report or hand over until the new source plays
+        self._timer.stop()
+        self.playing = False
+        self.paused = False
+        self.jobs.submit(self._open, source, base,
+                         on_result=lambda opened: self._start(generation, *opened, paused,
+                                                              requeue),
+                         on_error=lambda message: self._load_failed(generation, source,
+                                                                    message))
+
+    @classmethod
+    def _open(cls, source, base: float):
+        """Hand a source to the decoder and return it with its base (runs in the worker thread)"""
+        if callable(source):
+            source, base = source()
+            try:
+                _music().load(source, "mp3")
+            except BaseException:
+                # Not the caller's to close: it only knows the opener
+                cls._close_source(source)
+                raise
+        elif isinstance(source, str):
+            _music().load(source)
+        else:
+            _music().load(source, "mp3")
+        return source, base
+
+    def _start(self, generation: int, source, base: float, paused: bool, requeue):
+        if generation != self._generation:
+            # Superseded while opening; the next load replaces it in the mixer
+            self._close_source(source)
+            return
+        previous = self._reader
+        self._reader = None if isinstance(source, str) else source
+        if previous is not None and previous is not source:
+            previous.close()
+        self._queued = None
+
+        music = _music()
+        self._apply_volume()
+        music.play()
+        if requeue is not None:
+            music.queue(str(requeue[0]))
+            self._queued = requeue
+        self._base = base
+        self._last_pos_ms = 0
+        self.playing = True
+        self.paused = False
+        self._timer.start()
+        if paused:
+            self.pause()
+        self.position_changed.emit(self.position(), self._duration)
+
+    def _load_failed(self, generation: int, source, message: str):
+        self._close_source(source)
+        if generation == self._generation:
+            self.playing = False
+            self.paused = False
+            self.error.emit(message)
+
+    @staticmethod
+    def _close_source(source):
+        # Paths and openers hold nothing open
+        if not isinstance(source, str) and not callable(source):
+            try:
+                source.close()
+            except Exception:
+                pass
+
+    def _apply_volume(self):
+        music = _music(init=False)
+        if music is not None:
+            music.set_volume(min(1.0, self._volume * self._gain))
+
+    def _close_reader(self):
+        if self._reader is not None:
+            try:
+                self._reader.close()
+            except Exception:
+                pass
+            self._reader = None
+
+    def _tick(self):
+        if not self.playing:
+            self._timer.stop()
+            return
+
+        music = _music()
+        pos_ms = music.get_pos()
+        if self._queued is not None:
+            # get_pos() restarts from zero when the queued track starts
+            switched = 0 <= pos_ms < self._last_pos_ms
+            if not self._queued_valid and (switched or pos_ms >= (
+                    self._duration - self._base) * 1000 - POSITION_INTERVAL):
+                # pygame can't unqueue, so stop (just before) where it hands over
+                self.stop()
+                self.finished.emit()
+                return
+            if switched:
+                self._advance()
+        if self._stream is not None:
+            self._stream_index.update(wait=False)
+        if not music.get_busy():
+            self.playing = False
+            self._timer.stop()
+            self._close_reader()
+            self.finished.emit()
+            return
+
+        self._last_pos_ms = pos_ms
+        self.position_changed.emit(self.position(), self._duration)
+
+    def _advance(self):
+        """Make the queued track the current one"""
+        path, index = self._queued
+        self._queued = None
+        self._close_reader()
+        self._path, self._stream, self._index = path, None, index
+        self._duration = index.duration
+        self._base = 0.0
+        self.advanced.emit()
@@ -0,0 +1,173 @@
+"""
+Audio URL resolution for Suno Music Player
+Memoizes clip audio URLs, coalesces concurrent lookups and resolves batches
+in parallel
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple, TypeVar, Union
+from urllib.parse import parse_qs, urlparse
+
+from models import Clip
+
+
+# Used when the URL carries no expiry of its own (seconds)
+DEFAULT_URL_TTL = 6 * 3600
+
+# Treat signed URLs as expired this long before they really do
+EXPIRY_MARGIN = 60
+
+# What a CDN answers an expired or revoked signed URL with
+REJECTED_STATUSES = frozenset((403, 404, 410))
+
+T = TypeVar('T')
+
+
+def url_expiry(url: str) -> Optional[float]:
+    """Epoch time at which a signed URL stops working, if it says so"""
+    params = {k.lower(): v[0] for k, v in parse_qs(urlparse(url).query).items() if v}
+    try:
+        if 'expires' in params:
+            # CloudFront style: absolute epoch seconds
+            return float(params['expires'])
+        if 'exp' in params:
+            return float(params['exp'])
+        if 'x-amz-date' in params and 'x-amz-expires' in params:
+            signed = datetime.strptime(params['x-amz-date'], "%Y%m%dT%H%M%SZ")
+            signed = signed.replace(tzinfo=timezone.utc).timestamp()
+            return signed + float(params['x-amz-expires'])
+    except ValueError:
+        pass
+    return None
+
+
+def url_rejected(error: BaseException) -> bool:
+    """Whether a failed transfer means the URL itself is no longer any good"""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) in REJECTED_STATUSES
+
+
+class AudioUrlResolver:
+    """Turns clips into playable audio URLs with as few requests as possible
+
+    URLs already present in the clip list payload are used as-is. Otherwise
+    the clip details are fetched once; concurrent callers asking for the
+    same clip share that request, and the answer is remembered until the
+    URL's own expiry (or DEFAULT_URL_TTL). Once a URL has expired or been
+    rejected, the replacement is asked of the server, not the metadata cache.
+    """
+
+    def __init__(self, get_clip_details: Callable[..., Dict], max_workers: int = 8):
+        self._get_clip_details = get_clip_details
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._memo: Dict[str, Tuple[str, float]] = {}   # id -> (url, expires at)
+        self._rejected: Dict[str, str] = {}             # id -> URL the CDN refused
+        self._pending: Dict[str, Future] = {}
+
+    def resolve(self, clip: Union[Clip, str]) -> Optional[str]:
+        """Audio URL for a clip (or clip id), None if the clip has none"""
+        stale = False
+        if isinstance(clip, Clip):
+            if clip.audio_url and self._usable(clip.id, clip.audio_url):
+                return clip.audio_url
+            stale = bool(clip.audio_url)
+            clip_id = clip.id
+        else:
+            clip_id = clip
+
+        with self._lock:
+            memo = self._memo.get(clip_id)
+            if memo is not None and memo[1] > time.time():
+                return memo[0]
+            stale = stale or memo is not None or clip_id in self._rejected
+            future = self._pending.get(clip_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._pending[clip_id] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            url = self._lookup(clip_id, refresh=stale)
+            if url:
+                with self._lock:
+                    self._memo[clip_id] = (url, self._expires_at(url))
+                    if self._rejected.get(clip_id) != url:
+                        self._rejected.pop(clip_id, None)
+            future.set_result(url)
+            return url
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(clip_id, None)
+
+    def resolve_many(self, clips: Iterable[Union[Clip, str]]) -> Dict[str, Optional[str]]:
+        """Resolve a whole selection in parallel; maps clip id to URL"""
+        clips = list(clips)
+        ids = [clip.id if isinstance(clip, Clip) else clip for clip in clips]
+        if not clips:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(clips))) as pool:
+            urls = list(pool.map(self._resolve_quietly, clips))
+        return dict(zip(ids, urls))
+
+    def with_url(self, clip: Clip, use: Callable[[str], T]) -> T:
+        """Call `use` with the clip's audio URL, again with a new one if the CDN rejects it"""
+        url = self._required(clip)
+        try:
+            return use(url)
+        except Exception as e:
+            if not url_rejected(e):
+                raise
+            self.forget(clip.id, url)
+        return use(self._required(clip))
+
+    def forget(self, clip_id: str, url: Optional[str] = None):
+        """Drop a remembered URL (or `url`) after the CDN rejected it"""
+        with self._lock:
+            memo = self._memo.pop(clip_id, None)
+            url = url or (memo[0] if memo else None)
+            if url:
+                self._rejected[clip_id] = url
+
+    def _required(self, clip: Clip) -> str:
+        url = self.resolve(clip)
+        if not url:
+            raise ValueError("No audio URL found!")
+        return url
+
+    def _lookup(self, clip_id: str, refresh: bool) -> Optional[str]:
+        """Ask for a clip's URL, past the metadata cache if what it holds is stale"""
+        url = self._get_clip_details(clip_id, revalidate=refresh).get('audio_url') or None
+        if url and not refresh and not self._usable(clip_id, url):
+            url = self._get_clip_details(clip_id, revalidate=True).get('audio_url') or None
+        return url
+
+    def _usable(self, clip_id: str, url: str) -> bool:
+        return self._fresh(url) and self._rejected.get(clip_id) != url
+
+    def _resolve_quietly(self, clip: Union[Clip, str]) -> Optional[str]:
+        try:
+            return self.resolve(clip)
+        except Exception as e:
+            print(f"Error resolving audio URL: {e}")
+            return None
+
+    @staticmethod
+    def _fresh(url: str) -> bool:
+        expiry = url_expiry(url)
+        return expiry is None or expiry - EXPIRY_MARGIN > time.time()
+
+    @staticmethod
+    def _expires_at(url: str) -> float:
+        default = time.time() + DEFAULT_URL_TTL
+        expiry = url_expiry(url)
+        return default if expiry is None else min(default, expiry - EXPIRY_MARGIN)
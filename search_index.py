@@ -0,0 +1,225 @@
+"""
+Search index for Suno Music Player
+In-memory trigram index over clip titles, tags and lyrics across workspaces
+"""
+
+import re
+from itertools import islice
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from models import Clip
+
+
+# Results returned by default; enough to fill a screen several times over
+DEFAULT_LIMIT = 500
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _normalize(text: str) -> str:
+    """Lower-case and collapse everything that isn't a word character"""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Trigrams of each word, padded so short prefixes still index"""
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class PreparedClips(NamedTuple):
+    """Clips with their index entries worked out, ready to merge into a SearchIndex
+
+    Decoding lyrics and extracting trigrams is the costly part of indexing,
+    so it is done by prepare_clips() away from the GUI thread.
+    """
+    workspace_id: str
+    clips: List[Clip]
+    titles: List[str]
+    texts: List[str]
+    postings: Dict[str, List[int]]        # trigram -> positions in clips
+    title_postings: Dict[str, List[int]]
+
+
+def prepare_clips(clips: Iterable[Clip], workspace_id: str = "") -> PreparedClips:
+    """Normalize clips and collect their trigrams (safe to run in a worker thread)"""
+    prepared = PreparedClips(workspace_id, [], [], [], {}, {})
+    for i, clip in enumerate(clips):
+        title = _normalize(clip.title)
+        text = " ".join(filter(None, (title, _normalize(clip.tags),
+                                      _normalize(clip.lyrics))))
+        prepared.clips.append(clip)
+        prepared.titles.append(title)
+        prepared.texts.append(text)
+        for gram in _trigrams(text):
+            prepared.postings.setdefault(gram, []).append(i)
+        for gram in _trigrams(title):
+            prepared.title_postings.setdefault(gram, []).append(i)
+    return prepared
+
+
+class SearchIndex:
+    """Type-ahead search and filtering over every clip seen so far
+
+    Each clip is a document made of its title, tags and lyrics. Query words
+    of three or more characters are narrowed through the trigram postings
+    and then confirmed by substring match; shorter queries scan titles.
+    """
+
+    def __init__(self):
+        self._docs: Dict[str, int] = {}       # clip id -> doc number
+        self._clips: List[Optional[Clip]] = []
+        self._texts: List[str] = []
+        self._titles: List[str] = []
+        self._workspaces: List[str] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._title_postings: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add_clips(self, clips: Iterable[Clip], workspace_id: str = ""):
+        """Index clips, replacing earlier versions of the same ids"""
+        self.add_prepared(prepare_clips(clips, workspace_id))
+
+    def add_prepared(self, prepared: PreparedClips):
+        """Merge clips indexed by prepare_clips(), replacing earlier versions of the same ids"""
+        workspace_id = prepared.workspace_id
+        docs = []   # doc number per prepared clip, None where the text didn't change
+        for clip, title, text in zip(prepared.clips, prepared.titles, prepared.texts):
+            doc = self._docs.get(clip.id)
+            if doc is not None:
+                if self._texts[doc] == text:
+                    # Metadata such as status may still have changed
+                    self._clips[doc] = clip
+                    self._workspaces[doc] = workspace_id or self._workspaces[doc]
+                    docs.append(None)
+                    continue
+                self._unindex(doc)
+            else:
+                doc = len(self._clips)
+                self._docs[clip.id] = doc
+                self._clips.append(None)
+                self._texts.append("")
+                self._titles.append("")
+                self._workspaces.append("")
+
+            self._clips[doc] = clip
+            self._texts[doc] = text
+            self._titles[doc] = title
+            self._workspaces[doc] = workspace_id
+            docs.append(doc)
+
+        for source, postings in ((prepared.postings, self._postings),
+                                 (prepared.title_postings, self._title_postings)):
+            for gram, positions in source.items():
+                new_docs = [docs[i] for i in positions if docs[i] is not None]
+                if new_docs:
+                    postings.setdefault(gram, set()).update(new_docs)
+
+    def remove_clip(self, clip_id: str):
+        """Drop a clip from the index"""
+        doc = self._docs.pop(clip_id, None)
+        if doc is not None:
+            self._unindex(doc)
+            self._clips[doc] = None
+            self._texts[doc] = ""
+            self._titles[doc] = ""
+            self._workspaces[doc] = ""
+
+    def search(self, query: str, status: Optional[str] = None,
+               date_from: Optional[str] = None, date_to: Optional[str] = None,
+               min_duration: Optional[float] = None, max_duration: Optional[float] = None,
+               workspace_id: Optional[str] = None,
+               limit: int = DEFAULT_LIMIT) -> List[Clip]:
+        """Clips matching every query word and filter
+
+        Dates are inclusive YYYY-MM-DD strings and durations are seconds.
+        Title matches are listed before matches found only in tags or lyrics.
+        """
+        words = _normalize(query).split()
+
+        def accepts(doc: int) -> bool:
+            clip = self._clips[doc]
+            if clip is None:
+                return False
+            # Cheapest checks first: this runs for every candidate
+            if status is not None and clip.status != status:
+                return False
+            if workspace_id is not None and self._workspaces[doc] != workspace_id:
+                return False
+            if min_duration is not None and clip.duration < min_duration:
+                return False
+            if max_duration is not None and clip.duration > max_duration:
+                return False
+            if date_from is not None or date_to is not None:
+                date = clip.created_at[:10]
+                if date_from is not None and date < date_from:
+                    return False
+                if date_to is not None and date > date_to:
+                    return False
+            return True
+
+        if not words:
+            docs = (doc for doc in range(len(self._clips)) if accepts(doc))
+            return [self._clips[doc] for doc in islice(docs, limit)]
+
+        # Title matches first, then clips matching only in tags or lyrics
+        results = []
+        seen = set()
+        short = all(len(word) < 3 for word in words)
+        phases = [(self._titles, self._title_postings)]
+        if not short:
+            phases.append((self._texts, self._postings))
+
+        for texts, postings in phases:
+            if short:
+                candidates = range(len(texts))
+            else:
+                candidates = self._candidates(words, postings)
+            for doc in candidates:
+                if doc in seen:
+                    continue
+                text = texts[doc]
+                if all(word in text for word in words) and accepts(doc):
+                    seen.add(doc)
+                    results.append(self._clips[doc])
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    @staticmethod
+    def _candidates(words: List[str], postings: Dict[str, Set[int]]) -> List[int]:
+        """Docs containing every trigram of the longer query words"""
+        matched = []
+        for word in words:
+            if len(word) < 3:
+                continue
+            # Inner trigrams only: the query word may be part of a longer word
+            for i in range(len(word) - 2):
+                docs = postings.get(word[i:i + 3])
+                if not docs:
+                    return []
+                matched.append(docs)
+
+        matched.sort(key=len)
+        result = set(matched[0])
+        for docs in matched[1:]:
+            result &= docs
+            if not result:
+                return []
+        return sorted(result)
+
+    def _unindex(self, doc: int):
+        for text, postings in ((self._texts[doc], self._postings),
+                               (self._titles[doc], self._title_postings)):
+            for gram in _trigrams(text):
+                docs = postings.get(gram)
+                if docs is not None:
+                    docs.discard(doc)
+                    if not docs:
+                        del postings[gram]
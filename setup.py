@@ -41,7 +41,15 @@ setup(
     
     python_requires=">=3.8",
     
-    py_modules=["main", "auth", "api"],
+    py_modules=[
+        "main", "auth", "api", "transport",
+        "metadata_cache", "audio_cache", "streaming",
+        "jobs", "download_manager", "clip_model", "models",
+        "search_index", "play_queue", "resolver", "playback",
+        "analysis", "waveform_bar", "startup",
+        "metrics", "debug_panel", "sync", "status_watcher",
+        "transfer", "cli", "async_api", "indexer",
+    ],
     
     install_requires=[
         "PyQt5>=5.15.0",
@@ -51,11 +59,17 @@ setup(
         "requests>=2.31.0",
         "selenium>=4.15.0",
         "PyJWT>=2.8.0",
+        "numpy>=1.22.0",
     ],
     
+    extras_require={
+        # AsyncSunoAPI (async_api.py) for scripts and asyncio/qasync loops
+        "async": ["aiohttp>=3.9"],
+    },
+    
     entry_points={
         "console_scripts": [
-            "suno-player=main:main",
+            "suno-player=cli:main",
         ],
     },
     
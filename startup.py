@@ -0,0 +1,46 @@
+"""
+Startup profiling for Suno Music Player
+Records how long each phase of a cold start takes (--profile-startup)
+"""
+
+import sys
+import time
+from typing import List, Optional, Tuple
+
+
+class StartupProfile:
+    """Named checkpoints measured from process start
+
+    mark() records a phase ending now; finish() marks the last phase and
+    prints the breakdown once. A disabled profile ignores every call.
+    """
+
+    def __init__(self, enabled: bool = False, started_at: Optional[float] = None):
+        self.enabled = enabled
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.finished = False
+
+    def mark(self, phase: str):
+        """Record that a phase has just ended"""
+        if self.enabled and not self.finished:
+            self.phases.append((phase, time.perf_counter()))
+
+    def finish(self, phase: str):
+        """Record the final phase and print the report"""
+        if not self.enabled or self.finished:
+            return
+        self.mark(phase)
+        self.finished = True
+        self.report()
+
+    def report(self, stream=None):
+        """Print time per phase and cumulative time since start"""
+        stream = stream or sys.stderr
+        print("\n=== STARTUP PROFILE ===", file=stream)
+        previous = self.started_at
+        for phase, at in self.phases:
+            print(f"  {phase:<28} {(at - previous) * 1000:8.1f} ms"
+                  f"   (at {(at - self.started_at) * 1000:8.1f} ms)", file=stream)
+            previous = at
+        print(file=stream)
@@ -0,0 +1,129 @@
+"""
+Clip status watcher for Suno Music Player
+Polls clips that are still generating until they finish, backing off the
+longer they take
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from jobs import JobRunner
+from models import Clip
+
+
+# Delay before the first poll, growth per unchanged poll, and ceiling (seconds)
+FIRST_INTERVAL = 3.0
+BACKOFF = 1.5
+MAX_INTERVAL = 60.0
+
+# Clips asked about per request
+BATCH_SIZE = 20
+
+# Stop watching a clip that has been generating this long (seconds)
+GIVE_UP_AFTER = 30 * 60
+
+
+def is_pending(clip: Clip) -> bool:
+    """Whether a clip may still change status on its own"""
+    return not clip.is_terminal
+
+
+class StatusWatcher(QObject):
+    """Tracks queued/generating clips and reports them as they change
+
+    Only non-terminal clips are polled, a batch per request. The interval
+    starts short and grows while nothing changes; any change snaps it back.
+    Polling stops by itself once every watched clip has finished.
+    """
+    clips_changed = pyqtSignal(str, object)  # workspace id, list of Clip
+    clip_finished = pyqtSignal(object)       # Clip that reached a terminal status
+
+    def __init__(self, jobs: Optional[JobRunner] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.api = None
+        self.jobs = jobs or JobRunner(max_threads=2, parent=self)
+        # clip id -> (clip, workspace id, first seen)
+        self._watched: Dict[str, Tuple[Clip, str, float]] = {}
+        self.interval = FIRST_INTERVAL
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._poll)
+
+    def set_api(self, api):
+        """Use a new client (None pauses polling)"""
+        self.api = api
+        self._schedule(FIRST_INTERVAL)
+
+    def watch(self, clips: List[Clip], workspace_id: str = ""):
+        """Start tracking any of these clips that haven't finished"""
+        now = time.monotonic()
+        added = False
+        for clip in clips:
+            if not is_pending(clip):
+                self._watched.pop(clip.id, None)
+                continue
+            known = self._watched.get(clip.id)
+            self._watched[clip.id] = (clip, workspace_id, known[2] if known else now)
+            added = added or known is None
+        if added:
+            self._schedule(FIRST_INTERVAL)
+
+    def _schedule(self, interval: float):
+        self.interval = interval
+        if self._watched and self.api is not None:
+            self._timer.start(int(interval * 1000))
+
+    def _poll(self):
+        now = time.monotonic()
+        for clip_id, (_, _, since) in list(self._watched.items()):
+            if now - since > GIVE_UP_AFTER:
+                del self._watched[clip_id]
+        if not self._watched or self.api is None or self.jobs.is_running('status-poll'):
+            # A poll in flight reschedules when it completes
+            return
+        self.jobs.submit(self._fetch, self.api, list(self._watched), key='status-poll',
+                         on_result=self._on_fetched,
+                         on_error=lambda message: self._schedule(self._next_interval()))
+
+    @staticmethod
+    def _fetch(api, clip_ids: List[str]) -> List[Clip]:
+        """Current state of the clips, a batch per request (runs in a worker thread)"""
+        fresh = []
+        for start in range(0, len(clip_ids), BATCH_SIZE):
+            batch = clip_ids[start:start + BATCH_SIZE]
+            clips = api.get_clips_by_ids(batch)
+            if not clips:
+                # Batch lookup unavailable; ask clip by clip, skipping the cache
+                clips = [Clip.from_dict(details) for details in
+                         (api.get_clip_details(clip_id, revalidate=True) for clip_id in batch)
+                         if details.get('id')]
+            fresh.extend(clips)
+        return fresh
+
+    def _on_fetched(self, clips: List[Clip]):
+        changed: Dict[str, List[Clip]] = {}
+        finished = []
+        for clip in clips:
+            entry = self._watched.get(clip.id)
+            if entry is None:
+                continue
+            old, workspace_id, since = entry
+            if clip == old:
+                continue
+            changed.setdefault(workspace_id, []).append(clip)
+            if is_pending(clip):
+                self._watched[clip.id] = (clip, workspace_id, since)
+            else:
+                del self._watched[clip.id]
+                finished.append(clip)
+
+        for workspace_id, updated in changed.items():
+            self.clips_changed.emit(workspace_id, updated)
+        for clip in finished:
+            self.clip_finished.emit(clip)
+        self._schedule(FIRST_INTERVAL if changed else self._next_interval())
+
+    def _next_interval(self) -> float:
+        return min(self.interval * BACKOFF, MAX_INTERVAL)
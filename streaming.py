@@ -0,0 +1,210 @@
+"""
+Progressive audio streaming for Suno Music Player
+Downloads a clip into a growing in-memory buffer that the decoder can read
+from before the transfer has finished
+"""
+
+import io
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from audio_cache import AudioCache
+from transport import Transport, get_transport
+
+
+# Bytes buffered before playback starts (~8 s of 128 kbps MP3)
+DEFAULT_PREROLL_BYTES = 128 * 1024
+
+CHUNK_SIZE = 64 * 1024
+
+# Longest a decoder read waits for bytes that haven't arrived (seconds)
+READ_TIMEOUT = 30.0
+
+# Reads this close to the end that jump past the received data are tag probes
+TAIL_PROBE_BYTES = 64 * 1024
+
+
+class BufferHealth(NamedTuple):
+    """Snapshot of a progressive download"""
+    buffered_bytes: int
+    total_bytes: int  # 0 when the server sent no content-length
+    bytes_per_second: float
+    complete: bool
+    error: Optional[str]
+
+    @property
+    def percent(self) -> int:
+        """Share of the file downloaded so far"""
+        if self.complete:
+            return 100
+        if not self.total_bytes:
+            return 0
+        return int(self.buffered_bytes * 100 / self.total_bytes)
+
+
+class ProgressiveDownload:
+    """Background download of one clip that can be played while it arrives
+
+    The bytes are kept in memory for readers and written to the audio cache
+    at the same time, so the clip is cached once the transfer completes.
+    """
+
+    def __init__(self, clip_id: str, url: str, audio_cache: AudioCache,
+                 preroll_bytes: int = DEFAULT_PREROLL_BYTES,
+                 transport: Optional[Transport] = None):
+        self.clip_id = clip_id
+        self.url = url
+        self.audio_cache = audio_cache
+        self.preroll_bytes = preroll_bytes
+        self.transport = transport or get_transport()
+
+        self.path: Optional[Path] = None
+        self._data = bytearray()
+        self._total = 0
+        self._complete = False
+        self._cancelled = False
+        self._error: Optional[str] = None
+        self.exception: Optional[Exception] = None   # what ended the download early
+        self._started_at = 0.0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start downloading in the background"""
+        self._started_at = time.monotonic()
+        self._thread.start()
+
+    def cancel(self):
+        """Stop the download; readers see end of file"""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def wait_for_preroll(self, timeout: Optional[float] = None) -> bool:
+        """Block until enough audio is buffered to start playback"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: (len(self._data) >= self.preroll_bytes
+                         or self._complete or self._error is not None
+                         or self._cancelled),
+                timeout
+            ) and self._error is None and len(self._data) > 0
+
+    def open_reader(self) -> "StreamReader":
+        """Get a file-like object over the buffer for the decoder"""
+        return StreamReader(self)
+
+    def bytes_from(self, offset: int) -> bytes:
+        """Copy of what has been downloaded from `offset` on"""
+        with self._cond:
+            return bytes(self._data[offset:])
+
+    def health(self) -> BufferHealth:
+        """Current buffer fill and download rate"""
+        with self._cond:
+            buffered = len(self._data)
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0
+            rate = buffered / elapsed if elapsed > 0 else 0.0
+            return BufferHealth(buffered, self._total, rate, self._complete, self._error)
+
+    def _run(self):
+        try:
+            response = self.transport.get(self.url, stream=True, timeout=30)
+            try:
+                response.raise_for_status()
+                with self._cond:
+                    self._total = int(response.headers.get('content-length', 0))
+                self.path = self.audio_cache.store(self.clip_id, self._tee(response))
+            finally:
+                response.close()
+            with self._cond:
+                self._complete = True
+                self._cond.notify_all()
+        except Exception as e:
+            with self._cond:
+                if not self._cancelled:
+                    self._error = str(e)
+                    self.exception = e
+                self._cond.notify_all()
+
+    def _tee(self, response) -> Iterator[bytes]:
+        """Pass chunks to the audio cache while appending them to the buffer"""
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if not chunk:
+                continue
+            with self._cond:
+                if self._cancelled:
+                    raise RuntimeError("Download cancelled")
+                self._data += chunk
+                self._cond.notify_all()
+            yield chunk
+
+
+class StreamReader(io.RawIOBase):
+    """Seekable reader that waits (up to READ_TIMEOUT) for requested bytes to arrive
+
+    Decoders probe the end of the file for ID3v1/APE tags while opening it.
+    The size comes from the Content-Length, and a probe that jumps to the
+    tail before it has arrived reads zeros (no tag) instead of waiting for
+    the whole download.
+    """
+
+    def __init__(self, download: ProgressiveDownload):
+        super().__init__()
+        self._download = download
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self._size() + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        download = self._download
+        wanted = len(buffer)
+        with download._cond:
+            if self._is_tail_probe(wanted):
+                count = max(0, min(wanted, download._total - self._pos))
+                buffer[:count] = bytes(count)
+                self._pos += count
+                return count
+            download._cond.wait_for(
+                lambda: (len(download._data) >= self._pos + wanted
+                         or download._complete or download._error is not None
+                         or download._cancelled),
+                READ_TIMEOUT
+            )
+            chunk = download._data[self._pos:self._pos + wanted]
+        buffer[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def _is_tail_probe(self, wanted: int) -> bool:
+        """Whether a read jumps ahead into the not yet received end of the file"""
+        download = self._download
+        total = download._total
+        return (not download._complete and total > 0
+                and self._pos > len(download._data) + CHUNK_SIZE
+                and self._pos + wanted > total - TAIL_PROBE_BYTES)
+
+    def _size(self) -> int:
+        """Full size of the stream, or what has arrived so far if the length is unknown"""
+        download = self._download
+        with download._cond:
+            return download._total or len(download._data)
@@ -0,0 +1,148 @@
+"""
+Library sync for Suno Music Player
+Diffs fresh workspace and clip listings against what is already known and
+reports only what changed
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from models import Clip, Workspace
+
+
+class WorkspaceDelta(NamedTuple):
+    """Changes to the workspace list"""
+    workspaces: List[Workspace]  # the fresh list, in server order
+    inserted: List[Workspace]
+    updated: List[Workspace]
+    removed: List[str]           # workspace ids
+
+    @property
+    def empty(self) -> bool:
+        return not (self.inserted or self.updated or self.removed)
+
+
+class ClipDelta(NamedTuple):
+    """Changes to one workspace's clips"""
+    workspace_id: str
+    clips: List[Clip]            # the fresh list, in server order
+    inserted: List[Clip]
+    updated: List[Clip]
+    removed: List[str]           # clip ids
+
+    @property
+    def empty(self) -> bool:
+        return not (self.inserted or self.updated or self.removed)
+
+
+def diff_workspaces(old: Iterable[Workspace], new: List[Workspace]) -> WorkspaceDelta:
+    """Compare two workspace lists by id"""
+    known = {ws.id: ws for ws in old}
+    inserted = [ws for ws in new if ws.id not in known]
+    updated = [ws for ws in new if ws.id in known and ws != known[ws.id]]
+    fresh_ids = {ws.id for ws in new}
+    removed = [ws_id for ws_id in known if ws_id not in fresh_ids]
+    return WorkspaceDelta(new, inserted, updated, removed)
+
+
+def diff_clips(workspace_id: str, old: Iterable[Clip], new: List[Clip]) -> ClipDelta:
+    """Compare two clip lists by id"""
+    known = {clip.id: clip for clip in old}
+    inserted = [clip for clip in new if clip.id not in known]
+    updated = [clip for clip in new if clip.id in known and clip != known[clip.id]]
+    fresh_ids = {clip.id for clip in new}
+    removed = [clip_id for clip_id in known if clip_id not in fresh_ids]
+    return ClipDelta(workspace_id, new, inserted, updated, removed)
+
+
+def _needs_clips(old: Optional[Workspace], new: Workspace, have_clips: bool = True) -> bool:
+    """Whether a workspace's clips may have changed since `old` was seen
+
+    Without `have_clips` there is nothing to compare against, so an
+    unchanged listing (e.g. one seeded from the cache) still needs a fetch.
+    """
+    if not have_clips:
+        return True
+    return old is None or old.clip_count != new.clip_count or old.updated_at != new.updated_at
+
+
+class LibrarySync:
+    """Last known state of the library, updated by diffing fresh listings
+
+    A refresh fetches the workspace list, then clips only for workspaces
+    whose clip count or timestamp moved, so its cost follows the size of
+    the change rather than the size of the library.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._workspaces: Dict[str, Workspace] = {}
+        self._clips: Dict[str, List[Clip]] = {}
+
+    def set_workspaces(self, workspaces: List[Workspace]):
+        """Take a listing as known without reporting changes"""
+        with self._lock:
+            self._workspaces = {ws.id: ws for ws in workspaces}
+
+    def set_clips(self, workspace_id: str, clips: List[Clip], replace: bool = True):
+        """Take a workspace's clips as known (only if none are yet, unless `replace`)"""
+        with self._lock:
+            if replace or workspace_id not in self._clips:
+                self._clips[workspace_id] = list(clips)
+
+    def update_workspaces(self, workspaces: List[Workspace]) -> WorkspaceDelta:
+        """Diff a fresh workspace listing and make it the known state"""
+        with self._lock:
+            delta = diff_workspaces(self._workspaces.values(), workspaces)
+            self._workspaces = {ws.id: ws for ws in workspaces}
+            for workspace_id in delta.removed:
+                self._clips.pop(workspace_id, None)
+        return delta
+
+    def update_clips(self, workspace_id: str, clips: List[Clip]) -> ClipDelta:
+        """Diff a workspace's fresh clips and make them the known state"""
+        with self._lock:
+            delta = diff_clips(workspace_id, self._clips.get(workspace_id, ()), clips)
+            self._clips[workspace_id] = list(clips)
+        return delta
+
+    def sync(self, api, revalidate: bool, always: Iterable[str], report: Callable):
+        """Fetch what changed and report each non-empty delta (runs in a worker thread)
+
+        Workspaces in `always` (e.g. the one on screen) have their clips
+        checked even when their counts look unchanged.
+        """
+        with self._lock:
+            before = dict(self._workspaces)
+            known = set(self._clips)
+
+        try:
+            workspaces = api.get_all_workspaces(revalidate=revalidate)
+        except Exception as e:
+            # Keep the known state; the next sync tries again
+            print(f"Error syncing workspaces: {e}")
+            return
+        fresh_ids = {ws.id for ws in workspaces}
+        with self._lock:
+            removed_clips = {ws_id: [clip.id for clip in self._clips.get(ws_id, ())]
+                             for ws_id in before if ws_id not in fresh_ids}
+        delta = self.update_workspaces(workspaces)
+        if not delta.empty:
+            report(delta)
+        for workspace_id, clip_ids in removed_clips.items():
+            if clip_ids:
+                report(ClipDelta(workspace_id, [], [], [], clip_ids))
+
+        always = set(always)
+        for ws in workspaces:
+            if ws.id not in always and not _needs_clips(before.get(ws.id), ws, ws.id in known):
+                continue
+            # Something moved, so don't trust a cached listing however recent
+            try:
+                clips = api.get_all_clips(ws.id, revalidate=True, expected=ws.clip_count)
+            except Exception as e:
+                print(f"Error syncing clips of {ws.name}: {e}")
+                continue
+            clip_delta = self.update_clips(ws.id, clips)
+            if not clip_delta.empty:
+                report(clip_delta)
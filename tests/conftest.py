@@ -0,0 +1,52 @@
+"""
+Shared fixtures for the test suite
+The modules live at the top of the repository and the mock API server in
+benchmarks/, so both go on the import path
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from mock_server import MockConfig, MockSunoServer  # noqa: E402
+
+
+@pytest.fixture
+def mock_server():
+    """Start a mock Suno API; call with MockConfig fields, get the running server"""
+    servers = []
+
+    def start(**config):
+        config.setdefault('latency_ms', 0)
+        server = MockSunoServer(MockConfig(**config)).__enter__()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+@pytest.fixture
+def make_api():
+    """A SunoAPI client pointed at a mock server, with no metadata cache"""
+    from api import SunoAPI
+
+    def make(server):
+        api = SunoAPI("test-token")
+        api.base_url = server.url
+        return api
+
+    return make
+
+
+@pytest.fixture
+def qapp():
+    """The Qt application object, for tests that need an event loop"""
+    QtCore = pytest.importorskip("PyQt5.QtCore")
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
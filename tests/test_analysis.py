@@ -0,0 +1,103 @@
+"""Tests for analysis.py"""
+
+import math
+
+import numpy as np
+import pytest
+
+import analysis
+from analysis import (BASE_SAMPLES_PER_PEAK, LEVEL_FACTOR, MIN_LEVEL_PEAKS, TrackAnalysis,
+                      _integrated_loudness, _peak_levels)
+
+SAMPLE_RATE = 44100
+
+
+def sine(seconds, amplitude, frequency=1000.0, channels=2):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    wave = (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+    return np.repeat(wave[:, np.newaxis], channels, axis=1)
+
+
+def test_peak_levels_pyramid():
+    frames = BASE_SAMPLES_PER_PEAK * MIN_LEVEL_PEAKS * LEVEL_FACTOR * 2 + 5
+    samples = np.zeros((frames, 2), dtype=np.float32)
+    samples[10, 0] = 0.5
+    samples[-1, 1] = -1.0
+    levels = _peak_levels(samples)
+
+    # The ragged tail gets a peak of its own, and levels shrink until small enough
+    assert len(levels[0]) == -(-frames // BASE_SAMPLES_PER_PEAK)
+    for finer, coarser in zip(levels, levels[1:]):
+        assert len(coarser) == -(-len(finer) // LEVEL_FACTOR)
+    assert len(levels[-1]) <= MIN_LEVEL_PEAKS < len(levels[-2])
+
+    for level in levels:
+        assert level.dtype == np.int16
+        assert tuple(level[0]) == (0, 16383)
+        assert tuple(level[-1]) == (-32767, 0)
+        assert not level[1:-1].any()
+
+
+def test_peaks_fit_requested_width():
+    frames = BASE_SAMPLES_PER_PEAK * 1000
+    samples = sine(frames / SAMPLE_RATE, 0.5)
+    track = TrackAnalysis(_peak_levels(samples), SAMPLE_RATE, 1.0, -20.0, 0.5)
+    peaks = track.peaks(300)
+    assert peaks.shape == (300, 2)
+    assert peaks[:, 0].min() == pytest.approx(-0.5, abs=1e-3)
+    assert peaks[:, 1].max() == pytest.approx(0.5, abs=1e-3)
+    assert TrackAnalysis([], SAMPLE_RATE, 0.0, float('-inf'), 0.0).peaks(4).shape == (4, 2)
+
+
+def test_sidecar_round_trip_is_memory_mapped(tmp_path):
+    samples = sine(3.0, 0.25)
+    track = TrackAnalysis(_peak_levels(samples), SAMPLE_RATE, 3.0, -18.5, 0.25)
+    sidecar = tmp_path / "song.mp3.peaks"
+    TrackAnalysis._write_sidecar(sidecar, track)
+
+    loaded = TrackAnalysis._read_sidecar(sidecar)
+    assert isinstance(loaded.levels[0], np.memmap)
+    assert len(loaded.levels) == len(track.levels)
+    for mapped, level in zip(loaded.levels, track.levels):
+        np.testing.assert_array_equal(mapped, level)
+    assert (loaded.sample_rate, loaded.samples_per_peak, loaded.level_factor) == \
+        (SAMPLE_RATE, BASE_SAMPLES_PER_PEAK, LEVEL_FACTOR)
+    assert loaded.duration == pytest.approx(3.0)
+    assert loaded.loudness == pytest.approx(-18.5)
+    assert loaded.peak == pytest.approx(0.25)
+
+
+def test_truncated_sidecar_is_ignored(tmp_path):
+    track = TrackAnalysis(_peak_levels(sine(1.0, 0.25)), SAMPLE_RATE, 1.0, -18.5, 0.25)
+    sidecar = tmp_path / "song.mp3.peaks"
+    TrackAnalysis._write_sidecar(sidecar, track)
+    with open(sidecar, 'r+b') as f:
+        f.truncate(sidecar.stat().st_size - 1)
+    assert TrackAnalysis._read_sidecar(sidecar) is None
+
+
+@pytest.mark.parametrize("loudness, peak, gain", [
+    (-20.0, 0.1, 6.0),                      # quiet track, plenty of headroom
+    (-8.0, 1.0, -6.0),                      # loud track is turned down
+    (-30.0, 0.5, -20 * math.log10(0.5)),    # boost stops short of clipping
+    (float('-inf'), 0.0, 0.0),              # silence is left alone
+])
+def test_gain(loudness, peak, gain):
+    track = TrackAnalysis([], SAMPLE_RATE, 1.0, loudness, peak)
+    assert track.gain_db(-14.0) == pytest.approx(gain)
+    assert track.gain_scale(-14.0) == pytest.approx(10 ** (gain / 20))
+
+
+def test_loudness_of_reference_sine():
+    # BS.1770: a 1 kHz sine in both channels reads close to its level in dBFS
+    assert _integrated_loudness(sine(5.0, 0.1), SAMPLE_RATE) == pytest.approx(-20.0, abs=0.1)
+    assert _integrated_loudness(np.zeros((SAMPLE_RATE, 2), np.float32), SAMPLE_RATE) == \
+        float('-inf')
+
+
+def test_loudness_does_not_depend_on_chunk_size(monkeypatch):
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal((SAMPLE_RATE * 3, 2)) * 0.1).astype(np.float32)
+    whole = _integrated_loudness(samples, SAMPLE_RATE)
+    monkeypatch.setattr(analysis, 'LOUDNESS_CHUNK_FRAMES', 1000)
+    assert _integrated_loudness(samples, SAMPLE_RATE) == pytest.approx(whole, abs=1e-6)
@@ -0,0 +1,104 @@
+"""Tests for api.py"""
+
+import threading
+
+import pytest
+
+from api import SunoAPI
+
+
+def pages_of(total, limit, failing=None):
+    """A fetch_page over `total` items that records which pages were asked for"""
+    asked = []
+    lock = threading.Lock()
+
+    def fetch_page(page):
+        with lock:
+            asked.append(page)
+        if page == failing:
+            raise ConnectionError("page failed")
+        start = (page - 1) * limit
+        return list(range(start, min(start + limit, total)))
+
+    return fetch_page, asked
+
+
+@pytest.mark.parametrize("total", [0, 5, 10, 25, 100])
+def test_iter_pages_yields_everything_in_order(total):
+    fetch_page, _ = pages_of(total, 10)
+    pages = list(SunoAPI("token")._iter_pages(fetch_page, 10, prefetch=4))
+    assert [item for page in pages for item in page] == list(range(total))
+    assert all(pages)
+
+
+def test_iter_pages_single_page_costs_one_request():
+    fetch_page, asked = pages_of(7, 10)
+    list(SunoAPI("token")._iter_pages(fetch_page, 10, prefetch=4))
+    assert asked == [1]
+
+
+def test_iter_pages_stops_at_expected_count():
+    # Exactly two full pages: page 3 confirms the end, nothing past it is asked for
+    fetch_page, asked = pages_of(20, 10)
+    list(SunoAPI("token")._iter_pages(fetch_page, 10, prefetch=4, expected=20))
+    assert sorted(asked) == [1, 2, 3]
+
+
+def test_iter_pages_raises_instead_of_truncating():
+    fetch_page, _ = pages_of(100, 10, failing=3)
+    with pytest.raises(ConnectionError):
+        list(SunoAPI("token")._iter_pages(fetch_page, 10, prefetch=4))
+
+
+@pytest.mark.parametrize("clips, requests", [(0, 1), (50, 1), (100, 2), (350, 4)])
+def test_get_all_clips_request_count(mock_server, make_api, clips, requests):
+    server = mock_server(workspaces=1, clips_per_workspace=clips)
+    api = make_api(server)
+    workspace = api.get_all_workspaces()[0]
+    server.reset_counts()
+    assert len(api.get_all_clips(workspace.id, expected=workspace.clip_count)) == clips
+    assert server.request_count() == requests
+
+
+@pytest.mark.parametrize("clips, requests", [(0, 1), (100, 2), (350, 4)])
+def test_async_get_all_clips_request_count(mock_server, clips, requests):
+    pytest.importorskip("aiohttp")
+    import asyncio
+    from async_api import AsyncSunoAPI
+
+    server = mock_server(workspaces=1, clips_per_workspace=clips)
+
+    async def fetch():
+        async with AsyncSunoAPI("test-token") as api:
+            api.base_url = server.url
+            workspace = (await api.get_all_workspaces())[0]
+            server.reset_counts()
+            return await api.get_all_clips(workspace.id, expected=workspace.clip_count)
+
+    assert len(asyncio.run(fetch())) == clips
+    assert server.request_count() == requests
+
+
+def test_async_iter_pages_settles_requests_past_the_end():
+    pytest.importorskip("aiohttp")
+    import asyncio
+    from async_api import AsyncSunoAPI
+
+    started = []
+
+    async def fetch_page(page):
+        started.append(asyncio.current_task())
+        if page == 1:
+            return list(range(10))
+        if page == 2:
+            return [10]
+        await asyncio.sleep(10)
+        raise ConnectionError("past the end")
+
+    async def walk():
+        pages = [page async for page in AsyncSunoAPI("token")._iter_pages(fetch_page, 10, 4)]
+        return pages, [task.done() for task in started]
+
+    pages, done = asyncio.run(walk())
+    assert pages == [list(range(10)), [10]]
+    assert len(done) == 3 and all(done)
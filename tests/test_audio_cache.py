@@ -0,0 +1,61 @@
+"""Tests for audio_cache.py"""
+
+import time
+
+from audio_cache import AudioCache
+
+
+def store(cache, clip_id, size):
+    return cache.store(clip_id, [b'x' * size])
+
+
+def test_store_and_get(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1000)
+    path = store(cache, "a", 100)
+    assert path.read_bytes() == b'x' * 100
+    assert cache.get("a") == path
+    assert cache.get("missing") is None
+    # A new cache over the same folder finds it through the index
+    assert AudioCache(tmp_path, max_bytes=1000).peek("a") == path
+
+
+def test_least_recently_used_is_evicted_first(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=300)
+    for clip_id in "abc":
+        store(cache, clip_id, 100)
+        time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+
+    store(cache, "d", 100)
+    assert not cache.contains("b")
+    assert all(cache.contains(clip_id) for clip_id in "acd")
+    assert cache.total_bytes() == 300
+
+
+def test_peek_does_not_refresh(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=200)
+    store(cache, "a", 100)
+    time.sleep(0.01)
+    store(cache, "b", 100)
+    cache.peek("a")
+    store(cache, "c", 100)
+    assert not cache.contains("a")
+
+
+def test_new_clip_is_kept_even_over_budget(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=100)
+    store(cache, "a", 50)
+    store(cache, "big", 500)
+    assert cache.contains("big")
+    assert not cache.contains("a")
+
+
+def test_eviction_removes_sidecars(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=100)
+    path = store(cache, "a", 100)
+    sidecar = path.with_name(path.name + ".peaks")
+    sidecar.write_bytes(b'peaks')
+    store(cache, "b", 100)
+    assert not path.exists()
+    assert not sidecar.exists()
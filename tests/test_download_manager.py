@@ -0,0 +1,63 @@
+"""Tests for download_manager.py"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+
+import download_manager  # noqa: E402
+from download_manager import DONE, DownloadManager  # noqa: E402
+from mock_server import synthetic_mp3  # noqa: E402
+from models import Clip  # noqa: E402
+
+MP3_BYTES = 3_000_000
+
+
+def wait_for(app, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_resume_after_pause_waits_for_the_stopped_worker(qapp, mock_server, make_api,
+                                                         tmp_path, monkeypatch):
+    lock = threading.Lock()
+    writers = []
+    overlaps = []
+    real_download = download_manager.download_file
+
+    def slow_to_stop(url, output_path, **kwargs):
+        with lock:
+            overlaps.append(output_path in writers)
+            writers.append(output_path)
+        try:
+            completed = real_download(url, output_path, **kwargs)
+            if not completed:
+                # Still closing the .part file when the task could restart
+                time.sleep(0.3)
+            return completed
+        finally:
+            with lock:
+                writers.remove(output_path)
+
+    monkeypatch.setattr(download_manager, 'download_file', slow_to_stop)
+    server = mock_server(mp3_bytes=MP3_BYTES, audio_rate=MP3_BYTES)
+    api = make_api(server)
+    manager = DownloadManager(max_concurrent=2, state_file=tmp_path / "downloads.json")
+    manager.set_api(api)
+    clip = Clip("a", "Song", 'success', audio_url=f"{server.url}/audio/a.mp3")
+    manager.enqueue([clip], str(tmp_path))
+    task = manager.tasks[0]
+    wait_for(qapp, lambda: task.downloaded > 0)
+
+    manager.pause()
+    manager.set_api(api)
+    wait_for(qapp, lambda: task.status == DONE)
+    assert overlaps == [False, False]
+    with open(task.output_path, 'rb') as f:
+        assert f.read() == synthetic_mp3(MP3_BYTES)
+    manager.shutdown()
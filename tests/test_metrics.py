@@ -0,0 +1,47 @@
+"""Tests for metrics.py"""
+
+from metrics import MetricsRegistry
+
+
+def test_prometheus_counters_and_gauges():
+    registry = MetricsRegistry()
+    registry.describe('requests_total', "Requests sent")
+    registry.inc('requests_total', endpoint="/api/clip/{id}", status=200)
+    registry.inc('requests_total', 2, endpoint="/api/clip/{id}", status=200)
+    registry.inc('requests_total', endpoint='/a"b', status='error')
+    registry.set('active', 3)
+
+    lines = registry.to_prometheus().splitlines()
+    assert lines == [
+        "# HELP requests_total Requests sent",
+        "# TYPE requests_total counter",
+        'requests_total{endpoint="/a\\"b",status="error"} 1',
+        'requests_total{endpoint="/api/clip/{id}",status="200"} 3',
+        "# TYPE active gauge",
+        "active 3",
+    ]
+
+
+def test_prometheus_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    for value in (0.05, 0.2, 0.2, 5.0):
+        registry.observe('latency_seconds', value, buckets=(0.1, 1.0), op="get")
+
+    lines = registry.to_prometheus().splitlines()
+    assert lines == [
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{op="get",le="0.1"} 1',
+        'latency_seconds_bucket{op="get",le="1"} 3',
+        'latency_seconds_bucket{op="get",le="+Inf"} 4',
+        'latency_seconds_sum{op="get"} 5.45',
+        'latency_seconds_count{op="get"} 4',
+    ]
+
+
+def test_reset_and_counter_value():
+    registry = MetricsRegistry()
+    registry.inc('hits', kind="a")
+    assert registry.counter_value('hits', kind="a") == 1
+    assert registry.counter_value('hits', kind="b") == 0
+    registry.reset()
+    assert registry.to_prometheus() == "\n"
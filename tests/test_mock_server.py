@@ -0,0 +1,18 @@
+"""Tests for the benchmark mock server"""
+
+import time
+
+import requests
+
+
+def test_keep_alive_requests_are_not_delayed(mock_server):
+    server = mock_server(workspaces=1, clips_per_workspace=10)
+    session = requests.Session()
+    session.get(f"{server.url}/api/project/me")
+    times = []
+    for _ in range(10):
+        start = time.perf_counter()
+        session.get(f"{server.url}/api/project/me")
+        times.append(time.perf_counter() - start)
+    # Nagle plus delayed ACK would add ~40 ms to every reused connection
+    assert sorted(times)[len(times) // 2] < 0.02
@@ -0,0 +1,77 @@
+"""Tests for play_queue.py"""
+
+import pytest
+
+from models import Clip
+from play_queue import REPEAT_ALL, REPEAT_OFF, REPEAT_ONE, PlayQueue
+
+
+def clips(count):
+    return [Clip(f"c{i}", f"Song {i}", 'success') for i in range(count)]
+
+
+def ids(tracks):
+    return [clip.id for clip in tracks]
+
+
+def queue_of(count, start=0, repeat=REPEAT_OFF):
+    tracks = clips(count)
+    queue = PlayQueue()
+    queue.repeat = repeat
+    queue.set_tracks(tracks, tracks[start])
+    return queue
+
+
+def test_set_tracks_starts_at_the_chosen_clip():
+    queue = queue_of(4, start=2)
+    assert queue.current().id == "c2"
+    assert PlayQueue().current() is None
+
+
+def test_advance_stops_at_the_end_without_repeat():
+    queue = queue_of(3, start=1)
+    assert queue.advance().id == "c2"
+    assert queue.advance() is None
+    assert queue.current() is None
+    assert queue.upcoming(5) == []
+
+
+def test_repeat_all_wraps_around():
+    queue = queue_of(3, start=2, repeat=REPEAT_ALL)
+    assert ids(queue.upcoming(5)) == ["c0", "c1"]
+    assert queue.advance().id == "c0"
+    assert queue.back().id == "c2"
+
+
+@pytest.mark.parametrize("repeat, after_last", [(REPEAT_OFF, None), (REPEAT_ONE, None),
+                                                (REPEAT_ALL, "c0")])
+def test_skip_moves_on_in_every_repeat_mode(repeat, after_last):
+    queue = queue_of(2, repeat=repeat)
+    assert queue.advance(skip=True).id == "c1"
+    clip = queue.advance(skip=True)
+    assert (clip.id if clip else None) == after_last
+
+
+def test_repeat_one_replays_when_the_track_ends():
+    queue = queue_of(3, start=1, repeat=REPEAT_ONE)
+    assert ids(queue.upcoming(3)) == ["c1"]
+    assert queue.advance().id == "c1"
+    assert queue.current().id == "c1"
+
+
+def test_shuffle_keeps_the_current_track_and_every_other():
+    queue = queue_of(20, start=7)
+    queue.set_shuffle(True)
+    assert queue.current().id == "c7"
+    assert sorted(ids(queue.upcoming(19))) == sorted(f"c{i}" for i in range(20) if i != 7)
+
+    queue.advance()
+    playing = queue.current().id
+    queue.set_shuffle(False)
+    assert queue.current().id == playing
+    assert queue.position == int(playing[1:])
+
+
+def test_back_stays_on_the_first_track():
+    queue = queue_of(3)
+    assert queue.back().id == "c0"
@@ -0,0 +1,66 @@
+"""Tests for playback.py's MP3 frame index"""
+
+from array import array
+
+import requests
+
+from mock_server import synthetic_mp3
+from playback import Mp3FrameIndex
+
+FRAME_SIZE = 417                 # 128 kbps, 44.1 kHz, as the mock server encodes
+FRAME_SECONDS = 1152 / 44100
+
+
+def id3_tag(payload_size):
+    size = bytes((payload_size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b'ID3\x04\x00\x00' + size + b'\x00' * payload_size
+
+
+def test_from_bytes():
+    data = synthetic_mp3(FRAME_SIZE * 100)
+    index = Mp3FrameIndex.from_bytes(data)
+    assert list(index.offsets) == list(range(0, len(data), FRAME_SIZE))
+    assert abs(index.duration - 100 * FRAME_SECONDS) < 1e-9
+
+
+def test_from_bytes_skips_id3_tag_and_truncated_frame():
+    tag = id3_tag(300)
+    data = tag + synthetic_mp3(FRAME_SIZE * 10) + synthetic_mp3(FRAME_SIZE)[:200]
+    index = Mp3FrameIndex.from_bytes(data)
+    assert len(index.offsets) == 10
+    assert index.offsets[0] == len(tag)
+
+
+def test_offset_and_time_lookups():
+    index = Mp3FrameIndex.from_bytes(synthetic_mp3(FRAME_SIZE * 100))
+    assert index.offset_at(10 * FRAME_SECONDS + 0.001) == 10 * FRAME_SIZE
+    assert abs(index.time_at_offset(10 * FRAME_SIZE + 5) - 10 * FRAME_SECONDS) < 1e-9
+    assert index.offset_at(1e6) == 99 * FRAME_SIZE
+
+
+def test_scan_in_pieces_matches_full_scan():
+    data = id3_tag(100) + synthetic_mp3(FRAME_SIZE * 200)
+    index = Mp3FrameIndex(array('Q'), 0, 0)
+    resume = 0
+    # Uneven pieces, as a stream arrives
+    for end in list(range(0, len(data), 1000)) + [len(data)]:
+        resume = index.scan(data[resume:end], resume)
+    assert list(index.offsets) == list(Mp3FrameIndex.from_bytes(data).offsets)
+    assert resume == len(data)
+
+
+def test_for_file_writes_and_reads_sidecar(tmp_path):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(synthetic_mp3(FRAME_SIZE * 50))
+    index = Mp3FrameIndex.for_file(path)
+    assert (tmp_path / "song.mp3.frames").exists()
+    assert list(Mp3FrameIndex._read_sidecar(tmp_path / "song.mp3.frames").offsets) \
+        == list(index.offsets)
+
+
+def test_index_of_served_audio(mock_server):
+    server = mock_server(mp3_bytes=100_000)
+    data = requests.get(f"{server.url}/audio/a.mp3", timeout=10).content
+    index = Mp3FrameIndex.from_bytes(data)
+    assert len(index.offsets) == len(data) // FRAME_SIZE
+    assert abs(index.duration - len(data) // FRAME_SIZE * FRAME_SECONDS) < 1e-9
@@ -0,0 +1,147 @@
+"""Tests for resolver.py"""
+
+import time
+
+import pytest
+
+from models import Clip
+from resolver import AudioUrlResolver, url_expiry
+
+
+def signed(name, expires):
+    return f"https://cdn.example/{name}.mp3?Expires={int(expires)}&Signature=x"
+
+
+EXPIRED = signed("old", time.time() - 10)
+FRESH = signed("new", time.time() + 3600)
+
+
+class Details:
+    """get_clip_details stand-in: the metadata cache holds `cached`, the server `fresh`"""
+
+    def __init__(self, cached, fresh=None):
+        self.cached = cached
+        self.fresh = fresh or cached
+        self.calls = []
+
+    def __call__(self, clip_id, revalidate=False):
+        self.calls.append((clip_id, revalidate))
+        return {'audio_url': self.fresh if revalidate else self.cached}
+
+
+class Rejected(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = type("Response", (), {'status_code': status})()
+
+
+def clip(audio_url=""):
+    return Clip.from_dict({'id': "c1", 'title': "Song", 'status': "success",
+                           'audio_url': audio_url})
+
+
+def test_url_expiry():
+    assert url_expiry(signed("a", 1700000000)) == 1700000000
+    assert url_expiry("https://cdn.example/a.mp3") is None
+
+
+def test_fresh_listing_url_needs_no_request():
+    details = Details(FRESH)
+    assert AudioUrlResolver(details).resolve(clip(FRESH)) == FRESH
+    assert details.calls == []
+
+
+def test_expired_listing_url_is_refreshed_from_the_server():
+    details = Details(EXPIRED, FRESH)
+    assert AudioUrlResolver(details).resolve(clip(EXPIRED)) == FRESH
+    assert details.calls == [("c1", True)]
+
+
+def test_expired_cached_details_are_refreshed():
+    details = Details(EXPIRED, FRESH)
+    resolver = AudioUrlResolver(details)
+    assert resolver.resolve("c1") == FRESH
+    assert details.calls == [("c1", False), ("c1", True)]
+    # Remembered from then on
+    assert resolver.resolve("c1") == FRESH
+    assert len(details.calls) == 2
+
+
+def test_with_url_retries_once_with_a_new_url_after_rejection():
+    listed = signed("listed", time.time() + 3600)
+    details = Details(listed, FRESH)
+    used = []
+
+    def use(url):
+        used.append(url)
+        if url == listed:
+            raise Rejected(403)
+        return "ok"
+
+    assert AudioUrlResolver(details).with_url(clip(listed), use) == "ok"
+    assert used == [listed, FRESH]
+    assert details.calls == [("c1", True)]
+
+
+@pytest.mark.parametrize("status", [403, 500])
+def test_with_url_gives_up(status):
+    resolver = AudioUrlResolver(Details(FRESH))
+    attempts = []
+
+    def use(url):
+        attempts.append(url)
+        raise Rejected(status)
+
+    with pytest.raises(Rejected):
+        resolver.with_url(clip(FRESH), use)
+    assert len(attempts) == (2 if status == 403 else 1)
+
+
+def test_with_url_without_url():
+    resolver = AudioUrlResolver(lambda clip_id, revalidate=False: {})
+    with pytest.raises(ValueError):
+        resolver.with_url(clip(), lambda url: url)
+
+
+def test_resolved_url_is_remembered():
+    details = Details(FRESH)
+    resolver = AudioUrlResolver(details)
+    assert resolver.resolve("c1") == FRESH
+    assert resolver.resolve(clip()) == FRESH
+    assert details.calls == [("c1", False)]
+
+
+def test_concurrent_resolves_share_one_request():
+    import threading
+
+    release = threading.Event()
+    details = Details(FRESH)
+
+    def slow_details(clip_id, revalidate=False):
+        release.wait(5)
+        return details(clip_id, revalidate)
+
+    resolver = AudioUrlResolver(slow_details)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.resolve("c1")))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while "c1" not in resolver._pending:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [FRESH] * 5
+    assert len(details.calls) == 1
+
+
+def test_resolve_many_maps_ids_and_swallows_errors():
+    def details(clip_id, revalidate=False):
+        if clip_id == "bad":
+            raise ConnectionError("down")
+        return {'audio_url': FRESH}
+
+    urls = AudioUrlResolver(details).resolve_many(["a", "bad", clip(FRESH)])
+    assert urls == {"a": FRESH, "bad": None, "c1": FRESH}
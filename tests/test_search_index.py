@@ -0,0 +1,107 @@
+"""Tests for search_index.py and indexer.py"""
+
+import time
+
+from models import Clip
+from search_index import SearchIndex, prepare_clips
+
+
+def clip(clip_id, title, lyrics="", tags="", status="success",
+         created_at="2024-05-01T12:00:00", duration=120.0):
+    return Clip.from_dict({'id': clip_id, 'title': title, 'status': status,
+                           'created_at': created_at, 'duration': duration,
+                           'metadata': {'tags': tags, 'prompt': lyrics}})
+
+
+def ids(clips):
+    return [c.id for c in clips]
+
+
+def make_index():
+    index = SearchIndex()
+    index.add_clips([
+        clip("a", "Midnight Drive", lyrics="neon lights on the highway", tags="synthwave"),
+        clip("b", "Morning Coffee", lyrics="sunrise over the city", tags="lofi",
+             created_at="2024-01-10T08:00:00", duration=60.0),
+        clip("c", "City Lights", lyrics="driving home at midnight", tags="pop",
+             status="error"),
+    ], "ws1")
+    index.add_clips([clip("d", "Highway Song", lyrics="coffee and a long road", tags="rock")],
+                    "ws2")
+    return index
+
+
+def test_search_lists_title_matches_first():
+    assert ids(make_index().search("midnight")) == ["a", "c"]
+
+
+def test_search_matches_inside_words_and_all_words():
+    index = make_index()
+    assert ids(index.search("ighwa")) == ["d", "a"]
+    assert ids(index.search("city lights")) == ["c"]
+    assert index.search("midnight coffee") == []
+
+
+def test_search_short_query_scans_titles():
+    assert ids(make_index().search("ci")) == ["c"]
+
+
+def test_search_filters():
+    index = make_index()
+    assert ids(index.search("", status="error")) == ["c"]
+    assert ids(index.search("", workspace_id="ws2")) == ["d"]
+    assert ids(index.search("", date_to="2024-02-01")) == ["b"]
+    assert ids(index.search("", max_duration=90)) == ["b"]
+    assert ids(index.search("coffee", min_duration=90)) == ["d"]
+    assert len(index.search("", limit=2)) == 2
+
+
+def test_add_clips_replaces_changed_text():
+    index = make_index()
+    index.add_clips([clip("a", "Sunset Cruise", lyrics="golden hour")], "ws1")
+    assert "a" not in ids(index.search("midnight"))
+    assert ids(index.search("sunset")) == ["a"]
+    assert len(index) == 4
+
+
+def test_remove_clip():
+    index = make_index()
+    index.remove_clip("a")
+    assert ids(index.search("midnight")) == ["c"]
+    assert "a" not in ids(index.search(""))
+    assert len(index) == 3
+    assert index._texts[0] == ""
+
+
+def test_add_prepared_matches_add_clips():
+    clips = [clip(str(i), f"Track {i}", lyrics=f"verse {i} chorus") for i in range(30)]
+    direct = SearchIndex()
+    direct.add_clips(clips, "ws")
+    merged = SearchIndex()
+    merged.add_prepared(prepare_clips(clips[:10], "ws"))
+    merged.add_prepared(prepare_clips(clips[10:], "ws"))
+    assert merged._postings == direct._postings
+    assert merged._title_postings == direct._title_postings
+    assert ids(merged.search("chorus", limit=100)) == ids(direct.search("chorus", limit=100))
+
+
+def test_indexer_merges_in_order():
+    from PyQt5.QtCore import QCoreApplication
+    from indexer import SearchIndexer
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    index = SearchIndex()
+    indexer = SearchIndexer(index)
+    done = []
+    clips = [clip(str(i), f"Track {i}") for i in range(120)]
+    indexer.add_clips(clips, "ws")
+    indexer.add_clips([], "ws", removed=["5"], then=lambda: done.append(len(index)))
+
+    deadline = time.monotonic() + 10
+    while not done and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    indexer.shutdown()
+    assert done == [119]
+    found = ids(index.search("track", limit=200))
+    assert "5" not in found and len(found) == 119
@@ -0,0 +1,82 @@
+"""Tests for status_watcher.py"""
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+
+from models import Clip  # noqa: E402
+from status_watcher import BACKOFF, FIRST_INTERVAL, BATCH_SIZE, StatusWatcher  # noqa: E402
+
+
+def clip(clip_id, status):
+    return Clip.from_dict({'id': clip_id, 'title': clip_id, 'status': status})
+
+
+class FakeAPI:
+    """Answers status lookups from `statuses`; the batch endpoint can be switched off"""
+
+    def __init__(self, statuses, batch=True):
+        self.statuses = statuses
+        self.batch = batch
+        self.batches = []
+        self.details = []
+
+    def get_clips_by_ids(self, clip_ids):
+        self.batches.append(list(clip_ids))
+        if not self.batch:
+            return []
+        return [clip(clip_id, self.statuses[clip_id]) for clip_id in clip_ids]
+
+    def get_clip_details(self, clip_id, revalidate=False):
+        self.details.append((clip_id, revalidate))
+        return {'id': clip_id, 'title': clip_id, 'status': self.statuses[clip_id]}
+
+
+@pytest.fixture
+def watcher(qapp):
+    watcher = StatusWatcher()
+    yield watcher
+    watcher.jobs.shutdown()
+
+
+def test_watch_skips_finished_clips(watcher):
+    watcher.watch([clip("a", 'queued'), clip("b", 'success'), clip("c", 'error')], "ws")
+    assert list(watcher._watched) == ["a"]
+
+
+def test_changes_and_finished_clips_are_reported(watcher):
+    changed, finished = [], []
+    watcher.clips_changed.connect(lambda ws, clips: changed.append((ws, clips)))
+    watcher.clip_finished.connect(finished.append)
+    watcher.watch([clip("a", 'queued'), clip("b", 'queued'), clip("c", 'queued')], "ws")
+    watcher.interval = 20.0
+
+    watcher._on_fetched([clip("a", 'streaming'), clip("b", 'success'), clip("c", 'queued'),
+                         clip("unknown", 'success')])
+    assert [(ws, [c.id for c in clips]) for ws, clips in changed] == [("ws", ["a", "b"])]
+    assert [c.id for c in finished] == ["b"]
+    assert sorted(watcher._watched) == ["a", "c"]
+    assert watcher.interval == FIRST_INTERVAL
+
+
+def test_interval_backs_off_while_nothing_changes(watcher):
+    watcher.watch([clip("a", 'queued')], "ws")
+    watcher._on_fetched([clip("a", 'queued')])
+    assert watcher.interval == pytest.approx(FIRST_INTERVAL * BACKOFF)
+    watcher._on_fetched([clip("a", 'queued')])
+    assert watcher.interval == pytest.approx(FIRST_INTERVAL * BACKOFF ** 2)
+
+
+def test_fetch_batches_requests():
+    statuses = {f"c{i}": 'queued' for i in range(BATCH_SIZE + 5)}
+    api = FakeAPI(statuses)
+    fresh = StatusWatcher._fetch(api, list(statuses))
+    assert [len(batch) for batch in api.batches] == [BATCH_SIZE, 5]
+    assert len(fresh) == len(statuses)
+
+
+def test_fetch_falls_back_to_details_past_the_cache():
+    api = FakeAPI({"a": 'success', "b": 'queued'}, batch=False)
+    fresh = StatusWatcher._fetch(api, ["a", "b"])
+    assert [(c.id, c.status) for c in fresh] == [("a", 'success'), ("b", 'queued')]
+    assert api.details == [("a", True), ("b", True)]
@@ -0,0 +1,58 @@
+"""Tests for sync.py"""
+
+from models import Clip, Workspace
+from sync import LibrarySync, WorkspaceDelta, _needs_clips, diff_clips
+
+
+def clip(clip_id, title="Song", status="success"):
+    return Clip.from_dict({'id': clip_id, 'title': title, 'status': status})
+
+
+def workspace(ws_id, clip_count=0, updated_at="2024-01-01T00:00:00"):
+    return Workspace.from_dict({'id': ws_id, 'name': ws_id, 'clip_count': clip_count,
+                                'updated_at': updated_at})
+
+
+def test_diff_clips_splits_inserted_updated_removed():
+    old = [clip("a"), clip("b"), clip("c")]
+    new = [clip("a"), clip("b", title="Renamed"), clip("d")]
+    delta = diff_clips("ws", old, new)
+    assert [c.id for c in delta.inserted] == ["d"]
+    assert [c.id for c in delta.updated] == ["b"]
+    assert delta.removed == ["c"]
+    assert delta.clips == new
+
+
+def test_diff_clips_unchanged_is_empty():
+    clips = [clip("a"), clip("b")]
+    assert diff_clips("ws", clips, list(clips)).empty
+
+
+def test_needs_clips():
+    old = workspace("w", 3)
+    assert _needs_clips(None, old)
+    assert not _needs_clips(old, workspace("w", 3))
+    assert _needs_clips(old, workspace("w", 4))
+    assert _needs_clips(old, workspace("w", 3, "2024-02-01T00:00:00"))
+    # Nothing fetched yet, so nothing to compare against
+    assert _needs_clips(old, workspace("w", 3), have_clips=False)
+
+
+def test_sync_fetches_clips_of_seeded_workspaces(mock_server, make_api):
+    server = mock_server(workspaces=2, clips_per_workspace=5)
+    api = make_api(server)
+    library = LibrarySync()
+    # As after `suno-player list`: workspaces known, clips never fetched
+    library.set_workspaces(api.get_all_workspaces())
+
+    deltas = []
+    library.sync(api, revalidate=True, always=(), report=deltas.append)
+    clip_deltas = [d for d in deltas if not isinstance(d, WorkspaceDelta)]
+    assert len(clip_deltas) == 2
+    assert all(len(d.inserted) == 5 for d in clip_deltas)
+
+    deltas.clear()
+    server.reset_counts()
+    library.sync(api, revalidate=True, always=(), report=deltas.append)
+    assert deltas == []
+    assert server.request_count() == 1   # just the workspace listing
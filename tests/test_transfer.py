@@ -0,0 +1,66 @@
+"""Tests for transfer.py"""
+
+import os
+
+from mock_server import synthetic_mp3
+from transfer import _preallocate, download_file
+
+MP3_BYTES = 200_000
+
+
+def test_download_file(mock_server, tmp_path):
+    server = mock_server(mp3_bytes=MP3_BYTES)
+    output = str(tmp_path / "song.mp3")
+    assert download_file(f"{server.url}/audio/a.mp3", output, fsync=False)
+    with open(output, 'rb') as f:
+        assert f.read() == synthetic_mp3(MP3_BYTES)
+    assert not os.path.exists(output + ".part")
+
+
+def test_download_file_resumes_partial_file(mock_server, tmp_path):
+    server = mock_server(mp3_bytes=MP3_BYTES)
+    data = synthetic_mp3(MP3_BYTES)
+    output = str(tmp_path / "song.mp3")
+    with open(output + ".part", 'wb') as f:
+        f.write(data[:50_000])
+
+    reports = []
+    assert download_file(f"{server.url}/audio/a.mp3", output, fsync=False,
+                         on_progress=lambda done, total: reports.append((done, total)))
+    with open(output, 'rb') as f:
+        assert f.read() == data
+    # Only the missing tail was asked for
+    assert reports[-1] == (len(data), len(data))
+    assert server.request_count() == 1
+
+
+def test_download_file_restarts_on_416(mock_server, tmp_path):
+    server = mock_server(mp3_bytes=MP3_BYTES)
+    data = synthetic_mp3(MP3_BYTES)
+    output = str(tmp_path / "song.mp3")
+    with open(output + ".part", 'wb') as f:
+        f.write(b'\0' * (len(data) + 10))
+
+    assert download_file(f"{server.url}/audio/a.mp3", output, fsync=False)
+    with open(output, 'rb') as f:
+        assert f.read() == data
+    assert server.request_count() == 2
+
+
+def test_download_file_cancelled_keeps_resume_point(mock_server, tmp_path):
+    server = mock_server(mp3_bytes=MP3_BYTES)
+    output = str(tmp_path / "song.mp3")
+    progress = []
+    assert not download_file(f"{server.url}/audio/a.mp3", output, fsync=False,
+                             on_progress=lambda done, total: progress.append(done),
+                             is_cancelled=lambda: bool(progress))
+    # Cancelled at the first progress report (the final one repeats it)
+    assert os.path.getsize(output + ".part") == progress[-1]
+
+
+def test_preallocate_keeps_file_size(tmp_path):
+    with open(tmp_path / "song.mp3.part", 'wb') as f:
+        f.write(b'x' * 1000)
+        f.flush()
+        _preallocate(f, 1_000_000)
+        assert os.fstat(f.fileno()).st_size == 1000
@@ -0,0 +1,152 @@
+"""
+File transfers for Suno Music Player
+Resumable downloads into preallocated files, free of Qt so the command line
+can use them on machines without a display
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional, Set
+
+from models import Clip
+from transport import Transport, get_transport
+
+
+# Size of the reusable read buffer, and minimum seconds between progress reports
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.25
+
+# fallocate() mode that reserves blocks without changing the file size
+FALLOC_FL_KEEP_SIZE = 0x01
+
+
+def clip_output_path(clip: Clip, download_dir: str, used_paths: Set[str]) -> str:
+    """File name for a clip in a folder, made unique against `used_paths` (which it extends)"""
+    title = clip.title or clip.id
+    # Clean filename
+    title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    output_path = str(Path(download_dir) / f"{title}.mp3")
+    if output_path in used_paths:
+        # Suno often gives both variants of a generation the same title
+        output_path = str(Path(download_dir) / f"{title} [{clip.id[:8]}].mp3")
+    used_paths.add(output_path)
+    return output_path
+
+
+def download_file(url: str, output_path: str,
+                  on_progress: Optional[Callable[[int, int], None]] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None,
+                  fsync: bool = True, transport: Optional[Transport] = None) -> bool:
+    """Download a URL to a file; False if cancelled part way
+
+    Data is written to ``<output_path>.part`` and renamed when complete. If a
+    partial file is already there, the transfer resumes with a Range request.
+    `on_progress` receives (bytes downloaded, total or 0 if unknown).
+    """
+    transport = transport or get_transport()
+    is_cancelled = is_cancelled or (lambda: False)
+    part_path = output_path + ".part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    response = transport.get(url, stream=True, timeout=30, headers=headers)
+    if response.status_code == 416:
+        # Stale partial file the server can't continue; start over
+        response.close()
+        offset = 0
+        response = transport.get(url, stream=True, timeout=30)
+    try:
+        response.raise_for_status()
+
+        if response.status_code != 206:
+            offset = 0
+        total_size = int(response.headers.get('content-length', 0))
+        if total_size:
+            total_size += offset
+
+        _write(response, part_path, offset, total_size, on_progress, is_cancelled, fsync)
+    finally:
+        response.close()
+    if is_cancelled():
+        return False
+
+    os.replace(part_path, output_path)
+    return True
+
+
+def _write(response, part_path: str, offset: int, total_size: int,
+           on_progress, is_cancelled, fsync: bool):
+    """Copy the response body into the partial file from `offset`
+
+    The body is read straight into one reusable buffer instead of a new
+    bytes object per chunk, and progress is reported at most every
+    PROGRESS_INTERVAL seconds.
+    """
+    report = on_progress or (lambda downloaded, total: None)
+    raw = response.raw
+    raw.decode_content = True
+    buffer = memoryview(bytearray(DOWNLOAD_BUFFER_SIZE))
+    downloaded = offset
+    last_report = time.monotonic()
+
+    with open(part_path, 'r+b' if offset else 'wb') as f:
+        f.seek(offset)
+        if total_size:
+            _preallocate(f, total_size)
+        try:
+            while not is_cancelled():
+                n = raw.readinto(buffer)
+                if not n:
+                    break
+                f.write(buffer[:n])
+                downloaded += n
+
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    report(downloaded, total_size)
+        finally:
+            # Release reserved space past what was written
+            f.truncate(downloaded)
+            if fsync and not is_cancelled():
+                f.flush()
+                os.fsync(f.fileno())
+    report(downloaded, total_size)
+
+
+def _preallocate(f, size: int):
+    """Reserve disk space for the whole file up front (best effort)
+
+    The space is reserved without growing the file, so a partial file left
+    by a crash still ends at the last byte written and can resume from
+    there. Only Linux can do that (fallocate with FALLOC_FL_KEEP_SIZE);
+    elsewhere the file simply grows as it is written.
+    """
+    fallocate = _keep_size_fallocate()
+    if fallocate is None:
+        return
+    # Best effort: an unsupported filesystem or a full disk shows up on write
+    fallocate(f.fileno(), FALLOC_FL_KEEP_SIZE, 0, size)
+
+
+_fallocate = None
+
+
+def _keep_size_fallocate():
+    """libc's fallocate(), or None where it isn't available"""
+    global _fallocate
+    if _fallocate is None:
+        _fallocate = False
+        if sys.platform.startswith('linux'):
+            import ctypes
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                func = getattr(libc, 'fallocate64', None) or libc.fallocate
+            except (OSError, AttributeError):
+                return None
+            func.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64)
+            func.restype = ctypes.c_int
+            _fallocate = func
+    return _fallocate or None
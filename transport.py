@@ -0,0 +1,113 @@
+"""
+HTTP transport for Suno Music Player
+Shared pooled session with keep-alive and retry/backoff
+"""
+
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def backoff_delay(attempt: int, factor: float, maximum: float,
+                  retry_after: Optional[str] = None) -> float:
+    """Delay before retry `attempt` ("full jitter" exponential backoff)
+
+    A Retry-After in seconds from the server takes precedence, capped at
+    `maximum` like the computed delay.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), maximum)
+        except ValueError:
+            pass
+    ceiling = min(maximum, factor * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+class Transport:
+    """Pooled keep-alive HTTP session with jittered exponential backoff"""
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 20,
+                 max_retries: int = 3, backoff_factor: float = 0.5,
+                 backoff_max: float = 30.0):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+
+        # requests is imported on first use so it stays off the startup path
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        # One connection pool per host, reused across every call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+
+    def request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        """Send a request, retrying 429/5xx and connection errors with backoff"""
+        import requests
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt, self.backoff_factor, self.backoff_max))
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+
+            delay = backoff_delay(attempt, self.backoff_factor, self.backoff_max,
+                                  response.headers.get('Retry-After'))
+            # Release the connection back to the pool before sleeping
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> "requests.Response":
+        """Send a GET request"""
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+_transport: Optional[Transport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Get the shared transport, creating it on first use"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
+
+
+def configure_transport(**kwargs) -> Transport:
+    """Replace the shared transport with one built from the given settings"""
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = Transport(**kwargs)
+        return _transport
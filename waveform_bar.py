@@ -0,0 +1,108 @@
+"""
+Waveform seek bar for Suno Music Player
+Draws a track's precomputed peaks with the played part highlighted
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+from PyQt5.QtCore import Qt, QRectF, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPainterPath
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+if TYPE_CHECKING:
+    from analysis import TrackAnalysis
+
+
+class WaveformBar(QWidget):
+    """Clickable waveform; emits seek_requested(seconds) on click or drag"""
+    seek_requested = pyqtSignal(float)
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setMinimumHeight(48)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setCursor(Qt.PointingHandCursor)
+        self.analysis: Optional["TrackAnalysis"] = None
+        self.position = 0.0
+        self.duration = 0.0
+        self._path: Optional[QPainterPath] = None
+        self._dragging = False
+        self.played_color = QColor("#1db954")
+        self.remaining_color = QColor("#5a5a5a")
+
+    def set_analysis(self, analysis: Optional["TrackAnalysis"]):
+        """Show a track's waveform (None clears it)"""
+        self.analysis = analysis
+        self._path = None
+        self.update()
+
+    def set_position(self, position: float, duration: float):
+        if self._dragging:
+            return
+        self.position = position
+        self.duration = duration
+        self.update()
+
+    def resizeEvent(self, event):
+        self._path = None
+        super().resizeEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.duration > 0:
+            self._dragging = True
+            self._move_to(event.x())
+
+    def mouseMoveEvent(self, event):
+        if self._dragging:
+            self._move_to(event.x())
+
+    def mouseReleaseEvent(self, event):
+        if self._dragging:
+            self._dragging = False
+            self._move_to(event.x())
+            self.seek_requested.emit(self.position)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        if self.analysis is None:
+            # No analysis yet; a flat line keeps the layout steady
+            painter.setPen(self.remaining_color)
+            painter.drawLine(0, self.height() // 2, self.width(), self.height() // 2)
+            return
+
+        if self._path is None:
+            self._path = self._build_path()
+        split = self.width() * (self.position / self.duration if self.duration else 0)
+
+        painter.setPen(Qt.NoPen)
+        painter.setClipRect(QRectF(0, 0, split, self.height()))
+        painter.fillPath(self._path, self.played_color)
+        painter.setClipRect(QRectF(split, 0, self.width() - split, self.height()))
+        painter.fillPath(self._path, self.remaining_color)
+
+    def _build_path(self) -> QPainterPath:
+        """Outline of the waveform at the current width, mirrored around the middle"""
+        import numpy as np
+        width, height = self.width(), self.height()
+        middle = height / 2
+        peaks = self.analysis.peaks(width)
+        highs = middle - peaks[:, 1] * middle
+        lows = middle - peaks[:, 0] * middle
+        # Keep silent stretches visible as a hairline
+        highs = np.minimum(highs, middle - 0.5)
+        lows = np.maximum(lows, middle + 0.5)
+
+        path = QPainterPath()
+        path.moveTo(0, highs[0] if width else middle)
+        for x in range(1, width):
+            path.lineTo(x, highs[x])
+        for x in range(width - 1, -1, -1):
+            path.lineTo(x, lows[x])
+        path.closeSubpath()
+        return path
+
+    def _move_to(self, x: int):
+        fraction = min(max(x / max(1, self.width()), 0.0), 1.0)
+        self.position = fraction * self.duration
+        self.update()